@@ -0,0 +1,89 @@
+"""
+Benchmark of creating instructions of a loaded program.
+
+Compares creating the instruction objects through the opcode registry 
+with the former way of evaluating the class name built from the opcode.
+
+Usage: python3 benchmarks/creation_benchmark.py [--instructions N] [--repeat R]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpret import FrameModel, OperandFactory, InstructionCounter, Processor
+from interpret.argument import Argument
+from interpret.instruction import Instruction
+import interpret.processor
+
+OPCODES = [
+    ('MOVE', [('var', 'GF@a'), ('int', '1')]),
+    ('ADD', [('var', 'GF@a'), ('var', 'GF@a'), ('int', '2')]),
+    ('WRITE', [('var', 'GF@a')]),
+    ('JUMPIFEQ', [('label', 'end'), ('var', 'GF@a'), ('int', '0')]),
+    ('PUSHS', [('string', 'text')]),
+    ('POPS', [('var', 'GF@a')]),
+    ('CONCAT', [('var', 'GF@a'), ('string', 'a'), ('string', 'b')]),
+]
+
+"""
+Returns a list of raw instructions of a straight-line program.
+"""
+def generateInstructions(instructionCount):
+    instructions = []
+    for order in range(1, instructionCount + 1):
+        opcode, arguments = OPCODES[order % len(OPCODES)]
+        instructions.append(Instruction(opcode, [Argument(type, value) for type, value in arguments], order))
+    return instructions
+
+def createProcessor():
+    frameModel = FrameModel()
+    return Processor(frameModel, OperandFactory(frameModel), InstructionCounter(), None)
+
+"""
+Creates the instructions the way the processor does.
+"""
+def createByRegistry(rawInstructions):
+    createProcessor().load(rawInstructions)
+
+"""
+Creates the instructions by evaluating the name of the instruction class.
+"""
+def createByEval(rawInstructions):
+    processor = createProcessor()
+    operandFactory = OperandFactory(processor.frameModel)
+    namespace = vars(interpret.processor)
+    instructions = []
+    for rawInstruction in rawInstructions:
+        operands = [operandFactory.create(rawOperand) for rawOperand in rawInstruction.arguments]
+        className = rawInstruction.opcode.capitalize() + "Instruction"
+        instructions.append(eval(className, namespace)(operands, processor))
+    processor.instructionCounter.setInstructions(instructions)
+
+def measure(function, rawInstructions, repeat):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(rawInstructions)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    ap = argparse.ArgumentParser(description = 'Measures creating instructions of a large program.')
+    ap.add_argument('--instructions', type = int, default = 200000)
+    ap.add_argument('--repeat', type = int, default = 3)
+    args = ap.parse_args()
+
+    rawInstructions = generateInstructions(args.instructions)
+    print(F"Program: {args.instructions} instructions")
+    registrySeconds = measure(createByRegistry, rawInstructions, args.repeat)
+    evalSeconds = measure(createByEval, rawInstructions, args.repeat)
+    print(F"registry   {registrySeconds:8.3f} s")
+    print(F"eval       {evalSeconds:8.3f} s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark of loading a program from an xml file.
+
+Generates a large straight-line IPPcode20 program and measures the time
+and the peak resident memory of loading it. Every measurement runs in 
+a separate process, so the peak memory of one loader doesn't hide
+the peak memory of another one.
+
+Usage: python3 benchmarks/load_benchmark.py [--instructions N] [--repeat R]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+"""
+Writes a straight-line program with the given number of instructions
+to the file at the given path.
+"""
+def generateProgram(path, instructionCount):
+    with open(path, 'w') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        file.write('<program language="IPPcode20">\n')
+        file.write('<instruction order="1" opcode="DEFVAR"><arg1 type="var">GF@a</arg1></instruction>\n')
+        for order in range(2, instructionCount + 1):
+            if order % 3 == 0:
+                file.write(F'<instruction order="{order}" opcode="MOVE"><arg1 type="var">GF@a</arg1>'
+                           F'<arg2 type="string">line\\032{order}</arg2></instruction>\n')
+            elif order % 3 == 1:
+                file.write(F'<instruction order="{order}" opcode="ADD"><arg1 type="var">GF@a</arg1>'
+                           F'<arg2 type="int">{order}</arg2><arg3 type="int">-1</arg3></instruction>\n')
+            else:
+                file.write(F'<instruction order="{order}" opcode="WRITE"><arg1 type="var">GF@a</arg1></instruction>\n')
+        file.write('</program>\n')
+
+"""
+Loads the program with the streaming loader of the interpret.
+"""
+def loadStreaming(path):
+    from interpret import Program
+    return len(Program(path).getInstructions())
+
+"""
+Loads the program the way the interpret did before the streaming loader:
+builds the whole document tree and sorts the instructions by their order.
+"""
+def loadDocumentTree(path):
+    import xml.etree.ElementTree as et
+    from interpret.argument import Argument
+    from interpret.instruction import Instruction
+    root = et.parse(path).getroot()
+    instructions = []
+    for child in root:
+        arguments = [Argument(arg.attrib['type'], arg.text or '') for arg in child]
+        instructions.append(Instruction(child.attrib['opcode'], arguments, int(child.attrib['order'])))
+    instructions.sort(key = lambda instruction: instruction.order)
+    return len(instructions)
+
+LOADERS = {
+    'streaming': loadStreaming,
+    'tree': loadDocumentTree,
+}
+
+"""
+Loads the program in this process and prints the measurement as json.
+"""
+def runChild(loaderName, path):
+    start = time.perf_counter()
+    count = LOADERS[loaderName](path)
+    seconds = time.perf_counter() - start
+    peakKilobytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'instructions': count, 'seconds': seconds, 'peakRssKb': peakKilobytes}))
+
+"""
+Runs the loader in a new process and returns its measurement.
+"""
+def measure(loaderName, path):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', loaderName, path],
+                            check = True, stdout = subprocess.PIPE, universal_newlines = True).stdout
+    return json.loads(output)
+
+def main():
+    ap = argparse.ArgumentParser(description = 'Measures loading of a large generated program.')
+    ap.add_argument('--instructions', type = int, default = 200000)
+    ap.add_argument('--repeat', type = int, default = 3)
+    ap.add_argument('--child', nargs = 2, metavar = ('LOADER', 'FILE'), help = argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        runChild(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'program.xml')
+        generateProgram(path, args.instructions)
+        print(F"Program: {args.instructions} instructions, {os.path.getsize(path) // 1024} KiB")
+        for loaderName in LOADERS:
+            results = [measure(loaderName, path) for _ in range(args.repeat)]
+            seconds = min(result['seconds'] for result in results)
+            peakKilobytes = min(result['peakRssKb'] for result in results)
+            print(F"{loaderName:10} load time {seconds:8.3f} s   peak RSS {peakKilobytes / 1024:8.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark of the memory taken by the objects of a loaded program.
+
+Generates a large program, creates its instructions the way the processor
+does and defines many variables in the global frame. Reports the number
+of bytes allocated per created instruction with its operands and
+per initialized variable, measured by tracemalloc.
+
+Usage: python3 benchmarks/memory_benchmark.py [--instructions N] [--variables N]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpret import FrameModel, OperandFactory, InstructionCounter, Processor
+from interpret.argument import Argument
+from interpret.instruction import Instruction
+
+OPCODES = [
+    ('MOVE', [('var', 'GF@a'), ('int', '1')]),
+    ('ADD', [('var', 'GF@a'), ('var', 'GF@a'), ('int', '2')]),
+    ('WRITE', [('var', 'GF@a')]),
+    ('JUMPIFEQ', [('label', 'end'), ('var', 'GF@a'), ('nil', 'nil')]),
+    ('PUSHS', [('string', 'text')]),
+    ('POPS', [('var', 'LF@a')]),
+    ('LT', [('var', 'GF@b'), ('var', 'GF@a'), ('float', '0x1p+0')]),
+    ('READ', [('var', 'GF@a'), ('type', 'int')]),
+    ('ADDS', []),
+]
+
+"""
+Returns a list of raw instructions of a straight-line program.
+Raw arguments are decoded to fresh string objects,
+the same way the loader of the program decodes them.
+"""
+def generateInstructions(instructionCount):
+    instructions = []
+    for order in range(1, instructionCount + 1):
+        opcode, arguments = OPCODES[order % len(OPCODES)]
+        rawArguments = [Argument(''.join(type), ''.join(value)) for type, value in arguments]
+        instructions.append(Instruction(opcode, rawArguments, order))
+    return instructions
+
+def createProcessor(frameModel):
+    return Processor(frameModel, OperandFactory(frameModel), InstructionCounter(), None)
+
+"""
+Returns the number of bytes allocated by the function
+and still allocated after it returned.
+"""
+def measureAllocated(function):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return allocated, result
+
+"""
+Returns the number of bytes per created instruction.
+"""
+def measureInstructions(instructionCount):
+    rawInstructions = generateInstructions(instructionCount)
+    processor = createProcessor(FrameModel())
+    allocated, _ = measureAllocated(lambda: processor.load(rawInstructions))
+    return allocated / instructionCount
+
+"""
+Returns the number of bytes per defined and initialized variable.
+"""
+def measureVariables(variableCount, countVariables):
+    frameModel = FrameModel(countVariables)
+    names = ['var' + str(number) for number in range(variableCount)]
+    def defineVariables():
+        for name in names:
+            frameModel.defineVariable('GF', name)
+            frameModel.getFrameVariable('GF', name).set(1, 'int')
+    allocated, _ = measureAllocated(defineVariables)
+    return allocated / variableCount
+
+def main():
+    ap = argparse.ArgumentParser(description = 'Measures the memory of instructions and variables.')
+    ap.add_argument('--instructions', type = int, default = 200000)
+    ap.add_argument('--variables', type = int, default = 200000)
+    args = ap.parse_args()
+
+    print(F"Program: {args.instructions} instructions, {args.variables} variables")
+    print(F"instruction          {measureInstructions(args.instructions):8.1f} B")
+    print(F"variable             {measureVariables(args.variables, False):8.1f} B")
+    print(F"counted variable     {measureVariables(args.variables, True):8.1f} B")
+
+if __name__ == '__main__':
+    main()
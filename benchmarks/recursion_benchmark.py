@@ -0,0 +1,110 @@
+"""
+Benchmark of calling functions in a deeply recursive program.
+
+Every call creates a temporary frame and defines its variables, and every
+return discards a frame. Runs the same program with and without the pool
+of frames in the frame model and reports the time per call and the number
+of garbage collections the run caused.
+
+Usage: python3 benchmarks/recursion_benchmark.py [--depth N] [--rounds N] [--repeat R]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpret import FrameModel, OperandFactory, InstructionCounter, Processor
+from interpret.argument import Argument
+from interpret.instruction import Instruction
+
+"""
+Returns the source of a program which sums the numbers from depth
+to 0 by a recursive function, repeated the given number of rounds.
+"""
+def generateSource(depth, rounds):
+    return [
+        'DEFVAR GF@result',
+        'DEFVAR GF@round',
+        'MOVE GF@round int@0',
+        'LABEL loop',
+        'CREATEFRAME',
+        'DEFVAR TF@n',
+        F'MOVE TF@n int@{depth}',
+        'CALL sum',
+        'ADD GF@round GF@round int@1',
+        F'JUMPIFNEQ loop GF@round int@{rounds}',
+        'JUMP end',
+        'LABEL sum',
+        'PUSHFRAME',
+        'DEFVAR LF@result',
+        'JUMPIFEQ base LF@n int@0',
+        'CREATEFRAME',
+        'DEFVAR TF@n',
+        'SUB TF@n LF@n int@1',
+        'CALL sum',
+        'ADD LF@result GF@result LF@n',
+        'JUMP return',
+        'LABEL base',
+        'MOVE LF@result int@0',
+        'LABEL return',
+        'MOVE GF@result LF@result',
+        'POPFRAME',
+        'RETURN',
+        'LABEL end',
+    ]
+
+"""
+Returns a list of raw instructions of the source.
+"""
+def parseSource(lines):
+    instructions = []
+    for order, line in enumerate(lines, 1):
+        opcode, *arguments = line.split()
+        rawArguments = []
+        for argument in arguments:
+            if opcode in ('LABEL', 'JUMP', 'CALL') or (opcode.startswith('JUMPIF') and argument is arguments[0]):
+                rawArguments.append(Argument('label', argument))
+            else:
+                prefix, value = argument.split('@', 1)
+                type = 'var' if prefix in ('GF', 'LF', 'TF') else prefix
+                rawArguments.append(Argument(type, argument if type == 'var' else value))
+        instructions.append(Instruction(opcode, rawArguments, order))
+    return instructions
+
+"""
+Runs the program and returns the time and the number of garbage collections.
+"""
+def run(rawInstructions, poolFrames):
+    frameModel = FrameModel(poolFrames = poolFrames)
+    processor = Processor(frameModel, OperandFactory(frameModel), InstructionCounter(), None)
+    processor.load(rawInstructions)
+    gc.collect()
+    collections = sum(generation['collections'] for generation in gc.get_stats())
+    start = time.perf_counter()
+    processor.run()
+    seconds = time.perf_counter() - start
+    collections = sum(generation['collections'] for generation in gc.get_stats()) - collections
+    return seconds, collections
+
+def measure(rawInstructions, poolFrames, repeat):
+    return min(run(rawInstructions, poolFrames) for _ in range(repeat))
+
+def main():
+    ap = argparse.ArgumentParser(description = 'Measures calls of a deeply recursive function.')
+    ap.add_argument('--depth', type = int, default = 5000)
+    ap.add_argument('--rounds', type = int, default = 40)
+    ap.add_argument('--repeat', type = int, default = 3)
+    args = ap.parse_args()
+
+    rawInstructions = parseSource(generateSource(args.depth, args.rounds))
+    calls = (args.depth + 1) * args.rounds
+    print(F"Program: {calls} calls, depth {args.depth}")
+    for name, poolFrames in (('without pool', False), ('with pool', True)):
+        seconds, collections = measure(rawInstructions, poolFrames, args.repeat)
+        print(F"{name:14} {seconds:8.3f} s {seconds / calls * 1e9:8.0f} ns/call {collections:6} collections")
+
+if __name__ == '__main__':
+    main()
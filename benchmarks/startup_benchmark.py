@@ -0,0 +1,163 @@
+"""
+Benchmark of the startup of the interpret.
+
+Runs interpret.py by python -X importtime for the help, for an invalid
+option and for a program writing a single string, and reports the wall
+time of the process and the time spent importing modules, the best
+of the trials. The modules imported by the Python interpreter itself
+before the script starts are not counted.
+
+The check fails with exit code 1 if the import time of any case is
+over the budget in milliseconds, or if a case imports a module it
+doesn't need, such as the processor for the help.
+
+The modules are compiled to the bytecode before the trials,
+so the time of compiling them isn't measured.
+
+Usage: python3 benchmarks/startup_benchmark.py [--trials N] [--budget MS] [--top N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+INTERPRET = os.path.join(ROOT, 'interpret.py')
+
+"""
+The program run by the run case.
+"""
+PROGRAM = '''<?xml version="1.0" encoding="UTF-8"?>
+<program language="IPPcode20">
+<instruction order="1" opcode="WRITE"><arg1 type="string">startup</arg1></instruction>
+</program>
+'''
+
+"""
+The modules which must not be imported by any case,
+they are needed only by the optional features.
+"""
+OPTIONAL_MODULES = ('fileinput', 'traceback', 'json', 'tempfile', 'socket', 'interpret.daemon',
+                    'interpret.profiler', 'interpret.closureEngine', 'interpret.transpiler', 'interpret.optimizer',
+                    'interpret.programCache')
+
+"""
+The cases with their arguments of the interpret, the exit code
+and the modules they must not import besides OPTIONAL_MODULES.
+The help and the invalid options are reported without loading
+the processor and the xml parser, and the help is printed without
+the argument parser. The argument parser imports the locale module
+by gettext, so only the help can be printed without it.
+"""
+CASES = {
+    'help': (['--help'], 0, ('interpret.processor', 'xml.parsers.expat', 'argparse', 'locale')),
+    'error': (['--no-such-option'], 2, ('interpret.processor', 'xml.parsers.expat')),
+    'run': (['--source', '{program}'], 0, ()),
+}
+
+"""
+Returns the imported modules with their cumulative times in microseconds,
+parsed from the error output of python -X importtime.
+Only the top level imports are returned, the nested ones are
+included in their times.
+"""
+def parseImportTimes(errors):
+    imports = {}
+    for line in errors.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        if not name.startswith('  '):
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+"""
+Returns the names of all modules imported by python -X importtime.
+"""
+def parseImportedModules(errors):
+    return { line.split('|')[2].strip() for line in errors.splitlines()
+             if line.startswith('import time:') and line.split('|')[1].strip().isdigit() }
+
+"""
+Runs the command by python -X importtime and returns its exit code
+and its error output. The bytecode of the modules is written,
+so the following runs load it instead of compiling the modules.
+"""
+def runImportTime(arguments):
+    environment = dict(os.environ)
+    environment.pop('PYTHONDONTWRITEBYTECODE', None)
+    process = subprocess.run([sys.executable, '-X', 'importtime'] + arguments, env = environment,
+                             stdout = subprocess.DEVNULL, stderr = subprocess.PIPE, universal_newlines = True)
+    return process.returncode, process.stderr
+
+"""
+Returns the names of the modules imported before the script starts.
+"""
+def getInterpreterModules():
+    _, errors = runImportTime(['-c', 'pass'])
+    return parseImportedModules(errors)
+
+"""
+Runs the trials of the case and returns the best wall time in seconds,
+the best import time in microseconds with its top level imports,
+and the unexpected exit code or modules of the case.
+"""
+def measure(arguments, expectedCode, forbiddenModules, interpreterModules, trials):
+    runImportTime([INTERPRET] + arguments)
+    best = None
+    bestSeconds = None
+    problems = []
+    for _ in range(trials):
+        start = time.perf_counter()
+        returnCode, errors = runImportTime([INTERPRET] + arguments)
+        seconds = time.perf_counter() - start
+        bestSeconds = seconds if bestSeconds == None else min(bestSeconds, seconds)
+        if returnCode != expectedCode:
+            problems.append(F"exit code {returnCode} instead of {expectedCode}")
+        for module in sorted(parseImportedModules(errors) & set(forbiddenModules)):
+            problems.append(F"imports {module}")
+        imports = { name: microseconds for name, microseconds in parseImportTimes(errors).items()
+                    if name not in interpreterModules }
+        importTime = sum(imports.values())
+        if best == None or importTime < best['importMicroseconds']:
+            best = { 'importMicroseconds': importTime, 'imports': imports }
+    best['seconds'] = bestSeconds
+    return best, sorted(set(problems))
+
+def main():
+    ap = argparse.ArgumentParser(description = 'Measures the startup of the interpret and checks its budget.')
+    ap.add_argument('--trials', type = int, default = 5)
+    ap.add_argument('--budget', type = float, default = 30.0, help = 'Maximum import time of a case in milliseconds.')
+    ap.add_argument('--top', type = int, default = 5, help = 'Number of the slowest imports to list for every case.')
+    args = ap.parse_args()
+
+    interpreterModules = getInterpreterModules()
+    failures = []
+    print(F"{'case':10}{'wall [ms]':>12}{'imports [ms]':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        programPath = os.path.join(directory, 'program.xml')
+        with open(programPath, 'w') as file:
+            file.write(PROGRAM)
+        for name, (arguments, expectedCode, forbiddenModules) in CASES.items():
+            arguments = [argument.format(program = programPath) for argument in arguments]
+            result, problems = measure(arguments, expectedCode, OPTIONAL_MODULES + forbiddenModules,
+                                       interpreterModules, max(1, args.trials))
+            importMilliseconds = result['importMicroseconds'] / 1000
+            print(F"{name:10}{result['seconds'] * 1000:>12.1f}{importMilliseconds:>14.1f}")
+            slowest = sorted(result['imports'].items(), key = lambda item: -item[1])[:args.top]
+            for module, microseconds in slowest:
+                print(F"{'':10}{microseconds / 1000:>12.1f}  {module}")
+            if importMilliseconds > args.budget:
+                problems.append(F"imports take {importMilliseconds:.1f} ms, the budget is {args.budget:.1f} ms")
+            failures += [F"{name}: {problem}" for problem in problems]
+
+    if len(failures) > 0:
+        print('\nOver budget:\n' + '\n'.join(failures))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
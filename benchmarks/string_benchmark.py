@@ -0,0 +1,135 @@
+"""
+Benchmark of building a string character by character.
+
+Runs programs which append characters to a string by CONCAT, or replace
+characters of a string by SETCHAR while reading them by GETCHAR and
+STRLEN, for growing lengths of the string. The time per character
+stays the same when building the string is linear.
+
+Usage: python3 benchmarks/string_benchmark.py [--lengths N,N,...] [--engine ENGINE]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+INTERPRET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'interpret.py')
+
+"""
+Returns the source of a program appending the given number
+of characters to a string and writing its length.
+"""
+def generateConcat(length):
+    return [
+        'DEFVAR GF@s',
+        'DEFVAR GF@c',
+        'DEFVAR GF@i',
+        'DEFVAR GF@n',
+        'MOVE GF@s string@',
+        'MOVE GF@i int@0',
+        'LABEL loop',
+        'STRLEN GF@n GF@s',
+        'INT2CHAR GF@c int@97',
+        'CONCAT GF@s GF@s GF@c',
+        'ADD GF@i GF@i int@1',
+        F'JUMPIFNEQ loop GF@i int@{length}',
+        'STRLEN GF@n GF@s',
+        'WRITE GF@n',
+    ]
+
+"""
+Returns the source of a program replacing every character
+of a string of the given length by the previous character.
+The string is filled by appending the doubled pieces
+of the binary digits of the length, so any length works.
+"""
+def generateSetchar(length):
+    return [
+        'DEFVAR GF@s',
+        'DEFVAR GF@c',
+        'DEFVAR GF@i',
+        'DEFVAR GF@n',
+        'DEFVAR GF@piece',
+        'DEFVAR GF@half',
+        'MOVE GF@s string@',
+        'MOVE GF@piece string@a',
+        F'MOVE GF@i int@{length}',
+        'LABEL fill',
+        'IDIV GF@half GF@i int@2',
+        'MUL GF@n GF@half int@2',
+        'JUMPIFEQ even GF@n GF@i',
+        'CONCAT GF@s GF@s GF@piece',
+        'LABEL even',
+        'MOVE GF@i GF@half',
+        'JUMPIFEQ filled GF@i int@0',
+        'CONCAT GF@piece GF@piece GF@piece',
+        'JUMP fill',
+        'LABEL filled',
+        'MOVE GF@i int@1',
+        'SETCHAR GF@s int@0 string@b',
+        'LABEL loop',
+        'SUB GF@n GF@i int@1',
+        'GETCHAR GF@c GF@s GF@n',
+        'SETCHAR GF@s GF@i GF@c',
+        'ADD GF@i GF@i int@1',
+        'STRLEN GF@n GF@s',
+        'JUMPIFNEQ loop GF@i GF@n',
+        'SUB GF@i GF@i int@1',
+        'GETCHAR GF@c GF@s GF@i',
+        'WRITE GF@c',
+    ]
+
+"""
+Writes the program as an xml file and returns its path.
+"""
+def writeProgram(directory, name, lines):
+    path = os.path.join(directory, name + '.xml')
+    with open(path, 'w') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        file.write('<program language="IPPcode20">\n')
+        for order, line in enumerate(lines, 1):
+            opcode, *arguments = line.split()
+            file.write(F'<instruction order="{order}" opcode="{opcode}">')
+            for number, argument in enumerate(arguments, 1):
+                if opcode in ('LABEL', 'JUMP') or (opcode.startswith('JUMPIF') and number == 1):
+                    type, value = 'label', argument
+                else:
+                    prefix, value = argument.split('@', 1)
+                    type = 'var' if prefix in ('GF', 'LF', 'TF') else prefix
+                    value = argument if type == 'var' else value
+                file.write(F'<arg{number} type="{type}">{value}</arg{number}>')
+            file.write('</instruction>\n')
+        file.write('</program>\n')
+    return path
+
+"""
+Runs the program and returns the time of the run.
+"""
+def run(path, engine):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, INTERPRET, '--source', path, '--engine', engine],
+                   stdout = subprocess.DEVNULL, check = True)
+    return time.perf_counter() - start
+
+def main():
+    ap = argparse.ArgumentParser(description = 'Measures building strings by CONCAT and SETCHAR.')
+    ap.add_argument('--lengths', default = '16384,65536,262144')
+    ap.add_argument('--engine', choices = ['processor', 'closure', 'transpiler'], default = 'processor')
+    args = ap.parse_args()
+    try:
+        lengths = [int(length) for length in args.lengths.split(',')]
+    except ValueError:
+        ap.error('--lengths must be a comma separated list of integers')
+    if any(length < 2 for length in lengths):
+        ap.error('every length must be at least 2')
+
+    with tempfile.TemporaryDirectory() as directory:
+        for length in lengths:
+            for name, generate in (('concat', generateConcat), ('setchar', generateSetchar)):
+                seconds = run(writeProgram(directory, name, generate(length)), args.engine)
+                print(F"{name:8} {length:8} characters {seconds:8.3f} s {seconds / length * 1e6:8.2f} us/character")
+
+if __name__ == '__main__':
+    main()
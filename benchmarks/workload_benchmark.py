@@ -0,0 +1,405 @@
+"""
+Benchmark suite of the interpret running generated workloads.
+
+Generates IPPcode20 programs exercising different parts of the interpret
+and runs each of them by the Processor in a separate process for the given
+number of trials. Reports the time of loading the program, the number
+of executed instructions per second and the peak resident memory,
+the best of the trials.
+
+The workloads are generated deterministically for the given scale,
+so the results can be stored as a json baseline by --save and compared
+with later runs by --compare. The comparison fails with exit code 1
+if the load time or the peak memory grew, or the number of instructions
+per second dropped, by more than the tolerance.
+
+Usage: python3 benchmarks/workload_benchmark.py [--scale S] [--trials N] [--workloads NAME,...]
+                                                [--save FILE] [--compare FILE] [--tolerance T]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+"""
+Returns the source of a program computing a fibonacci number
+by a recursive function, which gets its argument in a new frame.
+"""
+def generateFibonacci(scale):
+    rounds = max(1, round(4 * scale))
+    return [
+        'DEFVAR GF@result',
+        'DEFVAR GF@round',
+        'MOVE GF@round int@0',
+        'LABEL loop',
+        'CREATEFRAME',
+        'DEFVAR TF@n',
+        'MOVE TF@n int@16',
+        'CALL fib',
+        'ADD GF@round GF@round int@1',
+        F'JUMPIFNEQ loop GF@round int@{rounds}',
+        'WRITE GF@result',
+        'JUMP end',
+        'LABEL fib',
+        'PUSHFRAME',
+        'DEFVAR LF@first',
+        'DEFVAR LF@less',
+        'LT LF@less LF@n int@2',
+        'JUMPIFEQ base LF@less bool@true',
+        'CREATEFRAME',
+        'DEFVAR TF@n',
+        'SUB TF@n LF@n int@1',
+        'CALL fib',
+        'MOVE LF@first GF@result',
+        'CREATEFRAME',
+        'DEFVAR TF@n',
+        'SUB TF@n LF@n int@2',
+        'CALL fib',
+        'ADD GF@result GF@result LF@first',
+        'POPFRAME',
+        'RETURN',
+        'LABEL base',
+        'MOVE GF@result LF@n',
+        'POPFRAME',
+        'RETURN',
+        'LABEL end',
+    ]
+
+"""
+Returns the source of a program building a string by CONCAT
+and then replacing all its characters by SETCHAR.
+"""
+def generateStrings(scale):
+    length = max(1, round(20000 * scale))
+    return [
+        'DEFVAR GF@s',
+        'DEFVAR GF@c',
+        'DEFVAR GF@i',
+        'DEFVAR GF@n',
+        'MOVE GF@s string@',
+        'MOVE GF@i int@0',
+        'LABEL build',
+        'INT2CHAR GF@c int@97',
+        'CONCAT GF@s GF@s GF@c',
+        'ADD GF@i GF@i int@1',
+        F'JUMPIFNEQ build GF@i int@{length}',
+        'MOVE GF@i int@0',
+        'LABEL replace',
+        'GETCHAR GF@c GF@s GF@i',
+        'SETCHAR GF@s GF@i string@b',
+        'ADD GF@i GF@i int@1',
+        F'JUMPIFNEQ replace GF@i int@{length}',
+        'STRLEN GF@n GF@s',
+        'WRITE GF@n',
+    ]
+
+"""
+Returns the source of a loop computing by the stack instructions only.
+"""
+def generateStack(scale):
+    iterations = max(1, round(20000 * scale))
+    return [
+        'DEFVAR GF@i',
+        'DEFVAR GF@sum',
+        'MOVE GF@i int@0',
+        'MOVE GF@sum int@0',
+        'LABEL loop',
+        'PUSHS GF@sum',
+        'PUSHS GF@i',
+        'PUSHS int@3',
+        'MULS',
+        'ADDS',
+        'PUSHS int@7',
+        'SUBS',
+        'POPS GF@sum',
+        'PUSHS GF@i',
+        'PUSHS int@1',
+        'ADDS',
+        'POPS GF@i',
+        'PUSHS GF@i',
+        F'PUSHS int@{iterations}',
+        'JUMPIFNEQS loop',
+        'WRITE GF@sum',
+    ]
+
+"""
+Returns the source of a program reading pairs of a number and a word
+until the end of the input.
+"""
+def generateRead(scale):
+    return [
+        'DEFVAR GF@number',
+        'DEFVAR GF@word',
+        'DEFVAR GF@type',
+        'DEFVAR GF@length',
+        'DEFVAR GF@sum',
+        'MOVE GF@sum int@0',
+        'LABEL loop',
+        'READ GF@number int',
+        'TYPE GF@type GF@number',
+        'JUMPIFEQ end GF@type string@nil',
+        'READ GF@word string',
+        'STRLEN GF@length GF@word',
+        'ADD GF@sum GF@sum GF@number',
+        'ADD GF@sum GF@sum GF@length',
+        'JUMP loop',
+        'LABEL end',
+        'WRITE GF@sum',
+    ]
+
+"""
+Returns the input of the read workload.
+"""
+def generateReadInput(scale):
+    generator = random.Random(0)
+    lines = []
+    for _ in range(max(1, round(20000 * scale))):
+        lines.append(str(generator.randint(-1000000, 1000000)))
+        lines.append(''.join(generator.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(generator.randint(1, 20))))
+    return '\n'.join(lines) + '\n'
+
+"""
+Returns the source of a program writing numbers and strings.
+"""
+def generateWrite(scale):
+    iterations = max(1, round(20000 * scale))
+    return [
+        'DEFVAR GF@i',
+        'MOVE GF@i int@0',
+        'LABEL loop',
+        'WRITE GF@i',
+        'WRITE string@\\032line\\010',
+        'ADD GF@i GF@i int@1',
+        F'JUMPIFNEQ loop GF@i int@{iterations}',
+    ]
+
+"""
+Returns the source of a very large straight-line program,
+which measures mainly the loading of the program.
+"""
+def generateLoad(scale):
+    lines = ['DEFVAR GF@a', 'DEFVAR GF@s']
+    for number in range(max(1, round(50000 * scale))):
+        lines.append(F'MOVE GF@a int@{number}')
+        lines.append('ADD GF@a GF@a int@-1')
+        lines.append(F'MOVE GF@s string@line\\032{number}')
+        lines.append('WRITE GF@a')
+    return lines
+
+"""
+Writes the program of the source lines to the file at the given path.
+Arguments of the lines are written as in the IPPcode20 source.
+"""
+def writeSource(path, lines):
+    with open(path, 'w') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        file.write('<program language="IPPcode20">\n')
+        for order, line in enumerate(lines, 1):
+            opcode, *arguments = line.split()
+            file.write(F'<instruction order="{order}" opcode="{opcode}">')
+            for number, argument in enumerate(arguments, 1):
+                type, value = getArgumentType(opcode, number, argument)
+                file.write(F'<arg{number} type="{type}">{value}</arg{number}>')
+            file.write('</instruction>\n')
+        file.write('</program>\n')
+
+"""
+Returns the type and the value of the argument of the instruction.
+"""
+def getArgumentType(opcode, number, argument):
+    if number == 1 and (opcode in ('LABEL', 'JUMP', 'CALL') or opcode.startswith('JUMPIF')):
+        return 'label', argument
+    if opcode == 'READ' and number == 2:
+        return 'type', argument
+    prefix, value = argument.split('@', 1)
+    if prefix in ('GF', 'LF', 'TF'):
+        return 'var', argument
+    return prefix, value
+
+"""
+Write the program of the workload, and its input if it reads any,
+to the given paths for the given scale.
+"""
+def writeFibonacci(path, inputPath, scale):
+    writeSource(path, generateFibonacci(scale))
+
+def writeStrings(path, inputPath, scale):
+    writeSource(path, generateStrings(scale))
+
+def writeStack(path, inputPath, scale):
+    writeSource(path, generateStack(scale))
+
+def writeRead(path, inputPath, scale):
+    writeSource(path, generateRead(scale))
+    with open(inputPath, 'w') as file:
+        file.write(generateReadInput(scale))
+
+def writeWrite(path, inputPath, scale):
+    writeSource(path, generateWrite(scale))
+
+def writeLoad(path, inputPath, scale):
+    writeSource(path, generateLoad(scale))
+
+"""
+The workloads by their names.
+"""
+WORKLOADS = {
+    'fib': writeFibonacci,
+    'strings': writeStrings,
+    'stack': writeStack,
+    'read': writeRead,
+    'write': writeWrite,
+    'load': writeLoad,
+}
+
+"""
+Loads and runs the program in this process the way the interpret does
+and prints the measurement as json. The output of the program is discarded.
+"""
+def runChild(path, inputPath):
+    from interpret import (FrameModel, OperandFactory, InstructionCounter, InstructionFusion, Processor,
+                           Program, InputReader, OutputWriter, TypeInference, DataStack)
+
+    inputFile = open(inputPath, 'rb') if os.path.exists(inputPath) else open(os.devnull, 'rb')
+    outputWriter = OutputWriter(os.open(os.devnull, os.O_WRONLY))
+    frameModel = FrameModel()
+    instructionCounter = InstructionCounter()
+    processor = Processor(frameModel, OperandFactory(frameModel), instructionCounter, InputReader(inputFile),
+                          InstructionFusion(), outputWriter, TypeInference(), DataStack())
+
+    start = time.perf_counter()
+    gc.disable()
+    processor.load(Program(path).getInstructions())
+    gc.enable()
+    gc.freeze()
+    loadSeconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    processor.run()
+    outputWriter.flush()
+    executeSeconds = time.perf_counter() - start
+
+    print(json.dumps({
+        'loadSeconds': loadSeconds,
+        'executeSeconds': executeSeconds,
+        'instructions': instructionCounter.executedInstructions,
+        'peakRssKb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+"""
+Runs the workload in a new process and returns its measurement.
+"""
+def runTrial(path, inputPath):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', path, inputPath],
+                            check = True, stdout = subprocess.PIPE, universal_newlines = True).stdout
+    return json.loads(output)
+
+"""
+Returns the best results of the trials of the workload.
+"""
+def measure(path, inputPath, trials):
+    results = [runTrial(path, inputPath) for _ in range(trials)]
+    executeSeconds = min(result['executeSeconds'] for result in results)
+    instructions = results[0]['instructions']
+    return {
+        'loadSeconds': min(result['loadSeconds'] for result in results),
+        'executeSeconds': executeSeconds,
+        'instructions': instructions,
+        'instructionsPerSecond': instructions / executeSeconds if executeSeconds > 0 else 0.0,
+        'peakRssKb': min(result['peakRssKb'] for result in results),
+    }
+
+"""
+The compared metrics with True if a higher value is better.
+"""
+METRICS = (
+    ('loadSeconds', False),
+    ('instructionsPerSecond', True),
+    ('peakRssKb', False),
+)
+
+"""
+Compares the results with the baseline, prints the relative changes
+and returns the list of the regressions larger than the tolerance.
+"""
+def compare(results, baseline, tolerance):
+    if baseline['scale'] != results['scale']:
+        print(F"Warning: the baseline was measured at scale {baseline['scale']}", file = sys.stderr)
+    regressions = []
+    print(F"\n{'workload':10}" + ''.join(F"{metric:>24}" for metric, _ in METRICS))
+    for name, current in results['workloads'].items():
+        previous = baseline['workloads'].get(name)
+        if previous == None:
+            print(F"{name:10} not in the baseline")
+            continue
+        columns = ''
+        for metric, higherIsBetter in METRICS:
+            change = current[metric] / previous[metric] - 1 if previous[metric] > 0 else 0.0
+            worse = -change if higherIsBetter else change
+            mark = ' !' if worse > tolerance else '  '
+            if worse > tolerance:
+                regressions.append(F"{name} {metric} {change * 100:+.1f} %")
+            columns += F"{change * 100:>20.1f} %{mark}"
+        print(F"{name:10}{columns}")
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser(description = 'Runs the generated workloads and compares them with a baseline.')
+    ap.add_argument('--scale', type = float, default = 1.0)
+    ap.add_argument('--trials', type = int, default = 3)
+    ap.add_argument('--workloads', default = ','.join(WORKLOADS))
+    ap.add_argument('--save', metavar = 'FILE', help = 'Store the results as a baseline.')
+    ap.add_argument('--compare', metavar = 'FILE', help = 'Compare the results with a baseline.')
+    ap.add_argument('--tolerance', type = float, default = 0.1)
+    ap.add_argument('--child', nargs = 2, metavar = ('FILE', 'INPUT'), help = argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        runChild(*args.child)
+        return
+
+    names = args.workloads.split(',')
+    for name in names:
+        if name not in WORKLOADS:
+            ap.error(F"unknown workload {name}, choose from {', '.join(WORKLOADS)}")
+
+    results = {
+        'scale': args.scale,
+        'trials': args.trials,
+        'python': platform.python_version(),
+        'workloads': {},
+    }
+    print(F"{'workload':10}{'load [s]':>12}{'execute [s]':>14}{'instructions':>14}{'instr/s':>14}{'peak RSS [MiB]':>16}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in names:
+            path = os.path.join(directory, name + '.xml')
+            inputPath = os.path.join(directory, name + '.in')
+            WORKLOADS[name](path, inputPath, args.scale)
+            result = measure(path, inputPath, args.trials)
+            results['workloads'][name] = result
+            print(F"{name:10}{result['loadSeconds']:>12.3f}{result['executeSeconds']:>14.3f}{result['instructions']:>14}"
+                  F"{result['instructionsPerSecond']:>14.0f}{result['peakRssKb'] / 1024:>16.1f}")
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent = 2)
+            file.write('\n')
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        if len(regressions) > 0:
+            print('\nRegressions:\n' + '\n'.join(regressions))
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -5,9 +5,16 @@ Created on Sat Feb 22 16:50:35 2020
 
 IPP project, an interpret of IPPcode20.
 """
-import sys, traceback
-import argparse
-from interpret import *
+import sys
+import os
+import io
+import gc
+import time
+from interpret.return_codes import *
+from interpret.statistics import Statistics, statisticsCollectors
+from interpret.program import Program
+from interpret.inputReader import InputReader
+from interpret.outputWriter import OutputWriter
 
 """
 Pints help message to stdout.
@@ -17,137 +24,651 @@ def printHelp():
     print("--help                        Prints this help.")
     print("--source SOURCE               Path to the source file.")
     print("--input SOURCE                Path to the input file (meaning the stdin for the program).")
+    print("--output OUTPUT               Path to the file to write the output of the program into.")
     print("--stats SOURCE                Path to the file to write the statistics into.")
-    print("--insts                       Write number of executed instructions to stats file.")
-    print("--vars                        Write the maximum number of initialized variables to stats file.")
+    for name, collectorClass in statisticsCollectors.items():
+        print(F"{'--' + name:<30}{collectorClass.description}")
+    print("--stats-format FORMAT         Format of the stats file: lines (default) or json.")
+    print("--profile FILE                Write execution counts and times per opcode and instruction to the file.")
+    print("--call-profile FILE           Write instruction counts and times per called function to the file.")
+    print("--folded-stacks FILE          Write folded call stacks with their times for flamegraph tools to the file.")
+    print("-O                            Optimize the program before running it.")
+    print("--engine ENGINE               Execution engine: processor (default), closure or transpiler.")
+    print("--cache-dir DIRECTORY         Store loaded programs in the directory and reuse them on next runs.")
+    print("--cache-max-size BYTES        Maximum size of the cache directory.")
+    print("--cache-max-age SECONDS       Remove programs from the cache not used for the given time.")
+    print("--batch MANIFEST              Run all cases of the manifest in this process and report their results.")
+    print("--batch-report FILE           Write the results of the batch cases with their output to the file as json.")
+    print("--batch-time-limit SECONDS    Stop a batch case after the given time.")
+    print("--daemon SOCKET               Serve programs sent by interpret_client.py on the Unix domain socket.")
+    print("--daemon-programs N           Maximum number of loaded programs the daemon keeps in memory.")
+    print("--daemon-time-limit SECONDS   Stop a program run by the daemon after the given time.")
 
 """
 Writes statistics of the interpretation to a file.
 File is specified by filepath parameter.
-filePath is a path to the file including its name.
+filePath is a path to the file including its name,
+format is the format of the file, lines or json.
 """
-def printStatisticsToFile(filepath):
+def printStatisticsToFile(statistics, filepath, format):
     try:
         statsfile = open(filepath, 'w')
     except:    
         raise InterpretException('Cannot open file', ReturnCodes.OUTPUT_FILE_ERROR)
-    
-    for arg in sys.argv:
-        if arg == "--insts":
-            statsfile.write(F"{instructionCounter.executedInstructions}\n")
-        elif arg == "--vars":
-            statsfile.write(F"{frameModel.maximumVariables}\n")
-    statsfile.close()
+    with statsfile:
+        statistics.write(statsfile, format)
+
+"""
+Writes a report of the profiling instruction counter to a file.
+filepath is a path to the file including its name,
+write is the method of the instruction counter writing the report.
+"""
+def printProfileToFile(filepath, write):
+    try:
+        profileFile = open(filepath, 'w')
+    except OSError:
+        raise InterpretException('Cannot open file', ReturnCodes.OUTPUT_FILE_ERROR)
+    with profileFile:
+        write(profileFile)
     
 """
-Parse program arguments
+Creates the reader of the program input.
+inputPath is a path to the input file or the content of the input
+as bytes. If it is None, the input is read from the standard input.
 """
-ap = argparse.ArgumentParser(add_help = False)
-ap.add_argument("--source")
-ap.add_argument("--input")
-ap.add_argument("--stats")
-ap.add_argument("--insts", action='store_true', default=False)
-ap.add_argument("--vars", action='store_true', default=False)
-ap.add_argument("--help", action='store_true', default=False)
-args = vars(ap.parse_args())
+def createInputReader(inputPath):
+    if inputPath == None:
+        return InputReader(sys.stdin.buffer, sys.stdin.encoding, sys.stdin.errors, translateNewlines = False)
+    if isinstance(inputPath, bytes):
+        return InputReader(io.BytesIO(inputPath))
+    try:
+        inputFile = open(inputPath, 'rb')
+    except OSError:
+        raise InterpretException('Cannot open file', ReturnCodes.INPUT_FILE_ERROR)
+    import locale
+    return InputReader(inputFile, locale.getpreferredencoding(False))
 
-try:
-    """
-    Get argument values
-    """
-    sourceOption = args["source"]
-    inputOption = args["input"]
-    helpOption = args['help']
-    statsOption = args['stats']
-    varsOption = args['vars']
-    instsOption = args['insts']
-    
-    """
-    Cannot specify --vars or --isnts without specifying --stats option.
-    """
-    if varsOption == True or instsOption == True:
-        if statsOption == None:
-            raise InterpretException('--stats option wasn\'t specified', ReturnCodes.SCRIPT_PARAMETER_ERROR)
-         
-    """
-    Raise an exception if both source option and input option wasn't 
-    (only if the --help wasn't specified neither').
-    Print help if the --help option was specified.
-    """
-    if sourceOption == None and inputOption == None:
-        if helpOption == False:
-            raise InterpretException('Some option have to be specified', ReturnCodes.SCRIPT_PARAMETER_ERROR)
-        else:
-            printHelp()
-            exit(ReturnCodes.SUCCESS)
-    elif helpOption == True:
-        raise InterpretException('Cannot combine paramaters', ReturnCodes.SCRIPT_PARAMETER_ERROR)
+"""
+Creates the writer of the program output.
+outputPath is a path to the output file. If it is None,
+the output is written to the standard output.
+"""
+def createOutputWriter(outputPath):
+    if outputPath == None:
+        sys.stdout.flush()
+        return OutputWriter(sys.stdout.fileno(), sys.stdout.encoding, sys.stdout.errors)
+    try:
+        descriptor = os.open(outputPath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    except OSError:
+        raise InterpretException('Cannot open file', ReturnCodes.OUTPUT_FILE_ERROR)
+    return OutputWriter(descriptor)
+
+"""
+Writes the output collected before an error.
+The error is reported even if the output cannot be written.
+"""
+def flushOutput(outputWriter):
+    if outputWriter == None:
+        return
+    try:
+        outputWriter.flush()
+    except OSError:
+        pass
+
+"""
+Reads the whole content of the source file.
+source is a path to the file, a file object or the content as bytes
+"""
+def readSource(source):
+    if isinstance(source, bytes):
+        return source
+    try:
+        if isinstance(source, str):
+            with open(source, 'rb') as file:
+                return file.read()
+        return source.buffer.read()
+    except OSError:
+        raise InterpretException('Invalid xml structure', ReturnCodes.INVALID_XML_STRUCTURE)
+
+"""
+Loads the program from the source into the processor.
+If the cache is specified, the program is taken from the cache
+if it has been run before. Otherwise, it is parsed from the source
+and stored to the cache. If programKey is given, the program
+is taken from the cache by the key instead of the source.
+
+Loading creates only objects that live as long as the program,
+so the garbage collector is disabled meanwhile and the loaded objects
+are excluded from the collections during the execution.
+"""
+def loadProgram(processor, source, programCache, statistics, programKey = None):
+    gc.disable()
+    try:
+        statistics.startPhase('load')
+        loadProgramInstructions(processor, source, programCache, statistics, programKey)
+    finally:
+        gc.enable()
+    gc.freeze()
+
+"""
+Reading the source and the cache is measured as the load phase,
+creating the instructions as the decode phase.
+"""
+def loadProgramInstructions(processor, source, programCache, statistics, programKey):
+    if programCache == None:
+        rawInstructions = Program(source).getInstructions()
+        statistics.startPhase('decode')
+        processor.load(rawInstructions)
+        return
     
-    """
-    Set source as stdin, because it option wasn't specified.
-    """
-    if sourceOption == None:
-        sourceOption = sys.stdin
-    """
-    Set stdin to input file option.
-    """
-    if inputOption == None:
-        inputFile = None
+    if programKey == None:
+        sourceContent = readSource(source)
+        key = programCache.getKey(sourceContent)
     else:
-        try:
-            inputFile = open(inputOption)
-        except:
-            raise InterpretException('Cannot open file', ReturnCodes.INPUT_FILE_ERROR)
-        sys.stdin = inputFile
-        
-    """
-    DI object graph entry point
-    """
-    frameModel = FrameModel()
-    operandFactory = OperandFactory(frameModel)
-    instructionCounter = InstructionCounter()
-    processor = Processor(frameModel, operandFactory, instructionCounter, inputFile)
-    program = Program(sourceOption)
-    
-    """
-    Run the object graph - start all the processing including
-    parsing input file, interpreting it and creating statistics
-    """
-    processor.execute(program.getInstructions())
-    
-    #print("Executed instructions:", instructionCounter.executedInstructions, file=sys.stderr)
-    #print("Maximum variables:", frameModel.maximumVariables, file=sys.stderr)
-    
-    """
-    Write statistics to file if the option was specified.
-    """
-    if statsOption != None:
-        printStatisticsToFile(statsOption)
-    
-    
-    if processor.stopCode == None:
-        exit(0)
+        sourceContent = None
+        key = programKey
+    cachedInstructions = programCache.load(key)
+    if cachedInstructions != None:
+        statistics.startPhase('decode')
+        processor.load(cachedInstructions)
+    elif sourceContent == None:
+        raise InterpretException('Unknown program key', ReturnCodes.INPUT_FILE_ERROR)
     else:
-        exit(processor.stopCode)
-        
-except InterpretException as ex:
-    print(ex.args[0], file=sys.stderr)
-    #traceback.print_exc(file=sys.stderr) # uncomment to show the stacktrace
-    exit(ex.args[1])
-except Exception as ex:
-    print(ex.args[0], file=sys.stderr)
-    exit(ReturnCodes.INTERNAL_ERROR)
+        rawInstructions = Program(io.BytesIO(sourceContent)).getInstructions()
+        statistics.startPhase('decode')
+        processor.load(rawInstructions)
+        programCache.store(key, processor.instructions)
     
+"""
+Creates the parser of the program arguments.
+"""
+def createArgumentParser():
+    import argparse
+    ap = argparse.ArgumentParser(add_help = False)
+    ap.add_argument("--source")
+    ap.add_argument("--input")
+    ap.add_argument("--output")
+    ap.add_argument("--stats")
+    for name in statisticsCollectors:
+        ap.add_argument("--" + name, dest="collectors", action='append_const', const=name, default=[])
+    ap.add_argument("--stats-format", choices=['lines', 'json'], default='lines')
+    ap.add_argument("--profile")
+    ap.add_argument("--call-profile")
+    ap.add_argument("--folded-stacks")
+    ap.add_argument("--help", action='store_true', default=False)
+    ap.add_argument("-O", dest="optimize", action='store_true', default=False)
+    ap.add_argument("--engine", choices=['processor', 'closure', 'transpiler'], default='processor')
+    ap.add_argument("--cache-dir")
+    ap.add_argument("--cache-max-size", type=int)
+    ap.add_argument("--cache-max-age", type=int)
+    ap.add_argument("--batch")
+    ap.add_argument("--batch-report")
+    ap.add_argument("--batch-time-limit", type=float)
+    ap.add_argument("--daemon")
+    ap.add_argument("--daemon-programs", type=int)
+    ap.add_argument("--daemon-time-limit", type=float)
+    return ap
+
+"""
+Interprets the program with the given arguments and returns the exit code.
+Every call creates its own object graph, so the batch mode and the daemon
+run their programs one after another by this function.
+Errors are reported to the standard error output.
+programCache replaces the cache given by the arguments and programKey
+is the key of the program in it, which is run instead of the source.
+"""
+def interpret(args, programCache = None, programKey = None):
+    inputReader = None
+    outputWriter = None
+    try:
+        """
+        Get argument values
+        """
+        sourceOption = args["source"]
+        inputOption = args["input"]
+        outputOption = args["output"]
+        helpOption = args['help']
+        statsOption = args['stats']
+        collectorsOption = args['collectors']
+        statsFormatOption = args['stats_format']
+        profileOption = args['profile']
+        callProfileOption = args['call_profile']
+        foldedStacksOption = args['folded_stacks']
+        callProfiling = callProfileOption != None or foldedStacksOption != None
+        cacheDirOption = args['cache_dir']
+        engineOption = args['engine']
+        optimizeOption = args['optimize']
+        
+        """
+        Cannot specify --vars, --isnts or other statistics without specifying --stats option.
+        """
+        if len(collectorsOption) > 0:
+            if statsOption == None:
+                raise InterpretException('--stats option wasn\'t specified', ReturnCodes.SCRIPT_PARAMETER_ERROR)
+             
+        """
+        Raise an exception if both source option and input option wasn't 
+        (only if the --help wasn't specified neither').
+        Print help if the --help option was specified.
+        """
+        if sourceOption == None and inputOption == None and programKey == None:
+            if helpOption == False:
+                raise InterpretException('Some option have to be specified', ReturnCodes.SCRIPT_PARAMETER_ERROR)
+            else:
+                printHelp()
+                return ReturnCodes.SUCCESS
+        elif helpOption == True:
+            raise InterpretException('Cannot combine paramaters', ReturnCodes.SCRIPT_PARAMETER_ERROR)
+        
+        """
+        Only the processor executes instructions one by one, so it is the only
+        engine which can be profiled. Instructions and calls are profiled
+        by different instruction counters, so they cannot be profiled together.
+        """
+        if profileOption != None or callProfiling:
+            if engineOption != 'processor':
+                raise InterpretException('Profiling requires the processor engine', ReturnCodes.SCRIPT_PARAMETER_ERROR)
+            if profileOption != None and callProfiling:
+                raise InterpretException('Cannot combine --profile with --call-profile or --folded-stacks',
+                                         ReturnCodes.SCRIPT_PARAMETER_ERROR)
+        
+        """
+        Set source as stdin, because it option wasn't specified.
+        """
+        if sourceOption == None and programKey == None:
+            sourceOption = sys.stdin
         
+        """
+        The components of the processor are imported only when a program
+        is run, so the help and invalid options are reported without them.
+        The optional components are imported only when they are used.
+        """
+        from interpret.framemodel import FrameModel, CountedFrameModel
+        from interpret.operand import OperandFactory
+        from interpret.dataStack import DataStack, CountedDataStack
+        from interpret.instructionCounter import InstructionCounter, CountedCallStack
+        from interpret.fusion import InstructionFusion
+        from interpret.typeInference import TypeInference
+        from interpret.processor import Processor
+        """
+        DI object graph entry point.
+        The components counting the statistics are created
+        only if the statistics were requested.
+        """
+        statistics = Statistics(collectorsOption)
+        inputReader = createInputReader(inputOption)
+        outputWriter = createOutputWriter(outputOption)
+        countVariables = statistics.isEnabled('vars')
+        if statistics.isEnabled('frames'):
+            frameModel = CountedFrameModel(countVariables = countVariables)
+        else:
+            frameModel = FrameModel(countVariables = countVariables)
+        operandFactory = OperandFactory(frameModel)
+        dataStack = CountedDataStack() if statistics.isEnabled('stack') else DataStack()
+        callStack = CountedCallStack() if statistics.isEnabled('calls') else None
+        """
+        Profiled instructions aren't fused, so every instruction
+        is reported on its own.
+        """
+        if profileOption != None:
+            from interpret.profiler import ProfilingInstructionCounter
+            instructionCounter = ProfilingInstructionCounter(callStack)
+            instructionFusion = None
+        elif callProfiling:
+            from interpret.profiler import CallProfilingInstructionCounter
+            instructionCounter = CallProfilingInstructionCounter(callStack)
+            instructionFusion = None
+        else:
+            instructionCounter = InstructionCounter(callStack)
+            instructionFusion = InstructionFusion()
+        processor = Processor(frameModel, operandFactory, instructionCounter, inputReader, instructionFusion, outputWriter,
+                              TypeInference(), dataStack)
+        statistics.attach(instructionCounter, frameModel, dataStack, outputWriter)
+        if programCache == None and cacheDirOption != None:
+            from interpret.programCache import ProgramCache
+            maximumSize = args['cache_max_size']
+            if maximumSize == None:
+                maximumSize = ProgramCache.DEFAULT_MAXIMUM_SIZE
+            maximumAge = args['cache_max_age']
+            if maximumAge == None:
+                maximumAge = ProgramCache.DEFAULT_MAXIMUM_AGE
+            programCache = ProgramCache(cacheDirOption, maximumSize, maximumAge)
+        
+        """
+        Run the object graph - start all the processing including
+        parsing input file, interpreting it and creating statistics
+        """
+        loadProgram(processor, sourceOption, programCache, statistics, programKey)
+        if optimizeOption:
+            from interpret.optimizer import Optimizer
+            optimizer = Optimizer(processor)
+            optimizer.optimize()
+            optimizer.printReport(sys.stderr)
+        statistics.startPhase('execute')
+        if engineOption == 'closure':
+            from interpret.closureEngine import ClosureEngine
+            ClosureEngine(processor).run()
+        elif engineOption == 'transpiler':
+            from interpret.transpiler import Transpiler
+            Transpiler(processor).run()
+        else:
+            processor.run()
+        outputWriter.flush()
+        statistics.startPhase(None)
+        
+        #print("Executed instructions:", instructionCounter.executedInstructions, file=sys.stderr)
+        #print("Maximum variables:", frameModel.maximumVariables, file=sys.stderr)
+        
+        """
+        Write statistics to file if the option was specified.
+        """
+        if statsOption != None:
+            printStatisticsToFile(statistics, statsOption, statsFormatOption)
+        if profileOption != None or callProfileOption != None:
+            printProfileToFile(profileOption or callProfileOption, instructionCounter.writeReport)
+        if foldedStacksOption != None:
+            printProfileToFile(foldedStacksOption, instructionCounter.writeFoldedStacks)
+        
+        
+        if processor.stopCode == None:
+            return ReturnCodes.SUCCESS
+        else:
+            return processor.stopCode
+            
+    except InterpretException as ex:
+        flushOutput(outputWriter)
+        print(ex.args[0], file=sys.stderr)
+        #import traceback; traceback.print_exc(file=sys.stderr) # uncomment to show the stacktrace
+        return ex.args[1]
+    except Exception as ex:
+        flushOutput(outputWriter)
+        print(ex.args[0], file=sys.stderr)
+        return ReturnCodes.INTERNAL_ERROR
+    finally:
+        if inputReader != None and inputOption != None:
+            inputReader.close()
+        if outputWriter != None and outputOption != None:
+            outputWriter.close()
 
+"""
+Reads the cases of the batch manifest.
+The manifest is a json lines file, every line is an object of a case
+with the path to the "source" and optionally the paths to its "input",
+its expected "output" and its "stats" file, the expected exit code "rc"
+and a list of further interpret "options", such as "--insts".
+Relative paths are relative to the directory of the manifest.
+"""
+def readManifest(manifestPath):
+    import json
+    try:
+        with open(manifestPath) as manifestFile:
+            lines = manifestFile.readlines()
+    except OSError:
+        raise InterpretException('Cannot open file', ReturnCodes.INPUT_FILE_ERROR)
+    
+    directory = os.path.dirname(manifestPath)
+    cases = []
+    for line in lines:
+        if line.strip() == '':
+            continue
+        try:
+            case = json.loads(line)
+        except ValueError:
+            raise InterpretException('Invalid batch manifest', ReturnCodes.INPUT_FILE_ERROR)
+        if not isinstance(case, dict) or not isinstance(case.get('source'), str):
+            raise InterpretException('Batch case without source', ReturnCodes.INPUT_FILE_ERROR)
+        for key in ('source', 'input', 'output', 'stats'):
+            if case.get(key) != None:
+                case[key] = os.path.join(directory, case[key])
+        cases.append(case)
+    return cases
 
+"""
+The time limit of a batch case in seconds if none is given.
+"""
+DEFAULT_BATCH_TIME_LIMIT = 60
 
+"""
+Raised in a batch case which runs out of its time. It isn't an Exception,
+so the interpret doesn't handle it as an error of the program.
+"""
+class BatchTimeLimitExceeded(BaseException):
+    pass
 
+"""
+Handles SIGALRM of the timer of a batch case.
+"""
+def raiseBatchTimeLimitExceeded(signalNumber, frame):
+    raise BatchTimeLimitExceeded()
 
+"""
+Runs a case of the batch and returns its result.
+The output of the program is written to a temporary file and the
+standard error output is redirected, so both are captured for the case.
+A case running over timeLimit seconds is stopped by SIGALRM and fails
+with the internal error, so a looping program doesn't block the batch
+or a worker of the test runner. The case has to run in the main thread.
+"""
+def runBatchCase(ap, case, timeLimit = DEFAULT_BATCH_TIME_LIMIT):
+    import tempfile
+    import contextlib
+    import signal
+    outputFile = tempfile.NamedTemporaryFile(delete = False)
+    outputFile.close()
+    errors = io.StringIO()
+    arguments = ['--source', case['source'], '--input', case.get('input') or os.devnull,
+                 '--output', outputFile.name] + case.get('options', [])
+    if case.get('stats') != None:
+        arguments += ['--stats', case['stats']]
+    
+    timedOut = False
+    start = time.perf_counter()
+    previousHandler = signal.signal(signal.SIGALRM, raiseBatchTimeLimitExceeded)
+    with contextlib.redirect_stderr(errors):
+        try:
+            signal.setitimer(signal.ITIMER_REAL, timeLimit)
+            returnCode = interpret(vars(ap.parse_args(arguments)))
+        except SystemExit as ex:
+            returnCode = ex.code
+        except BatchTimeLimitExceeded:
+            timedOut = True
+            returnCode = ReturnCodes.INTERNAL_ERROR
+            print(F"Time limit of {timeLimit} s exceeded", file=sys.stderr)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previousHandler)
+    seconds = time.perf_counter() - start
+    """
+    Loading the program froze its objects, which are
+    garbage after the case.
+    """
+    gc.unfreeze()
+    
+    with open(outputFile.name, 'rb') as file:
+        output = file.read()
+    os.remove(outputFile.name)
+    
+    expectedCode = case.get('rc', ReturnCodes.SUCCESS)
+    passed = returnCode == expectedCode and not timedOut
+    if passed and returnCode == ReturnCodes.SUCCESS and case.get('output') != None:
+        try:
+            with open(case['output'], 'rb') as file:
+                passed = file.read() == output
+        except OSError:
+            passed = False
+    return {
+        'source': case['source'],
+        'rc': returnCode,
+        'expectedRc': expectedCode,
+        'passed': passed,
+        'seconds': seconds,
+        'stdout': output.decode('utf-8', 'replace'),
+        'stderr': errors.getvalue(),
+    }
 
+"""
+Runs all cases of the batch manifest in this process, prints
+the result and the time of every case and writes the results
+to the report file if it is given. Every case is stopped
+after timeLimit seconds.
+Returns 0 if all cases passed and 1 otherwise.
+"""
+def runBatch(ap, manifestPath, reportPath, timeLimit):
+    cases = readManifest(manifestPath)
+    results = []
+    start = time.perf_counter()
+    for case in cases:
+        result = runBatchCase(ap, case, timeLimit)
+        results.append(result)
+        status = 'PASS' if result['passed'] else 'FAIL'
+        print(F"{status} {result['rc']:>3} {result['seconds'] * 1000:>10.3f} ms  {result['source']}")
+    seconds = time.perf_counter() - start
+    passedCount = sum(1 for result in results if result['passed'])
+    print(F"Passed {passedCount} of {len(results)} cases in {seconds:.3f} s")
+    
+    if reportPath != None:
+        import json
+        try:
+            reportFile = open(reportPath, 'w')
+        except OSError:
+            raise InterpretException('Cannot open file', ReturnCodes.OUTPUT_FILE_ERROR)
+        with reportFile:
+            json.dump(results, reportFile, indent = 2)
+            reportFile.write("\n")
+    return 0 if passedCount == len(results) else 1
 
+"""
+The options the daemon sets itself for every request, which
+cannot be sent by the client.
+"""
+DAEMON_OPTIONS = ['source', 'input', 'output', 'stats', 'profile', 'call_profile', 'folded_stacks', 'cache_dir',
+                  'batch', 'batch_report', 'batch_time_limit', 'daemon', 'daemon_time_limit', 'help']
 
+"""
+Runs the program of a daemon request and returns the response.
+The request is an object with the "source" of the program, or the "key"
+of a program the daemon has already loaded, the "input" of the program,
+both encoded in base64, a list of the interpret "options", such as "--insts",
+and "stats" set to true if the statistics should be returned.
+The response has the "key" of the program, its exit code "rc",
+its "stdout" encoded in base64, its "stderr" and its "stats".
 
+The request is run in a child process of the daemon, so a program loaded
+by the request is returned in the "program" of the response as well
+and completeDaemonRequest stores it to the cache of the daemon.
+"""
+def runDaemonRequest(ap, request, programCache):
+    import base64
+    import tempfile
+    import contextlib
+    errors = io.StringIO()
+    with contextlib.redirect_stderr(errors):
+        try:
+            args = vars(ap.parse_args(request.get('options', [])))
+        except SystemExit as ex:
+            return { 'rc': ex.code, 'stdout': '', 'stderr': errors.getvalue() }
+    for option in DAEMON_OPTIONS:
+        if args[option] not in (None, False):
+            return { 'rc': ReturnCodes.SCRIPT_PARAMETER_ERROR, 'stdout': '',
+                     'stderr': F"Option {option} cannot be sent to the daemon\n" }
+    
+    if request.get('source') == None and request.get('key') == None:
+        return { 'rc': ReturnCodes.SCRIPT_PARAMETER_ERROR, 'stdout': '', 'stderr': "The request has no program\n" }
+    if request.get('source') != None:
+        args['source'] = base64.b64decode(request['source'])
+        programKey = None
+        key = programCache.getKey(args['source'])
+    else:
+        programKey = request.get('key')
+        key = programKey
+    loadedBefore = key in programCache
+    args['input'] = base64.b64decode(request.get('input') or '')
+    outputFile = tempfile.NamedTemporaryFile(delete = False)
+    outputFile.close()
+    args['output'] = outputFile.name
+    if request.get('stats'):
+        statsFile = tempfile.NamedTemporaryFile(delete = False)
+        statsFile.close()
+        args['stats'] = statsFile.name
+    
+    try:
+        with contextlib.redirect_stderr(errors):
+            returnCode = interpret(args, programCache, programKey)
+        gc.unfreeze()
+        with open(args['output'], 'rb') as file:
+            output = file.read()
+        stats = None
+        if args['stats'] != None:
+            with open(args['stats']) as file:
+                stats = file.read()
+    finally:
+        os.remove(args['output'])
+        if args['stats'] != None:
+            os.remove(args['stats'])
+    return {
+        'key': key,
+        'rc': returnCode,
+        'stdout': base64.b64encode(output).decode('ascii'),
+        'stderr': errors.getvalue(),
+        'stats': stats,
+        'program': None if loadedBefore else programCache.getEncoded(key),
+    }
 
+"""
+Stores the program loaded by the request to the cache of the daemon
+and returns the response without it, which is sent to the client.
+"""
+def completeDaemonRequest(response, programCache):
+    encodedInstructions = response.pop('program', None)
+    if encodedInstructions != None:
+        programCache.storeEncoded(response['key'], encodedInstructions)
+    elif response.get('key') != None:
+        programCache.touch(response['key'])
+    return response
 
-        
+"""
+Parse program arguments.
+The script is run only when it is executed, the test runner
+loads it as a module to interpret the tests in its own process.
+"""
+if __name__ == '__main__':
+    """
+    The help alone is printed without the argument parser,
+    whose modules take most of the time of printing it.
+    """
+    if sys.argv[1:] == ['--help']:
+        printHelp()
+        exit(ReturnCodes.SUCCESS)
+    
+    ap = createArgumentParser()
+    args = vars(ap.parse_args())
+    
+    if args['batch'] == None and args['daemon'] == None:
+        exit(interpret(args))
+    
+    try:
+        if args['source'] != None or args['input'] != None or args['output'] != None:
+            raise InterpretException('Cannot combine --batch or --daemon with a program', ReturnCodes.SCRIPT_PARAMETER_ERROR)
+        if args['batch'] != None:
+            timeLimit = args['batch_time_limit']
+            if timeLimit == None:
+                timeLimit = DEFAULT_BATCH_TIME_LIMIT
+            elif timeLimit <= 0:
+                raise InterpretException('--batch-time-limit must be positive', ReturnCodes.SCRIPT_PARAMETER_ERROR)
+            exit(runBatch(ap, args['batch'], args['batch_report'], timeLimit))
+        from interpret.daemon import InterpretDaemon
+        timeLimit = args['daemon_time_limit']
+        if timeLimit == None:
+            timeLimit = InterpretDaemon.DEFAULT_TIME_LIMIT
+        elif timeLimit <= 0:
+            raise InterpretException('--daemon-time-limit must be positive', ReturnCodes.SCRIPT_PARAMETER_ERROR)
+        from interpret.programCache import MemoryProgramCache
+        maximumPrograms = args['daemon_programs']
+        if maximumPrograms == None:
+            maximumPrograms = MemoryProgramCache.DEFAULT_MAXIMUM_PROGRAMS
+        programCache = MemoryProgramCache(maximumPrograms)
+        InterpretDaemon(args['daemon'], lambda request: runDaemonRequest(ap, request, programCache),
+                        lambda response: completeDaemonRequest(response, programCache), timeLimit).serveForever()
+    except InterpretException as ex:
+        print(ex.args[0], file=sys.stderr)
+        exit(ex.args[1])
@@ -1,10 +1,77 @@
-from .variable import *
-from .processor import *
-from .framemodel import *
-from .frame import *
-from .instruction import *
-from .program import *
-from .argument import *
-from .operand import *
-from .return_codes import *
-from .instructionCounter import *
\ No newline at end of file
+import importlib
+
+"""
+The package exports the names of its modules, but a module is imported
+only when one of its names is used for the first time. A run of the
+interpret needs just a few of the modules, so the others, such as
+the daemon or the profilers, don't slow down its start.
+
+The names are listed by their modules. The classes of the opcodes
+are registered in instructionClasses and they are available
+from the interpret.processor module, as is its Instruction base class,
+whose name is exported for the instruction of the loaded program.
+tests/python/test_exports.py checks the table against the modules.
+"""
+EXPORTS = {
+    'variable': ('FrameVariable', 'CountedFrameVariable'),
+    'processor': (
+        'Processor', 'instructionClasses', 'registerOpcode', 'JumpingInstruction', 'StackInstruction',
+        'UnaryStackInstruction', 'BinaryStackInstruction', 'ArithmeticInstruction', 'RelationalInstruction',
+        'concatenate', 'setCharacter'),
+    'framemodel': ('FrameModel', 'CountedFrameModel'),
+    'frame': ('Frame',),
+    'instruction': ('Instruction',),
+    'program': ('Program',),
+    'argument': ('Argument',),
+    'operand': (
+        'NIL_TYPE', 'INT_TYPE', 'FLOAT_TYPE', 'STRING_TYPE', 'BOOL_TYPE', 'TYPE_NAMES', 'OperandFactory', 'Operand',
+        'LabelOperand', 'TypeOperand', 'SymbolOperand', 'ConstantOperand', 'NIL_OPERAND', 'VariableOperand',
+        'GlobalVariableOperand'),
+    'return_codes': ('ReturnCodes', 'InterpretException'),
+    'instructionCounter': ('InstructionCounter', 'CountedCallStack'),
+    'programCache': (
+        'ProgramCache', 'MemoryProgramCache', 'getProgramKey', 'encodeInstructions', 'decodeInstructions',
+        'encodeOperand'),
+    'closureEngine': ('ClosureEngine', 'ConstantCell', 'raiseArithmeticTypeError'),
+    'transpiler': ('Transpiler', 'Symbol', 'Destination', 'readValue'),
+    'fusion': ('InstructionFusion', 'FusedInstruction', 'FusedSequence', 'FusedStackOperation', 'FusedCompareAndBranch'),
+    'optimizer': ('Optimizer',),
+    'outputWriter': ('OutputWriter',),
+    'inputReader': ('InputReader',),
+    'typeInference': (
+        'TypeInference', 'getCharacter', 'toCharacter', 'SpecializedInstruction', 'UncheckedUnaryOperation',
+        'UncheckedBinaryOperation', 'UncheckedDivision', 'UncheckedConcat', 'UncheckedSetchar',
+        'UncheckedConditionalJump'),
+    'dataStack': ('DataStack', 'CountedDataStack', 'raiseEmptyStack'),
+    'stringBuffer': ('StringBuffer',),
+    'profiler': (
+        'ProfilingInstructionCounter', 'formatEntry', 'PROGRAM_LABEL', 'CallNode', 'CallProfilingInstructionCounter',
+        'walkTree', 'summarizeFunctions'),
+    'statistics': (
+        'statisticsCollectors', 'registerCollector', 'PHASES', 'Statistics', 'StatisticsCollector',
+        'ExecutedInstructionsCollector', 'MaximumVariablesCollector', 'MaximumStackDepthCollector',
+        'MaximumCallDepthCollector', 'MaximumLocalFramesCollector', 'OutputBytesCollector', 'PeakMemoryCollector',
+        'PhaseTimesCollector'),
+    'daemon': ('MESSAGE_HEADER', 'sendMessage', 'receiveMessage', 'receiveExactly', 'InterpretDaemon', 'getErrorResponse'),
+}
+
+"""
+The modules of the exported names indexed by the names.
+"""
+exportedModules = { name: module for module, names in EXPORTS.items() for name in names }
+
+__all__ = list(exportedModules)
+
+"""
+Imports the module of the requested name and stores the name
+in the package, so the module is looked up only once.
+"""
+def __getattr__(name):
+    if name not in exportedModules:
+        raise AttributeError(F"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module('.' + exportedModules[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(exportedModules))
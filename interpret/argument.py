@@ -2,9 +2,12 @@
 """
 The Argument class represents a single argument of an instruction.
 It holds a type and a value of the argument.
+The value is a string from the source, or an already cast value 
+if decoded is True.
 """
 class Argument:
     
-    def __init__(self, type, value):
+    def __init__(self, type, value, decoded = False):
         self.type = type
         self.value = value
+        self.decoded = decoded
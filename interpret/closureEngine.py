@@ -0,0 +1,521 @@
+from .processor import *
+from .operand import *
+from .return_codes import *
+import operator
+
+"""
+The ClosureEngine is an alternative to the execution loop of the Processor.
+
+Before running, every loaded instruction is compiled into a closure
+with its operands, frame accessors and jump targets already resolved.
+A closure gets the index of the following instruction and returns
+the index of the instruction to be executed next, so the program
+counter is a plain local integer of the execution loop.
+
+Instructions without a specialized closure are executed by their
+execute method. The engine produces the same output, errors and
+statistics as the Processor.
+"""
+class ClosureEngine:
+
+    def __init__(self, processor):
+        self.__processor = processor
+        self.__frameModel = processor.frameModel
+        self.__instructionCounter = processor.instructionCounter
+        self.__compilers = {
+            DefvarInstruction: self.__compileDefvar,
+            MoveInstruction: self.__compileMove,
+            WriteInstruction: self.__compileWrite,
+            CreateframeInstruction: self.__compileCreateframe,
+            PushframeInstruction: self.__compilePushframe,
+            PopframeInstruction: self.__compilePopframe,
+            CallInstruction: self.__compileCall,
+            ReturnInstruction: self.__compileReturn,
+            LabelInstruction: self.__compileLabel,
+            JumpInstruction: self.__compileJump,
+            JumpifeqInstruction: self.__compileJumpifeq,
+            JumpifneqInstruction: self.__compileJumpifeq,
+            JumpifeqsInstruction: self.__compileJumpifeqs,
+            JumpifneqsInstruction: self.__compileJumpifeqs,
+            ExitInstruction: self.__compileExit,
+            ConcatInstruction: self.__compileConcat,
+            StrlenInstruction: self.__compileStrlen,
+            GetcharInstruction: self.__compileGetchar,
+            SetcharInstruction: self.__compileSetchar,
+            AddInstruction: self.__compileArithmetic,
+            SubInstruction: self.__compileArithmetic,
+            MulInstruction: self.__compileArithmetic,
+            IdivInstruction: self.__compileDivision,
+            DivInstruction: self.__compileDivision,
+            LtInstruction: self.__compileRelational,
+            GtInstruction: self.__compileRelational,
+            EqInstruction: self.__compileRelational,
+            AndInstruction: self.__compileLogical,
+            OrInstruction: self.__compileLogical,
+            NotInstruction: self.__compileNot,
+            PushsInstruction: self.__compilePushs,
+            PopsInstruction: self.__compilePops,
+            AddsInstruction: self.__compileStackArithmetic,
+            SubsInstruction: self.__compileStackArithmetic,
+            MulsInstruction: self.__compileStackArithmetic,
+        }
+
+    """
+    Compiles the loaded instructions of the processor and executes them.
+    """
+    def run(self):
+        steps = self.compile(self.__processor.instructions)
+        count = len(steps)
+        executed = 0
+        pc = 0
+        try:
+            while pc < count:
+                pc = steps[pc](pc + 1)
+                executed += 1
+        finally:
+            self.__instructionCounter.executedInstructions += executed
+
+    """
+    Returns a list of closures of the given instructions.
+    """
+    def compile(self, instructions):
+        self.__end = len(instructions)
+        steps = []
+        for instruction in instructions:
+            compiler = self.__compilers.get(type(instruction), self.__compileGeneric)
+            steps.append(compiler(instruction))
+        return steps
+
+    """
+    Executes the instruction by its execute method.
+    Used for instructions which don't change the program counter.
+    """
+    def __compileGeneric(self, instruction):
+        execute = instruction.execute
+        def step(nextPc):
+            execute()
+            return nextPc
+        return step
+
+    """
+    Returns a function returning an object with value and type
+    of the symbol operand. A variable is looked up in its frame
+    when the function is called.
+    """
+    def __compileSymbol(self, operand):
+        if isinstance(operand, VariableOperand):
+            return operand.getVariable
+        constant = ConstantCell(operand.getValue(), operand.getType())
+        return lambda: constant
+
+    """
+    Returns a function returning the jump target of the label,
+    which raises an exception if the label doesn't exist.
+    """
+    def __compileTarget(self, labelOperand, message):
+        labels = self.__instructionCounter.labels
+        label = labelOperand.getValue()
+        if label in labels:
+            target = labels[label]
+            return lambda: target
+        def undefinedLabel():
+            raise InterpretException(message, ReturnCodes.SEMANTIC_ERROR)
+        return undefinedLabel
+
+    def __compileDefvar(self, instruction):
+        operand = instruction.operands[0]
+        defineVariable = self.__frameModel.defineVariable
+        frameName = operand.frameName
+        identifier = operand.identifier
+        def defvar(nextPc):
+            defineVariable(frameName, identifier)
+            return nextPc
+        return defvar
+
+    def __compileMove(self, instruction):
+        destination = instruction.operands[0].getVariable
+        source = self.__compileSymbol(instruction.operands[1])
+        def move(nextPc):
+            variable = destination()
+            symbol = source()
+            if symbol.type == None:
+                raise InterpretException("Missing value in operand", ReturnCodes.MISSING_VALUE)
+            variable.set(symbol.getValue(), symbol.type)
+            return nextPc
+        return move
+
+    def __compileWrite(self, instruction):
+        source = self.__compileSymbol(instruction.operands[0])
+        output = self.__processor.outputWriter.write
+        def write(nextPc):
+            symbol = source()
+            type = symbol.type
+            if type == None:
+                raise InterpretException("Missing value in operand", ReturnCodes.MISSING_VALUE)
+            if type is INT_TYPE:
+                output(str(symbol.value))
+            elif type is STRING_TYPE:
+                output(symbol.getValue())
+            elif type is BOOL_TYPE:
+                output('true' if symbol.value else 'false')
+            elif type is FLOAT_TYPE:
+                output(symbol.value.hex())
+            elif type is not NIL_TYPE:
+                raise InterpretException("WRITE: Invalid argument type", ReturnCodes.INVALID_INPUT)
+            return nextPc
+        return write
+
+    def __compileCreateframe(self, instruction):
+        resetTemporaryFrame = self.__frameModel.resetTemporaryFrame
+        def createframe(nextPc):
+            resetTemporaryFrame()
+            return nextPc
+        return createframe
+
+    def __compilePushframe(self, instruction):
+        pushTempFrameToLocalFrameStack = self.__frameModel.pushTempFrameToLocalFrameStack
+        def pushframe(nextPc):
+            pushTempFrameToLocalFrameStack()
+            return nextPc
+        return pushframe
+
+    def __compilePopframe(self, instruction):
+        popFromLocalFrameStackToTempFrame = self.__frameModel.popFromLocalFrameStackToTempFrame
+        def popframe(nextPc):
+            popFromLocalFrameStackToTempFrame()
+            return nextPc
+        return popframe
+
+    def __compileCall(self, instruction):
+        callStack = self.__instructionCounter.callStack
+        target = self.__compileTarget(instruction.operands[0], 'Label doesnt exist')
+        def call(nextPc):
+            callStack.append(nextPc)
+            return target()
+        return call
+
+    def __compileReturn(self, instruction):
+        callStack = self.__instructionCounter.callStack
+        def return_(nextPc):
+            if len(callStack) == 0:
+                raise InterpretException('Callstack is empty', ReturnCodes.MISSING_VALUE)
+            return callStack.pop()
+        return return_
+
+    def __compileLabel(self, instruction):
+        return lambda nextPc: nextPc
+
+    def __compileJump(self, instruction):
+        target = self.__compileTarget(instruction.operands[0], 'Label doesnt exist')
+        return lambda nextPc: target()
+
+    """
+    Compiles JUMPIFEQ and JUMPIFNEQ.
+    """
+    def __compileJumpifeq(self, instruction):
+        jumpIfEqual = isinstance(instruction, JumpifeqInstruction)
+        name = instruction.opcode
+        target = self.__compileTarget(instruction.operands[0], 'Undefined label')
+        source1 = self.__compileSymbol(instruction.operands[1])
+        source2 = self.__compileSymbol(instruction.operands[2])
+        def jumpifeq(nextPc):
+            symbol1 = source1()
+            if symbol1.type == None:
+                raise InterpretException("Missing value in operand", ReturnCodes.MISSING_VALUE)
+            symbol2 = source2()
+            if symbol2.type == None:
+                raise InterpretException("Missing value in operand", ReturnCodes.MISSING_VALUE)
+            type1 = symbol1.type
+            type2 = symbol2.type
+            jumpTo = target()
+            if type1 is not type2 and type1 is not NIL_TYPE and type2 is not NIL_TYPE:
+                raise InterpretException(F'{name}: Types differ', ReturnCodes.BAD_OPERANDS)
+            if (symbol1.getValue() == symbol2.getValue()) == jumpIfEqual:
+                return jumpTo
+            return nextPc
+        return jumpifeq
+
+    """
+    Compiles JUMPIFEQS and JUMPIFNEQS.
+    """
+    def __compileJumpifeqs(self, instruction):
+        jumpIfEqual = isinstance(instruction, JumpifeqsInstruction)
+        name = instruction.opcode
+        popFromStack = self.__processor.dataStack.pop
+        target = self.__compileTarget(instruction.operands[0], 'Undefined label')
+        def jumpifeqs(nextPc):
+            value2, type2 = popFromStack()
+            value1, type1 = popFromStack()
+            jumpTo = target()
+            if type1 is not type2 and type1 is not NIL_TYPE and type2 is not NIL_TYPE:
+                raise InterpretException(F'{name}: Types differ', ReturnCodes.BAD_OPERANDS)
+            if (value1 == value2) == jumpIfEqual:
+                return jumpTo
+            return nextPc
+        return jumpifeqs
+
+    def __compileExit(self, instruction):
+        source = self.__compileSymbol(instruction.operands[0])
+        stop = self.__processor.stop
+        end = self.__end
+        def exit(nextPc):
+            symbol = source()
+            if symbol.type == None:
+                raise InterpretException("Missing value in operand", ReturnCodes.MISSING_VALUE)
+            if symbol.type is not INT_TYPE:
+                raise InterpretException('EXIT: Invalid exit code operand', ReturnCodes.BAD_OPERANDS)
+            exitCode = symbol.value
+            if exitCode < 0 or exitCode > 49:
+                raise InterpretException('EXIT: Invalid exit code', ReturnCodes.BAD_OPERAND_VALUE)
+            stop(exitCode)
+            return end
+        return exit
+
+    """
+    Returns a function returning values of the symbols which raises
+    an exception if any of the symbols has no value.
+    """
+    def __compileValues(self, operands):
+        sources = [self.__compileSymbol(operand) for operand in operands]
+        def values():
+            result = []
+            for source in sources:
+                symbol = source()
+                if symbol.type == None:
+                    raise InterpretException("Missing value in operand", ReturnCodes.MISSING_VALUE)
+                result.append(symbol)
+            return result
+        return values
+
+    def __compileConcat(self, instruction):
+        destination = instruction.operands[0].getVariable
+        values = self.__compileValues(instruction.operands[1:])
+        def concat(nextPc):
+            symbol1, symbol2 = values()
+            variable = destination()
+            if symbol1.type is not STRING_TYPE or symbol2.type is not STRING_TYPE:
+                raise InterpretException("CONCAT: Invalid operand types", ReturnCodes.BAD_OPERANDS)
+            if symbol1 is variable:
+                concatenate(variable, variable.getString(), symbol2.getValue())
+            else:
+                variable.set(symbol1.getValue() + symbol2.getValue(), STRING_TYPE)
+            return nextPc
+        return concat
+
+    def __compileStrlen(self, instruction):
+        destination = instruction.operands[0].getVariable
+        values = self.__compileValues(instruction.operands[1:])
+        def strlen(nextPc):
+            symbol, = values()
+            variable = destination()
+            if symbol.type is not STRING_TYPE:
+                raise InterpretException("STRLEN: Invalid operand types", ReturnCodes.BAD_OPERANDS)
+            variable.set(len(symbol.getString()), INT_TYPE)
+            return nextPc
+        return strlen
+
+    def __compileGetchar(self, instruction):
+        destination = instruction.operands[0].getVariable
+        values = self.__compileValues(instruction.operands[1:])
+        def getchar(nextPc):
+            string, index = values()
+            variable = destination()
+            if index.type is not INT_TYPE or string.type is not STRING_TYPE:
+                raise InterpretException("GETCHAR: Invalid operand types", ReturnCodes.BAD_OPERANDS)
+            value = string.getString()
+            if index.value < 0 or index.value >= len(value):
+                raise InterpretException("GETCHAR: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
+            variable.set(value[index.value], STRING_TYPE)
+            return nextPc
+        return getchar
+
+    def __compileSetchar(self, instruction):
+        destination = instruction.operands[0].getVariable
+        values = self.__compileValues(instruction.operands)
+        def setchar(nextPc):
+            string, index, source = values()
+            variable = destination()
+            if string.type is not STRING_TYPE or index.type is not INT_TYPE or source.type is not STRING_TYPE:
+                raise InterpretException("SETCHAR: Invalid operand types", ReturnCodes.BAD_OPERANDS)
+            position = index.value
+            value = string.getString()
+            character = source.getString()
+            if position < 0 or position >= len(value) or len(character) == 0:
+                raise InterpretException("SETCHAR: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
+            setCharacter(variable, value, position, character[0])
+            return nextPc
+        return setchar
+
+    """
+    Compiles ADD, SUB and MUL.
+    """
+    def __compileArithmetic(self, instruction):
+        operation = { AddInstruction: operator.add,
+                      SubInstruction: operator.sub,
+                      MulInstruction: operator.mul }[type(instruction)]
+        destination = instruction.operands[0].getVariable
+        source1 = self.__compileSymbol(instruction.operands[1])
+        source2 = self.__compileSymbol(instruction.operands[2])
+        def arithmetic(nextPc):
+            symbol1 = source1()
+            symbol2 = source2()
+            type1 = symbol1.type
+            if type1 is not symbol2.type or (type1 is not INT_TYPE and type1 is not FLOAT_TYPE):
+                raiseArithmeticTypeError(type1, symbol2.type)
+            value = operation(symbol1.value, symbol2.value)
+            destination().set(value, type1)
+            return nextPc
+        return arithmetic
+
+    """
+    Compiles IDIV and DIV.
+    """
+    def __compileDivision(self, instruction):
+        if isinstance(instruction, IdivInstruction):
+            operation, resultType = operator.floordiv, INT_TYPE
+        else:
+            operation, resultType = operator.truediv, FLOAT_TYPE
+        name = instruction.opcode
+        destination = instruction.operands[0].getVariable
+        source1 = self.__compileSymbol(instruction.operands[1])
+        source2 = self.__compileSymbol(instruction.operands[2])
+        def division(nextPc):
+            symbol1 = source1()
+            symbol2 = source2()
+            type1 = symbol1.type
+            if type1 is not symbol2.type or (type1 is not INT_TYPE and type1 is not FLOAT_TYPE):
+                raiseArithmeticTypeError(type1, symbol2.type)
+            if symbol2.value == 0:
+                raise InterpretException(F"{name}: Cannot divide by 0", ReturnCodes.BAD_OPERAND_VALUE)
+            if type1 is not resultType:
+                raise InterpretException(F"{name}: Invalid operand types", ReturnCodes.BAD_OPERANDS)
+            destination().set(operation(symbol1.value, symbol2.value), resultType)
+            return nextPc
+        return division
+
+    """
+    Compiles LT, GT and EQ.
+    """
+    def __compileRelational(self, instruction):
+        operation = { LtInstruction: operator.lt,
+                      GtInstruction: operator.gt,
+                      EqInstruction: operator.eq }[type(instruction)]
+        allowNil = isinstance(instruction, EqInstruction)
+        name = instruction.opcode
+        destination = instruction.operands[0].getVariable
+        source1 = self.__compileSymbol(instruction.operands[1])
+        source2 = self.__compileSymbol(instruction.operands[2])
+        def relational(nextPc):
+            symbol1 = source1()
+            symbol2 = source2()
+            type1 = symbol1.type
+            type2 = symbol2.type
+            if type1 == None or type2 == None:
+                raise InterpretException("Relational inst: Missing value in operand", ReturnCodes.MISSING_VALUE)
+            if type1 is NIL_TYPE or type2 is NIL_TYPE:
+                if not allowNil:
+                    raise InterpretException(F"{name}: Invalid operand types", ReturnCodes.BAD_OPERANDS)
+            elif type1 is not type2:
+                raise InterpretException("Relational inst: Invalid operand types", ReturnCodes.BAD_OPERANDS)
+            destination().set(operation(symbol1.getValue(), symbol2.getValue()), BOOL_TYPE)
+            return nextPc
+        return relational
+
+    """
+    Compiles AND and OR.
+    """
+    def __compileLogical(self, instruction):
+        isAnd = isinstance(instruction, AndInstruction)
+        name = instruction.opcode
+        destination = instruction.operands[0].getVariable
+        values = self.__compileValues(instruction.operands[1:])
+        def logical(nextPc):
+            symbol1, symbol2 = values()
+            if symbol1.type is not BOOL_TYPE or symbol2.type is not BOOL_TYPE:
+                raise InterpretException(F"{name}: Invalid operand types", ReturnCodes.BAD_OPERANDS)
+            if isAnd:
+                result = symbol1.value and symbol2.value
+            else:
+                result = symbol1.value or symbol2.value
+            destination().set(result, BOOL_TYPE)
+            return nextPc
+        return logical
+
+    def __compileNot(self, instruction):
+        destination = instruction.operands[0].getVariable
+        values = self.__compileValues(instruction.operands[1:])
+        def not_(nextPc):
+            symbol, = values()
+            if symbol.type is not BOOL_TYPE:
+                raise InterpretException("NOT: Invalid operand types", ReturnCodes.BAD_OPERANDS)
+            destination().set(not symbol.value, BOOL_TYPE)
+            return nextPc
+        return not_
+
+    def __compilePushs(self, instruction):
+        pushToStack = self.__processor.dataStack.push
+        source = self.__compileSymbol(instruction.operands[0])
+        def pushs(nextPc):
+            symbol = source()
+            if symbol.type == None:
+                raise InterpretException("Missing value in operand", ReturnCodes.MISSING_VALUE)
+            pushToStack(symbol.getValue(), symbol.type)
+            return nextPc
+        return pushs
+
+    def __compilePops(self, instruction):
+        if not isinstance(instruction.operands[0], VariableOperand):
+            return self.__compileGeneric(instruction)
+        popFromStack = self.__processor.dataStack.pop
+        destination = instruction.operands[0].getVariable
+        def pops(nextPc):
+            variable = destination()
+            value, type = popFromStack()
+            variable.set(value, type)
+            return nextPc
+        return pops
+
+    """
+    Compiles ADDS, SUBS and MULS.
+    """
+    def __compileStackArithmetic(self, instruction):
+        operation = { AddsInstruction: operator.add,
+                      SubsInstruction: operator.sub,
+                      MulsInstruction: operator.mul }[type(instruction)]
+        name = instruction.opcode
+        pushToStack = self.__processor.dataStack.push
+        popFromStack = self.__processor.dataStack.pop
+        def stackArithmetic(nextPc):
+            value2, type2 = popFromStack()
+            value1, type1 = popFromStack()
+            if type1 is not type2 or (type1 is not INT_TYPE and type2 is not FLOAT_TYPE):
+                raise InterpretException(F"{name}: Invalid operand types", ReturnCodes.BAD_OPERANDS)
+            pushToStack(operation(value1, value2), type1)
+            return nextPc
+        return stackArithmetic
+
+"""
+ConstantCell holds value and type of a constant operand
+the same way a FrameVariable holds them for a variable.
+"""
+class ConstantCell:
+
+    __slots__ = ('value', 'type')
+
+    def __init__(self, value, type):
+        self.value = value
+        self.type = type
+
+    def getValue(self):
+        return self.value
+
+    def getString(self):
+        return self.value
+
+"""
+Raises the exception of ArithmeticInstruction for invalid operand types.
+"""
+def raiseArithmeticTypeError(type1, type2):
+    if type1 == None or type2 == None:
+        raise InterpretException("ARITHMETIC: Missing value in operand", ReturnCodes.MISSING_VALUE)
+    raise InterpretException("ARITHMETIC: Invalid operand types", ReturnCodes.BAD_OPERANDS)
@@ -0,0 +1,193 @@
+from .return_codes import *
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+
+"""
+The daemon and its client exchange json objects over a Unix domain
+socket. Every message is prefixed by its length as a 4 byte unsigned
+integer in the network byte order. A client sends one request
+and receives one response per connection.
+"""
+MESSAGE_HEADER = struct.Struct('!I')
+
+"""
+Sends the message to the connected socket.
+"""
+def sendMessage(connection, message):
+    data = json.dumps(message).encode('utf-8')
+    connection.sendall(MESSAGE_HEADER.pack(len(data)) + data)
+
+"""
+Receives a message from the connected socket.
+Returns None if the connection was closed before the whole message was received.
+"""
+def receiveMessage(connection):
+    header = receiveExactly(connection, MESSAGE_HEADER.size)
+    if header == None:
+        return None
+    data = receiveExactly(connection, MESSAGE_HEADER.unpack(header)[0])
+    if data == None:
+        return None
+    return json.loads(data.decode('utf-8'))
+
+def receiveExactly(connection, size):
+    parts = []
+    while size > 0:
+        part = connection.recv(min(size, 1024 * 1024))
+        if len(part) == 0:
+            return None
+        parts.append(part)
+        size -= len(part)
+    return b''.join(parts)
+
+"""
+The InterpretDaemon serves requests to run programs on a Unix domain socket.
+
+The requests are served one by one. Every request is run by runRequest,
+a function which returns the response to the given request, in a forked
+child process, so the program of the request cannot change the daemon.
+A child which doesn't respond in timeLimit seconds is killed and the
+client gets an error response. The response of the child is passed
+to completeRequest in the daemon, which returns the response sent
+to the client, so the daemon can keep what the child has learned,
+such as a loaded program.
+
+A request with "shutdown" stops the daemon, so does the SIGTERM signal.
+The socket is removed when the daemon stops.
+"""
+class InterpretDaemon:
+
+    REQUEST_TIMEOUT = 30
+    DEFAULT_TIME_LIMIT = 60
+
+    def __init__(self, socketPath, runRequest, completeRequest = None, timeLimit = DEFAULT_TIME_LIMIT):
+        self.__socketPath = socketPath
+        self.__runRequest = runRequest
+        self.__completeRequest = completeRequest
+        self.__timeLimit = timeLimit
+
+    """
+    Listens on the socket and serves requests until the daemon is stopped.
+    """
+    def serveForever(self):
+        server = self.__listen()
+        signal.signal(signal.SIGTERM, lambda signalNumber, frame: sys.exit(ReturnCodes.SUCCESS))
+        try:
+            while self.__serveConnection(server):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            os.remove(self.__socketPath)
+
+    """
+    Binds the socket. A socket left by a daemon which no longer
+    runs is replaced, a socket of a running daemon is not.
+    """
+    def __listen(self):
+        if os.path.exists(self.__socketPath):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.__socketPath)
+            except OSError:
+                os.remove(self.__socketPath)
+            else:
+                raise InterpretException('The daemon is already running', ReturnCodes.SCRIPT_PARAMETER_ERROR)
+            finally:
+                probe.close()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(self.__socketPath)
+            server.listen()
+        except OSError:
+            server.close()
+            raise InterpretException('Cannot create the socket', ReturnCodes.OUTPUT_FILE_ERROR)
+        return server
+
+    """
+    Serves a request of the next connection.
+    Returns False if the request stops the daemon.
+    A client which fails to send its request or receive the response
+    in REQUEST_TIMEOUT seconds doesn't stop the daemon.
+    """
+    def __serveConnection(self, server):
+        connection, _ = server.accept()
+        with connection:
+            try:
+                connection.settimeout(self.REQUEST_TIMEOUT)
+                request = receiveMessage(connection)
+                if request == None:
+                    return True
+                if isinstance(request, dict) and request.get('shutdown'):
+                    sendMessage(connection, { 'rc': ReturnCodes.SUCCESS })
+                    return False
+                sendMessage(connection, self.__getResponse(request))
+            except (OSError, ValueError):
+                pass
+        return True
+
+    def __getResponse(self, request):
+        if not isinstance(request, dict):
+            return getErrorResponse('Invalid request: the request is not an object')
+        response = self.__runChild(request)
+        if self.__completeRequest != None:
+            response = self.__completeRequest(response)
+        return response
+
+    """
+    Runs the request in a forked child process and returns its response.
+    The child sends the response over a socket pair and exits.
+    The child is killed when the response is received, so no child
+    outlives its request, even if the daemon is stopped meanwhile.
+    """
+    def __runChild(self, request):
+        parentSocket, childSocket = socket.socketpair()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                parentSocket.close()
+                self.__serveChild(childSocket, request)
+            childSocket.close()
+            try:
+                parentSocket.settimeout(self.__timeLimit)
+                response = receiveMessage(parentSocket)
+            except socket.timeout:
+                response = getErrorResponse(F"Time limit of {self.__timeLimit} s exceeded")
+            except (OSError, ValueError):
+                response = None
+            finally:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+        finally:
+            parentSocket.close()
+            childSocket.close()
+        if response == None:
+            return getErrorResponse('The program of the request crashed')
+        return response
+
+    """
+    Runs the request in the child process. The child never returns,
+    so it doesn't run the cleanup of the daemon, and it is terminated
+    by SIGTERM instead of stopping the daemon.
+    """
+    def __serveChild(self, childSocket, request):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        try:
+            try:
+                response = self.__runRequest(request)
+            except Exception as ex:
+                response = getErrorResponse(F"Invalid request: {ex}")
+            sendMessage(childSocket, response)
+        finally:
+            os._exit(ReturnCodes.SUCCESS)
+
+"""
+Returns the response of a request which failed with the message.
+"""
+def getErrorResponse(message):
+    return { 'rc': ReturnCodes.INTERNAL_ERROR, 'stdout': '', 'stderr': F"{message}\n" }
@@ -0,0 +1,76 @@
+from .return_codes import *
+
+"""
+The DataStack holds values pushed by the stack instructions.
+
+Values and their types are kept in two parallel lists, so pushing
+a value doesn't create a tuple. The lists are never replaced, so the
+instructions may keep references to them and work with the top
+of the stack directly.
+"""
+class DataStack:
+
+    __slots__ = ('values', 'types')
+
+    def __init__(self):
+        self.values = []
+        self.types = []
+
+    """
+    Pushes the value of the given type.
+    """
+    def push(self, value, type):
+        self.values.append(value)
+        self.types.append(type)
+
+    """
+    Pops a value and returns the value and its type.
+    Raises an exception if the stack is empty.
+    """
+    def pop(self):
+        if len(self.types) == 0:
+            raiseEmptyStack()
+        return self.values.pop(), self.types.pop()
+
+    """
+    Removes all values from the stack.
+    """
+    def clear(self):
+        self.values.clear()
+        self.types.clear()
+
+    """
+    Called by instructions which push and pop values without
+    the push method, with the depth the stack would reach.
+    """
+    def noteDepth(self, depth):
+        pass
+
+"""
+The CountedDataStack is a DataStack which maintains the maximum
+number of values on the stack in maximumDepth.
+It is used only if the statistics of the stack were requested.
+"""
+class CountedDataStack(DataStack):
+
+    __slots__ = ('maximumDepth',)
+
+    def __init__(self):
+        super().__init__()
+        self.maximumDepth = 0
+
+    def push(self, value, type):
+        self.values.append(value)
+        self.types.append(type)
+        if len(self.types) > self.maximumDepth:
+            self.maximumDepth = len(self.types)
+
+    def noteDepth(self, depth):
+        if depth > self.maximumDepth:
+            self.maximumDepth = depth
+
+"""
+Raises the exception of popping a value from the empty stack.
+"""
+def raiseEmptyStack():
+    raise InterpretException('Empty data stack', ReturnCodes.MISSING_VALUE)
@@ -6,8 +6,12 @@ The Frame class represents a container for a frame.
 The frame contains variables that can be worked with.
 """
 class Frame:
+    
+    __slots__ = ('variables', 'initializedVariables')
+    
     def __init__(self):
         self.variables = {}
+        self.initializedVariables = 0
     
     """
     Adds a new variable to the frame.
@@ -23,8 +27,8 @@ class Frame:
     Raises an exception if the variable is not in the frame.
     """
     def getVariable(self, variableIdentifier):
-        if variableIdentifier in self.variables:
+        try:
             return self.variables[variableIdentifier]
-        else:
+        except KeyError:
             raise InterpretException(F"Unknown variable: {variableIdentifier}", \
                                      ReturnCodes.UKNOWN_VARIABLE)
@@ -2,17 +2,40 @@
 from .frame import *
 from .variable import *
 
+"""
+The FrameModel owns the frames and their variables.
+
+The temporary and local frames and their variables are referred to only
+by the frame model. Operands of the local and temporary frames look up
+their variables on every access and instructions don't keep the variables
+or the frames after they are executed, so a frame discarded by the frame
+model can't be reached by the program anymore and it is reused with its
+variables by the following frames. Only the variables of the global frame,
+which is never discarded, may be kept by their operands.
+"""
 class FrameModel:
     
+    MAXIMUM_POOLED_FRAMES = 1024
+    MAXIMUM_POOLED_VARIABLES = 8192
+    
     """
     Initializes a new instance of the FrameModel class.
     Creates new global frame and empty list of local frames.
+    If countVariables is True, the maximum number of initialized
+    variables is maintained in maximumVariables.
+    If poolFrames is True, discarded temporary frames and their
+    variables are kept in pools and reused by new frames and variables.
     """
-    def __init__(self):
+    def __init__(self, countVariables = False, poolFrames = True):
         self.globalFrame = Frame()
         self.localFrameStack = []
         self.temporaryFrame = None
+        self.countVariables = countVariables
+        self.initializedVariables = 0
         self.maximumVariables = 0
+        self.poolFrames = poolFrames
+        self.__framePool = []
+        self.__variablePool = []
       
     """
     Returns a variable from the frame by its frame and variable name.
@@ -21,8 +44,14 @@ class FrameModel:
     """
     def getVariable(self, variableFrameName):
         frameName, variableIdentifier = self.__parseVariableName(variableFrameName)
-        frame = self.__getFrame(frameName)
-        return frame.getVariable(variableIdentifier)
+        return self.getFrameVariable(frameName, variableIdentifier)
+    
+    """
+    Returns a variable from the frame by already parsed 
+    frame name (GF, LF or TF) and variable identifier.
+    """
+    def getFrameVariable(self, frameName, variableIdentifier):
+        return self.__getFrame(frameName).getVariable(variableIdentifier)
     
     def __parseVariableName(self, variable):
         return variable.split('@', 1)
@@ -48,15 +77,36 @@ class FrameModel:
     """
     def defvar(self, variableFrameName):
         frameName, variableIdentifier = self.__parseVariableName(variableFrameName)
+        self.defineVariable(frameName, variableIdentifier)
+    
+    """
+    Creates a new variable in the specified frame by already parsed 
+    frame name (GF, LF or TF) and variable identifier.
+    Only the counted variables refer to their frames, so ordinary
+    frames and variables don't form reference cycles.
+    """
+    def defineVariable(self, frameName, variableIdentifier):
         frame = self.__getFrame(frameName)
-        variable = FrameVariable(variableIdentifier)
+        if len(self.__variablePool) > 0:
+            variable = self.__variablePool.pop()
+            variable.name = variableIdentifier
+        elif self.countVariables:
+            variable = CountedFrameVariable(variableIdentifier, self)
+        else:
+            variable = FrameVariable(variableIdentifier)
         frame.addVariable(variable)
+        if self.countVariables:
+            variable.frame = frame
     
     """
     Creates new temporary frame.
     """
     def resetTemporaryFrame(self):
-        self.temporaryFrame = Frame()
+        self.__discardTemporaryFrame()
+        if len(self.__framePool) > 0:
+            self.temporaryFrame = self.__framePool.pop()
+        else:
+            self.temporaryFrame = Frame()
     
     """
     Takes the temporary frame and pushes it to the local frame stack.
@@ -74,36 +124,62 @@ class FrameModel:
     def popFromLocalFrameStackToTempFrame(self):
         if len(self.localFrameStack) == 0:
             raise InterpretException('Empty frame stack', ReturnCodes.INVALID_FRAME)
+        self.__discardTemporaryFrame()
         self.temporaryFrame = self.localFrameStack.pop()
         
     """
-    Counts current variables which exist in all frames.
-    If the number of variables is higher than ever before, saves the count.
+    Forgets the temporary frame and its initialized variables. 
     """
-    def updateMaximumVariables(self):
-        variablesCount = self.countInitializedVariables(self.globalFrame)
-        variablesCount += self.countInitializedVariables(self.temporaryFrame)
-        for localFrame in self.localFrameStack:
-            variablesCount += self.countInitializedVariables(localFrame)
-            
-        if self.maximumVariables < variablesCount:
-            self.maximumVariables = variablesCount
+    def __discardTemporaryFrame(self):
+        frame = self.temporaryFrame
+        if frame is not None:
+            self.initializedVariables -= frame.initializedVariables
+            self.temporaryFrame = None
+            if self.poolFrames:
+                self.__recycleFrame(frame)
     
     """
-    Counts variables in specified frame.
-    Doesn't count variables without value.
+    Puts the discarded frame and its variables to the pools.
+    Nothing but the frame model refers to a discarded frame,
+    so it can be reused right away.
     """
-    def countInitializedVariables(self, frame):
-        count = 0
-        if not isinstance(frame, Frame):
-            return count
-        for variable in frame.variables.values():
-            if variable.isInitialized():
-                count += 1
-        return count
-        
-        
-        
-        
-        
-        
\ No newline at end of file
+    def __recycleFrame(self, frame):
+        variables = frame.variables
+        if len(self.__framePool) >= self.MAXIMUM_POOLED_FRAMES or \
+           len(self.__variablePool) + len(variables) > self.MAXIMUM_POOLED_VARIABLES:
+            return
+        for variable in variables.values():
+            variable.value = None
+            variable.type = None
+            if self.countVariables:
+                variable.frame = None
+        self.__variablePool.extend(variables.values())
+        variables.clear()
+        frame.initializedVariables = 0
+        self.__framePool.append(frame)
+    
+    """
+    Called by a variable when it is assigned a value for the first time.
+    If the number of initialized variables in all frames is higher 
+    than ever before, saves the count.
+    """
+    def variableInitialized(self):
+        self.initializedVariables += 1
+        if self.maximumVariables < self.initializedVariables:
+            self.maximumVariables = self.initializedVariables
+
+"""
+The CountedFrameModel is a FrameModel which maintains the maximum
+number of local frames on the local frame stack in maximumLocalFrames.
+It is used only if the statistics of the frames were requested.
+"""
+class CountedFrameModel(FrameModel):
+
+    def __init__(self, countVariables = False, poolFrames = True):
+        super().__init__(countVariables, poolFrames)
+        self.maximumLocalFrames = 0
+
+    def pushTempFrameToLocalFrameStack(self):
+        super().pushTempFrameToLocalFrameStack()
+        if len(self.localFrameStack) > self.maximumLocalFrames:
+            self.maximumLocalFrames = len(self.localFrameStack)
@@ -0,0 +1,231 @@
+from .processor import *
+from .operand import *
+from .return_codes import *
+
+"""
+The InstructionFusion is a peephole optimization pass, which replaces
+frequent sequences of instructions by a single fused instruction.
+A fused instruction saves the dispatch of every instruction it replaces
+and passes values between them without the data stack.
+
+Fused instructions are not registered for any opcode, they are created
+only by the pass. The weight of a fused instruction is the number
+of instructions it replaces, so the statistics of executed instructions
+don't change. A sequence never contains a label, so no jump
+can target the middle of a fused instruction.
+"""
+class InstructionFusion:
+
+    def __init__(self):
+        self.__matchers = [
+            self.__matchCompareAndBranch,
+            self.__matchStackOperation,
+            self.__matchFramePrologue,
+            self.__matchDefvarMove,
+        ]
+
+    """
+    Returns a new list of instructions with the sequences replaced
+    by fused instructions.
+    instructions is a list of created instructions of the processor
+    """
+    def fuse(self, instructions):
+        fused = []
+        index = 0
+        while index < len(instructions):
+            for matcher in self.__matchers:
+                instruction = matcher(instructions, index)
+                if instruction != None:
+                    break
+            else:
+                instruction = instructions[index]
+            fused.append(instruction)
+            index += instruction.weight
+        return fused
+
+    """
+    Matches a binary stack instruction, PUSHS of a bool constant and
+    JUMPIFEQS or JUMPIFNEQS, which may be preceded by two PUSHS.
+    """
+    def __matchCompareAndBranch(self, instructions, index):
+        sources = self.__matchPushs(instructions, index, 2)
+        parts = instructions[index + len(sources):index + len(sources) + 3]
+        if len(parts) != 3 or not isinstance(parts[0], BinaryStackInstruction):
+            return None
+        if not self.__isConstantPushs(parts[1], BOOL_TYPE):
+            return None
+        if type(parts[2]) is not JumpifeqsInstruction and type(parts[2]) is not JumpifneqsInstruction:
+            return None
+        return FusedCompareAndBranch(instructions[index:index + len(sources)] + parts)
+
+    """
+    Matches two PUSHS followed by a binary stack instruction,
+    which may be followed by POPS.
+    """
+    def __matchStackOperation(self, instructions, index):
+        if len(self.__matchPushs(instructions, index, 2)) != 2:
+            return None
+        parts = instructions[index:index + 4]
+        if len(parts) < 3 or not self.__isBinaryStackOperation(parts[2]):
+            return None
+        if len(parts) < 4 or type(parts[3]) is not PopsInstruction or \
+           not isinstance(parts[3].operands[0], VariableOperand):
+            parts = parts[:3]
+        return FusedStackOperation(parts)
+
+    """
+    Matches CREATEFRAME followed by definitions and assignments
+    of variables of the temporary frame, which may end by PUSHFRAME.
+    """
+    def __matchFramePrologue(self, instructions, index):
+        if type(instructions[index]) is not CreateframeInstruction:
+            return None
+        end = index + 1
+        while end < len(instructions) and self.__isTemporaryFrameAssignment(instructions[end]):
+            end += 1
+        if end < len(instructions) and type(instructions[end]) is PushframeInstruction:
+            end += 1
+        if end - index < 2:
+            return None
+        return FusedSequence(instructions[index:end])
+
+    """
+    Matches DEFVAR followed by MOVE to the defined variable.
+    """
+    def __matchDefvarMove(self, instructions, index):
+        parts = instructions[index:index + 2]
+        if len(parts) != 2 or type(parts[0]) is not DefvarInstruction or type(parts[1]) is not MoveInstruction:
+            return None
+        if parts[0].operands[0].getFrameName() != parts[1].operands[0].getFrameName():
+            return None
+        return FusedSequence(parts)
+
+    """
+    Returns up to count PUSHS instructions starting at the index.
+    """
+    def __matchPushs(self, instructions, index, count):
+        parts = []
+        for instruction in instructions[index:index + count]:
+            if type(instruction) is not PushsInstruction:
+                break
+            parts.append(instruction)
+        return parts if len(parts) == count else []
+
+    def __isConstantPushs(self, instruction, constantType):
+        if type(instruction) is not PushsInstruction:
+            return False
+        operand = instruction.operands[0]
+        return isinstance(operand, ConstantOperand) and operand.getType() is constantType
+
+    """
+    Returns True if the instruction pops two values and pushes a result.
+    """
+    def __isBinaryStackOperation(self, instruction):
+        return isinstance(instruction, (BinaryStackInstruction, AddsInstruction, SubsInstruction, MulsInstruction))
+
+    def __isTemporaryFrameAssignment(self, instruction):
+        if type(instruction) is not DefvarInstruction and type(instruction) is not MoveInstruction:
+            return False
+        return instruction.operands[0].frameName == 'TF'
+
+"""
+Base class of fused instructions.
+parts are the instructions replaced by the fused instruction.
+"""
+class FusedInstruction(Instruction):
+
+    __slots__ = ('parts', 'weight')
+
+    def __init__(self, parts):
+        super().__init__([], [], parts[0].processor)
+        self.parts = parts
+        self.weight = len(parts)
+        self.order = parts[0].order
+
+    def resolveLabels(self, labels):
+        for part in self.parts:
+            part.resolveLabels(labels)
+
+"""
+Executes the instructions one by one in a single dispatch.
+"""
+class FusedSequence(FusedInstruction):
+
+    __slots__ = ('__executes',)
+
+    def __init__(self, parts):
+        super().__init__(parts)
+        self.__executes = [part.execute for part in parts]
+
+    def execute(self):
+        for execute in self.__executes:
+            execute()
+
+"""
+PUSHS, PUSHS, a binary stack instruction and an optional POPS.
+The operands are passed to the operation directly and its result
+is assigned to the variable of POPS without the data stack.
+"""
+class FusedStackOperation(FusedInstruction):
+
+    __slots__ = ('__source1', '__source2', '__evaluate', '__destination')
+
+    def __init__(self, parts):
+        super().__init__(parts)
+        self.__source1 = parts[0].operands[0]
+        self.__source2 = parts[1].operands[0]
+        self.__evaluate = parts[2].evaluate
+        self.__destination = parts[3].operands[0] if len(parts) == 4 else None
+
+    def execute(self):
+        val1 = self.__source1.getValue()
+        type1 = self.__source1.getType()
+        val2 = self.__source2.getValue()
+        type2 = self.__source2.getType()
+        dataStack = self.processor.dataStack
+        dataStack.noteDepth(len(dataStack.types) + 2)
+        result = self.__evaluate(val1, type1, val2, type2)
+        if self.__destination == None:
+            dataStack.push(*result)
+        else:
+            self.__destination.getVariable().set(*result)
+
+"""
+A binary stack instruction, PUSHS of a bool constant and
+JUMPIFEQS or JUMPIFNEQS, which may be preceded by two PUSHS.
+The result of the operation is compared with the constant directly.
+"""
+class FusedCompareAndBranch(FusedInstruction):
+
+    __slots__ = ('__sources', '__evaluate', '__constant', '__jump', '__jumpIfEqual')
+
+    def __init__(self, parts):
+        super().__init__(parts)
+        if len(parts) == 5:
+            self.__sources = (parts[0].operands[0], parts[1].operands[0])
+        else:
+            self.__sources = None
+        self.__evaluate = parts[-3].evaluate
+        self.__constant = parts[-2].operands[0].getValue()
+        self.__jump = parts[-1]
+        self.__jumpIfEqual = type(parts[-1]) is JumpifeqsInstruction
+
+    def execute(self):
+        dataStack = self.processor.dataStack
+        if self.__sources == None:
+            val2, type2 = dataStack.pop()
+            val1, type1 = dataStack.pop()
+        else:
+            source1, source2 = self.__sources
+            val1 = source1.getValue()
+            type1 = source1.getType()
+            val2 = source2.getValue()
+            type2 = source2.getType()
+            dataStack.noteDepth(len(dataStack.types) + 2)
+        result, resultType = self.__evaluate(val1, type1, val2, type2)
+
+        self.__jump.checkTarget()
+        if resultType is not BOOL_TYPE:
+            raise InterpretException(F'{self.__jump.opcode}: Types differ', ReturnCodes.BAD_OPERANDS)
+        if (result == self.__constant) == self.__jumpIfEqual:
+            self.processor.instructionCounter.jumpToTarget(self.__jump.target)
@@ -0,0 +1,74 @@
+import codecs
+import io
+
+"""
+The InputReader reads lines of the input of the program.
+
+The input is read and decoded in large blocks, and lines are taken
+from the decoded text. If translateNewlines is True, line endings are
+translated the same way as in the text mode of files, so '\\r\\n'
+and '\\r' end a line too. Otherwise, only '\\n' ends a line, which
+is how the standard input is read.
+"""
+class InputReader:
+
+    DEFAULT_BLOCK_SIZE = 64 * 1024
+
+    """
+    file is a binary file to read the input from
+    encoding and errors specify how the input is decoded
+    """
+    def __init__(self, file, encoding = 'utf-8', errors = 'strict', translateNewlines = True, blockSize = DEFAULT_BLOCK_SIZE):
+        self.__file = file
+        self.__decoder = codecs.getincrementaldecoder(encoding)(errors)
+        if translateNewlines:
+            self.__decoder = io.IncrementalNewlineDecoder(self.__decoder, True)
+        self.__blockSize = blockSize
+        self.__lines = []
+        self.__index = 0
+        self.__rest = ''
+        self.__endOfFile = False
+
+    """
+    Returns the next line without the line ending,
+    or None if there are no more lines.
+    """
+    def readLine(self):
+        index = self.__index
+        if index < len(self.__lines):
+            self.__index = index + 1
+            return self.__lines[index]
+        while not self.__endOfFile:
+            self.__readBlock()
+            if len(self.__lines) > 0:
+                self.__index = 1
+                return self.__lines[0]
+        return self.__readRest()
+
+    """
+    Splits the next block of the input into lines.
+    A block may end in the middle of a line, which is
+    completed by the following blocks.
+    """
+    def __readBlock(self):
+        block = self.__file.read1(self.__blockSize)
+        self.__endOfFile = len(block) == 0
+        self.__lines = (self.__rest + self.__decoder.decode(block, self.__endOfFile)).split('\n')
+        self.__rest = self.__lines.pop()
+        self.__index = 0
+
+    """
+    Returns the last line, which isn't ended by a line ending.
+    """
+    def __readRest(self):
+        if self.__rest == '':
+            return None
+        line = self.__rest
+        self.__rest = ''
+        return line
+
+    """
+    Closes the file the input is read from.
+    """
+    def close(self):
+        self.__file.close()
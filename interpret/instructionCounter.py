@@ -11,10 +11,12 @@ class InstructionCounter:
     
     """
     Initialize a new instrance of the InstructionCounter.
+    callStack is the list to keep the return positions in,
+    a new list is used if it is None.
     """
-    def __init__(self):
+    def __init__(self, callStack = None):
         self.__counter = 0
-        self.callStack = []
+        self.callStack = [] if callStack == None else callStack
         self.executedInstructions = 0
     
     """
@@ -24,6 +26,7 @@ class InstructionCounter:
         self.__counter = 0
         self.instructions = instructions
         self.__findLabels()
+        self.__resolveLabels()
 
     """
     Enumerates through all isntructions and 
@@ -38,6 +41,14 @@ class InstructionCounter:
                     raise InterpretException('Label already exists', ReturnCodes.SEMANTIC_ERROR)
                 labels[label] = index
         self.labels = labels
+    
+    """
+    Resolves labels of all instructions to indexes 
+    of the instructions to jump to.
+    """
+    def __resolveLabels(self):
+        for instr in self.instructions:
+            instr.resolveLabels(self.labels)
               
     """
     Moves instruction pointer by one instruction.
@@ -54,10 +65,12 @@ class InstructionCounter:
     
     """
     Executes the current instruction pointed to by instruction pointer.
+    A fused instruction is counted as all the instructions it replaces.
     """
     def executeCurrentInstruction(self):
-        self.currentInstruction.execute()
-        self.executedInstructions += 1
+        instruction = self.currentInstruction
+        instruction.execute()
+        self.executedInstructions += instruction.weight
         
     def __incrementCounter(self):
         self.__counter += 1
@@ -82,17 +95,36 @@ class InstructionCounter:
         self.__counter = self.callStack.pop()
     
     """
-    Jumps to the specified label.
-    Raises an exception if the label doesn't exist.
+    Jumps to the instruction at the index resolved from a label.
+    Raises an exception if the label doesn't exist, 
+    which is when the target is None.
     """
-    def jumpTo(self, label):
-        if not label in self.labels:
+    def jumpToTarget(self, target):
+        if target == None:
             raise InterpretException('Label doesnt exist', ReturnCodes.SEMANTIC_ERROR)
-        self.__counter = self.labels[label] 
+        self.__counter = target
         
     """
     Returns true if the given label exists, otherwise returns false.
     """
     def existsLabel(self, label):
         return label in self.labels
-    
\ No newline at end of file
+    
+"""
+The CountedCallStack is a call stack which maintains the maximum
+number of return positions in maximumDepth. All engines push
+the return positions by append, so the depth is counted for each of them.
+It is used only if the statistics of the calls were requested.
+"""
+class CountedCallStack(list):
+
+    __slots__ = ('maximumDepth',)
+
+    def __init__(self):
+        super().__init__()
+        self.maximumDepth = 0
+
+    def append(self, position):
+        super().append(position)
+        if len(self) > self.maximumDepth:
+            self.maximumDepth = len(self)
@@ -1,19 +1,37 @@
 from .return_codes import *
 import re
 
+"""
+Names of the types of values. Every type of a value is one of these
+string objects, so the types are compared by identity.
+"""
+NIL_TYPE = 'nil'
+INT_TYPE = 'int'
+FLOAT_TYPE = 'float'
+STRING_TYPE = 'string'
+BOOL_TYPE = 'bool'
+
+"""
+The type names by themselves. Looking up a type name read from a program
+returns the shared type name object.
+"""
+TYPE_NAMES = { name: name for name in (NIL_TYPE, INT_TYPE, FLOAT_TYPE, STRING_TYPE, BOOL_TYPE) }
+
 """
 OperandFactory creates an instance of an appropriate 
 argument class from a raw argument.
 """
 class OperandFactory:
     
+    CONSTANT_TYPES = TYPE_NAMES
+    
     def __init__(self, frameModel):
         self.__frameModel = frameModel
     
     """
     Creates an instance of an appropriate argument class 
     from a raw argument. Also casts the argument value based
-    on its type. 
+    on its type unless the argument has already been decoded. 
     Raises an exception if the cast fails.
     """
     def create(self, rawOperand):
@@ -25,21 +43,14 @@ class OperandFactory:
         elif operandType == 'label':
             return LabelOperand(operandValue)
         elif operandType == 'var':
+            if operandValue.startswith('GF@'):
+                return GlobalVariableOperand(operandValue, self.__frameModel)
             return VariableOperand(operandValue, self.__frameModel)
-        elif operandType == 'nil':
-            operandValue = self.__cast(operandValue, operandType)
-            return ConstantOperand(operandValue, operandType)
-        elif operandType == 'int':
-            operandValue = self.__cast(operandValue, operandType)
-            return ConstantOperand(operandValue, operandType)
-        elif operandType == 'float':
-            operandValue = self.__cast(operandValue, operandType)
-            return ConstantOperand(operandValue, operandType)
-        elif operandType == 'string':
-            operandValue = self.__cast(operandValue, operandType)
-            return ConstantOperand(operandValue, operandType)
-        elif operandType == 'bool':
-            operandValue = self.__cast(operandValue, operandType)
+        elif operandType in self.CONSTANT_TYPES:
+            if operandType == NIL_TYPE:
+                return NIL_OPERAND
+            if not rawOperand.decoded:
+                operandValue = self.__cast(operandValue, operandType)
             return ConstantOperand(operandValue, operandType)
         else:
             raise InterpretException("Invalid operand", ReturnCodes.INVALID_INPUT)
@@ -98,6 +109,8 @@ Declares an abstract getValue method.
 """
 class Operand:
 
+    __slots__ = ()
+
     def __init__(self):
         pass     
     
@@ -109,6 +122,8 @@ Operand subclass representing a label as an operand.
 """
 class LabelOperand(Operand):
     
+    __slots__ = ('__value',)
+    
     def __init__(self, value):
         self.__value = value
     
@@ -120,8 +135,10 @@ Type subclass representing a type as an operand.
 """
 class TypeOperand(Operand):
     
+    __slots__ = ('__value',)
+    
     def __init__(self, value):
-        self.__value = value
+        self.__value = TYPE_NAMES.get(value, value)
 
     def getValue(self):
         return self.__value
@@ -131,6 +148,8 @@ Symbol subclass representing a constant or variable as an operand.
 """
 class SymbolOperand(Operand):
 
+    __slots__ = ()
+
     def __init__(self):
         pass     
     
@@ -139,15 +158,26 @@ class SymbolOperand(Operand):
     """
     def getType(self):
         raise NotImplementedError('Abstract method')
+    
+    """
+    Returns the string value of the symbol, which is a StringBuffer
+    if the symbol is a buffered variable. It is used by instructions
+    which only measure or index the string, so the buffer
+    doesn't have to build the string.
+    """
+    def getString(self):
+        return self.getValue()
 
 """
 Operand subclass representing a constant as an operand.
 """
 class ConstantOperand(SymbolOperand):
 
+    __slots__ = ('__value', '__type')
+
     def __init__(self, value, type):
         self.__value = value
-        self.__type = type
+        self.__type = TYPE_NAMES[type]
 
     """
     Returns value of the constant.
@@ -161,31 +191,52 @@ class ConstantOperand(SymbolOperand):
     def getType(self):
         return self.__type
 
+"""
+The nil constant. All nil operands of a program share it.
+"""
+NIL_OPERAND = ConstantOperand(None, NIL_TYPE)
+
 """
 Operand subclass representing a variable as an operand.
+The frame name and the identifier of the variable are parsed
+only once when the operand is created.
 """
 class VariableOperand(SymbolOperand):
 
+    __slots__ = ('_frameModel', '__variableFrameName', 'frameName', 'identifier')
+
     def __init__(self, variableFrameName, frameModel):
-        self.__frameModel = frameModel
+        self._frameModel = frameModel
         self.__variableFrameName = variableFrameName
-        pass     
+        self.frameName, self.identifier = variableFrameName.split('@', 1)
+    
+    """
+    Returns the variable of the frame the operand refers to.
+    Raises an exception if the frame or the variable doesn't exist.
+    """
+    def getVariable(self):
+        return self._frameModel.getFrameVariable(self.frameName, self.identifier)
     
     """
     Returns value of the variable.
     """
     def getValue(self):
-        variable = self.__frameModel.getVariable(self.__variableFrameName)
-        if self.getType() == None:
+        variable = self.getVariable()
+        if variable.type == None:
             raise InterpretException("Missing value in operand", ReturnCodes.MISSING_VALUE)
-        return variable.value  
+        return variable.getValue()
+    
+    def getString(self):
+        variable = self.getVariable()
+        if variable.type == None:
+            raise InterpretException("Missing value in operand", ReturnCodes.MISSING_VALUE)
+        return variable.getString()
     
     """
     Returns type of the variable.
     """
     def getType(self):
-        variable = self.__frameModel.getVariable(self.__variableFrameName)
-        return variable.type
+        return self.getVariable().type
     
     
     """
@@ -194,18 +245,24 @@ class VariableOperand(SymbolOperand):
     """
     def getFrameName(self):
         return self.__variableFrameName
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
+
+"""
+VariableOperand subclass representing a variable of the global frame.
+The global frame lives as long as the program, so once the variable 
+is defined, the operand binds the FrameVariable and doesn't 
+look it up in the frame again.
+"""
+class GlobalVariableOperand(VariableOperand):
+
+    __slots__ = ('__variable',)
+
+    def __init__(self, variableFrameName, frameModel):
+        super().__init__(variableFrameName, frameModel)
+        self.__variable = None
+    
+    def getVariable(self):
+        variable = self.__variable
+        if variable is None:
+            variable = self._frameModel.globalFrame.getVariable(self.identifier)
+            self.__variable = variable
+        return variable
@@ -0,0 +1,322 @@
+from .processor import *
+from .operand import *
+from .return_codes import *
+import operator
+import sys
+
+"""
+The Optimizer simplifies the loaded instructions of the processor.
+
+The program is split into basic blocks, which start at labels and after
+jumps, and the blocks form a control-flow graph. In every block,
+variables of the global frame assigned a constant are replaced by
+the constant in the following instructions of the block, and
+instructions computing a value from constant operands are replaced
+by MOVE of the computed value. Blocks not reachable from the first
+instruction are removed.
+
+Every executed instruction is still executed once, so the statistics
+of the program don't change. An instruction which would raise
+an exception is never folded.
+"""
+class Optimizer:
+
+    """
+    Instructions which have a variable as the first operand,
+    but don't assign it.
+    """
+    READING_INSTRUCTIONS = (WriteInstruction, PushsInstruction, ExitInstruction, DprintInstruction)
+
+    ARITHMETIC_OPERATIONS = { AddInstruction: (operator.add, None),
+                              SubInstruction: (operator.sub, None),
+                              MulInstruction: (operator.mul, None),
+                              IdivInstruction: (operator.floordiv, INT_TYPE),
+                              DivInstruction: (operator.truediv, FLOAT_TYPE) }
+
+    RELATIONAL_OPERATIONS = { LtInstruction: operator.lt,
+                              GtInstruction: operator.gt,
+                              EqInstruction: operator.eq }
+
+    def __init__(self, processor):
+        self.__processor = processor
+        self.__labels = processor.instructionCounter.labels
+        self.__folders = {
+            ConcatInstruction: self.__foldConcat,
+            StrlenInstruction: self.__foldStrlen,
+            GetcharInstruction: self.__foldGetchar,
+            Stri2intInstruction: self.__foldStri2int,
+            Int2charInstruction: self.__foldInt2char,
+            Int2floatInstruction: self.__foldInt2float,
+            Float2intInstruction: self.__foldFloat2int,
+            TypeInstruction: self.__foldType,
+            AndInstruction: self.__foldLogical,
+            OrInstruction: self.__foldLogical,
+            NotInstruction: self.__foldNot,
+        }
+        for instructionClass in self.ARITHMETIC_OPERATIONS:
+            self.__folders[instructionClass] = self.__foldArithmetic
+        for instructionClass in self.RELATIONAL_OPERATIONS:
+            self.__folders[instructionClass] = self.__foldRelational
+        self.foldedInstructions = 0
+        self.propagatedConstants = 0
+        self.removedInstructions = 0
+
+    """
+    Optimizes the loaded instructions of the processor
+    and replaces them by the optimized ones.
+    """
+    def optimize(self):
+        instructions = self.__processor.instructions
+        blocks = [self.__optimizeBlock(block) for block in self.__findBlocks(instructions)]
+        reachable = self.__findReachableBlocks(blocks)
+
+        optimized = []
+        for number, block in enumerate(blocks):
+            if number in reachable:
+                optimized.extend(block)
+            else:
+                self.removedInstructions += len(block)
+        self.__processor.replaceInstructions(optimized)
+
+    """
+    Prints numbers of the optimized instructions.
+    """
+    def printReport(self, file = sys.stderr):
+        print(F"Optimizer: removed {self.removedInstructions} unreachable instructions, "
+              F"folded {self.foldedInstructions} instructions, "
+              F"propagated {self.propagatedConstants} constants", file=file)
+
+    """
+    Splits the instructions into basic blocks.
+    A block starts with the first instruction, a label
+    and an instruction following a jump.
+    """
+    def __findBlocks(self, instructions):
+        blocks = []
+        block = []
+        for instruction in instructions:
+            if isinstance(instruction, LabelInstruction) and len(block) > 0:
+                blocks.append(block)
+                block = []
+            block.append(instruction)
+            if self.__isJump(instruction):
+                blocks.append(block)
+                block = []
+        if len(block) > 0:
+            blocks.append(block)
+        return blocks
+
+    def __isJump(self, instruction):
+        return isinstance(instruction, (JumpInstruction, JumpifeqInstruction, JumpifneqInstruction,
+                                        JumpifeqsInstruction, JumpifneqsInstruction, CallInstruction,
+                                        ReturnInstruction, ExitInstruction))
+
+    """
+    Returns numbers of blocks reachable from the first block.
+    """
+    def __findReachableBlocks(self, blocks):
+        blockOfLabel = {}
+        for number, block in enumerate(blocks):
+            if isinstance(block[0], LabelInstruction):
+                blockOfLabel[block[0].operands[0].getValue()] = number
+
+        reachable = set()
+        pending = [0] if len(blocks) > 0 else []
+        while len(pending) > 0:
+            number = pending.pop()
+            if number in reachable or number >= len(blocks):
+                continue
+            reachable.add(number)
+            last = blocks[number][-1]
+            for operand in last.operands:
+                if isinstance(operand, LabelOperand) and operand.getValue() in blockOfLabel:
+                    pending.append(blockOfLabel[operand.getValue()])
+            if self.__canContinue(last):
+                pending.append(number + 1)
+        return reachable
+
+    """
+    Returns True if the instruction following the last
+    instruction of a block may be executed after it.
+    """
+    def __canContinue(self, instruction):
+        if isinstance(instruction, (JumpInstruction, ReturnInstruction, ExitInstruction)):
+            return False
+        if isinstance(instruction, (JumpifeqInstruction, JumpifneqInstruction)):
+            jumps = self.__isConstantJumpTaken(instruction)
+            return jumps != True
+        return True
+
+    """
+    Returns True if the conditional jump with constant operands
+    always jumps, False if it never jumps and None if it is unknown.
+    """
+    def __isConstantJumpTaken(self, instruction):
+        label, symbol1, symbol2 = instruction.operands
+        if not self.__areConstants([symbol1, symbol2]) or label.getValue() not in self.__labels:
+            return None
+        type1, type2 = symbol1.getType(), symbol2.getType()
+        if type1 is not type2 and type1 is not NIL_TYPE and type2 is not NIL_TYPE:
+            return None
+        equal = symbol1.getValue() == symbol2.getValue()
+        return equal == isinstance(instruction, JumpifeqInstruction)
+
+    """
+    Propagates constants of the global frame variables and folds
+    instructions in the block. Returns the optimized block.
+    """
+    def __optimizeBlock(self, block):
+        constants = {}
+        optimized = []
+        for instruction in block:
+            instruction = self.__propagateConstants(instruction, constants)
+            instruction = self.__fold(instruction)
+            self.__updateConstants(instruction, constants)
+            optimized.append(instruction)
+        return optimized
+
+    """
+    Replaces the read global variables with known constant values
+    by the constants.
+    """
+    def __propagateConstants(self, instruction, constants):
+        operands = list(instruction.operands)
+        first = 0 if isinstance(instruction, self.READING_INSTRUCTIONS) else 1
+        changed = False
+        for index in range(first, len(operands)):
+            operand = operands[index]
+            if isinstance(operand, GlobalVariableOperand) and operand.identifier in constants:
+                operands[index] = constants[operand.identifier]
+                changed = True
+                self.propagatedConstants += 1
+        if not changed:
+            return instruction
+        return self.__recreate(type(instruction), operands, instruction)
+
+    """
+    Remembers the constant assigned to a global variable by MOVE
+    and forgets the variables assigned by other instructions.
+    """
+    def __updateConstants(self, instruction, constants):
+        operands = instruction.operands
+        if len(operands) == 0 or not isinstance(operands[0], VariableOperand) or \
+           isinstance(instruction, self.READING_INSTRUCTIONS):
+            return
+        if not isinstance(operands[0], GlobalVariableOperand):
+            return
+        identifier = operands[0].identifier
+        if isinstance(instruction, MoveInstruction) and isinstance(operands[1], ConstantOperand):
+            constants[identifier] = operands[1]
+        else:
+            constants.pop(identifier, None)
+
+    """
+    Returns MOVE of the value computed by the instruction
+    if all its operands are constants and it cannot fail.
+    Otherwise, returns the instruction.
+    """
+    def __fold(self, instruction):
+        folder = self.__folders.get(type(instruction))
+        if folder == None or not self.__areConstants(instruction.operands[1:]):
+            return instruction
+        result = folder(instruction, *instruction.operands[1:])
+        if result == None:
+            return instruction
+        self.foldedInstructions += 1
+        value, resultType = result
+        return self.__recreate(MoveInstruction, [instruction.operands[0], ConstantOperand(value, resultType)], instruction)
+
+    def __areConstants(self, operands):
+        return all(isinstance(operand, ConstantOperand) for operand in operands)
+
+    """
+    Creates an instruction of the class with the given operands.
+    The instruction takes the order of the original instruction.
+    """
+    def __recreate(self, instructionClass, operands, original):
+        instruction = instructionClass(operands, self.__processor)
+        instruction.order = original.order
+        return instruction
+
+    def __foldArithmetic(self, instruction, symbol1, symbol2):
+        operation, requiredType = self.ARITHMETIC_OPERATIONS[type(instruction)]
+        type1 = symbol1.getType()
+        if type1 is not symbol2.getType() or (type1 is not INT_TYPE and type1 is not FLOAT_TYPE):
+            return None
+        if requiredType != None and (type1 != requiredType or symbol2.getValue() == 0):
+            return None
+        return operation(symbol1.getValue(), symbol2.getValue()), type1
+
+    def __foldRelational(self, instruction, symbol1, symbol2):
+        type1, type2 = symbol1.getType(), symbol2.getType()
+        if type1 is NIL_TYPE or type2 is NIL_TYPE:
+            if not isinstance(instruction, EqInstruction):
+                return None
+        elif type1 is not type2:
+            return None
+        operation = self.RELATIONAL_OPERATIONS[type(instruction)]
+        return operation(symbol1.getValue(), symbol2.getValue()), BOOL_TYPE
+
+    def __foldLogical(self, instruction, symbol1, symbol2):
+        if symbol1.getType() is not BOOL_TYPE or symbol2.getType() is not BOOL_TYPE:
+            return None
+        if isinstance(instruction, AndInstruction):
+            return symbol1.getValue() and symbol2.getValue(), BOOL_TYPE
+        return symbol1.getValue() or symbol2.getValue(), BOOL_TYPE
+
+    def __foldNot(self, instruction, symbol):
+        if symbol.getType() is not BOOL_TYPE:
+            return None
+        return not symbol.getValue(), BOOL_TYPE
+
+    def __foldConcat(self, instruction, symbol1, symbol2):
+        if symbol1.getType() is not STRING_TYPE or symbol2.getType() is not STRING_TYPE:
+            return None
+        return symbol1.getValue() + symbol2.getValue(), STRING_TYPE
+
+    def __foldStrlen(self, instruction, symbol):
+        if symbol.getType() is not STRING_TYPE:
+            return None
+        return len(symbol.getValue()), INT_TYPE
+
+    def __foldGetchar(self, instruction, string, index):
+        if not self.__isValidIndex(string, index):
+            return None
+        return string.getValue()[index.getValue()], STRING_TYPE
+
+    def __foldStri2int(self, instruction, string, index):
+        if not self.__isValidIndex(string, index):
+            return None
+        return ord(string.getValue()[index.getValue()]), INT_TYPE
+
+    def __isValidIndex(self, string, index):
+        if string.getType() is not STRING_TYPE or index.getType() is not INT_TYPE:
+            return False
+        return 0 <= index.getValue() < len(string.getValue())
+
+    def __foldInt2char(self, instruction, symbol):
+        if symbol.getType() is not INT_TYPE:
+            return None
+        try:
+            return chr(symbol.getValue()), STRING_TYPE
+        except (ValueError, OverflowError):
+            return None
+
+    def __foldInt2float(self, instruction, symbol):
+        if symbol.getType() is not INT_TYPE:
+            return None
+        try:
+            return float(symbol.getValue()), FLOAT_TYPE
+        except OverflowError:
+            return None
+
+    def __foldFloat2int(self, instruction, symbol):
+        if symbol.getType() is not FLOAT_TYPE:
+            return None
+        try:
+            return int(symbol.getValue()), INT_TYPE
+        except (ValueError, OverflowError):
+            return None
+
+    def __foldType(self, instruction, symbol):
+        return symbol.getType(), STRING_TYPE
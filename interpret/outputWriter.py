@@ -0,0 +1,70 @@
+import os
+
+"""
+The OutputWriter collects the output of the program and writes it
+to a file descriptor in large blocks.
+
+The number of bytes written so far is kept in writtenBytes.
+
+The output is written when the collected text is larger than bufferSize
+and whenever flush is called. The processor flushes the output before
+reading the input and before writing to the standard error output,
+so the program behaves the same as if it wrote its output immediately.
+
+A text which cannot be encoded raises the exception
+when it is written, not when the output is flushed.
+"""
+class OutputWriter:
+
+    DEFAULT_BUFFER_SIZE = 64 * 1024
+
+    """
+    descriptor is the file descriptor to write the output to
+    encoding and errors specify how the text is encoded
+    """
+    def __init__(self, descriptor = 1, encoding = 'utf-8', errors = 'strict', bufferSize = DEFAULT_BUFFER_SIZE):
+        self.__descriptor = descriptor
+        self.__encoding = encoding
+        self.__errors = errors
+        self.__bufferSize = bufferSize
+        self.__parts = []
+        self.__size = 0
+        self.writtenBytes = 0
+
+    """
+    Appends the text to the output.
+    """
+    def write(self, text):
+        if not text.isascii():
+            text.encode(self.__encoding, self.__errors)
+        self.__parts.append(text)
+        self.__size += len(text)
+        if self.__size >= self.__bufferSize:
+            self.flush()
+
+    """
+    Writes all collected text to the file descriptor.
+    """
+    def flush(self):
+        if self.__size == 0:
+            return
+        data = memoryview(''.join(self.__parts).encode(self.__encoding, self.__errors))
+        self.__parts = []
+        self.__size = 0
+        self.writtenBytes += len(data)
+        while len(data) > 0:
+            written = os.write(self.__descriptor, data)
+            data = data[written:]
+
+    """
+    Returns the file descriptor the output is written to.
+    """
+    def getDescriptor(self):
+        return self.__descriptor
+
+    """
+    Closes the file descriptor the output is written to.
+    The collected text has to be flushed before.
+    """
+    def close(self):
+        os.close(self.__descriptor)
@@ -2,8 +2,8 @@
 This file contains all instructions which can be executed by processor.
 All instructions inherit from Instruction class and implement an execute method.
 Running instructions is designed as a Command design pattern.
-To add new instruction, just add the new Instruction class with 
-apropriate name and no further action is needed.
+To add new instruction, just add the new Instruction class and register
+it for its opcode with the registerOpcode decorator. No further action is needed.
 
 There is more complex hierarchy of instruction classes to avoid code duplication.
 
@@ -12,12 +12,41 @@ These instructions are executed by processor at the bottom of this file.
 
 from .operand import *
 from .return_codes import *
-import fileinput
+from .outputWriter import *
+from .inputReader import *
+from .dataStack import *
+from .stringBuffer import *
 import sys
 import operator
 
+"""
+Instruction classes registered by their opcode.
+The processor creates instructions of the program by this registry.
+"""
+instructionClasses = {}
+
+"""
+Class decorator registering the decorated instruction class
+for the given opcode.
+"""
+def registerOpcode(opcode):
+    def register(instructionClass):
+        if opcode in instructionClasses:
+            raise ValueError(F"Opcode {opcode} is already registered")
+        instructionClass.opcode = opcode
+        instructionClasses[opcode] = instructionClass
+        return instructionClass
+    return register
+
 class Instruction:
     
+    __slots__ = ('operands', 'expectedOperands', 'processor', 'order')
+    
+    """
+    Number of instructions of the program executed by the instruction.
+    """
+    weight = 1
+    
     def __init__(self, operands, expectedOperands, processor):
         self.operands = operands
         self.expectedOperands = expectedOperands
@@ -33,15 +62,46 @@ class Instruction:
         
     def execute(self):
         raise NotImplementedError('Abstract method')
+    
+    """
+    Resolves label operands to indexes of instructions.
+    labels is a dictionary of labels and indexes of their instructions
+    """
+    def resolveLabels(self, labels):
+        pass
+
+"""
+Base class of instructions jumping to the label of the first operand.
+The label is resolved to the index of the instruction to jump to
+when the program is loaded. The target is None if the label doesn't exist,
+which is reported only when the instruction is executed.
+"""
+class JumpingInstruction(Instruction):
+    
+    __slots__ = ('target',)
+    
+    def resolveLabels(self, labels):
+        self.target = labels.get(self.operands[0].getValue())
+    
+    """
+    Raises an exception if the label to jump to doesn't exist.
+    """
+    def checkTarget(self):
+        if self.target == None:
+            raise InterpretException('Undefined label', ReturnCodes.SEMANTIC_ERROR)
 
 class StackInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, [], processor)
 
 
 class UnaryStackInstruction(StackInstruction):
     
+    __slots__ = ('operatorFunction', 'allowedTypes', 'resultType')
+    
     def __init__(self, operands, processor, operation):
         super().__init__(operands, processor)
         self.operatorFunction = operation[0]
@@ -49,20 +109,27 @@ class UnaryStackInstruction(StackInstruction):
         self.resultType = operation[2]
 
     def execute(self):
-        val, type = self.processor.popFromStack()
-        self.checkType(type)
-        
-        result = self.operatorFunction(val)
-        self.processor.pushToStack((result, self.resultType))
+        dataStack = self.processor.dataStack
+        values = dataStack.values
+        types = dataStack.types
+        if len(types) == 0:
+            raiseEmptyStack()
+        if types[-1] not in self.allowedTypes:
+            self.checkType(types[-1])
+        
+        values[-1] = self.operatorFunction(values[-1])
+        types[-1] = self.resultType
            
     def checkType(self, type):
         for allowedType in self.allowedTypes:
-            if type == allowedType:
+            if type is allowedType:
                 return
         raise InterpretException("UNARY STACK ISNTR: Invalid operand types", ReturnCodes.BAD_OPERANDS)
         
 class BinaryStackInstruction(StackInstruction):
     
+    __slots__ = ('operatorFunction', 'allowedTypes', 'resultType', 'allowNils')
+    
     def __init__(self, operands, processor, operation, allowNils = False):
         super().__init__(operands, processor)
         self.operatorFunction = operation[0]
@@ -70,35 +137,61 @@ class BinaryStackInstruction(StackInstruction):
         self.resultType = operation[2]
         self.allowNils = allowNils
 
+    """
+    The operands are taken from the top of the stack in place,
+    the types are fully checked only if they differ or aren't allowed.
+    """
     def execute(self):
-        val2, type2 = self.processor.popFromStack()
-        val1, type1 = self.processor.popFromStack()
-        
+        dataStack = self.processor.dataStack
+        values = dataStack.values
+        types = dataStack.types
+        if len(types) < 2:
+            raiseEmptyStack()
+        type2 = types.pop()
+        value2 = values.pop()
+        type1 = types[-1]
+        if type1 is not type2 or type1 not in self.allowedTypes:
+            self.checkTypes(type1, type2)
+        
+        values[-1] = self.operatorFunction(values[-1], value2)
+        types[-1] = self.resultType
+    
+    """
+    Returns the result and its type for the given operands.
+    """
+    def evaluate(self, val1, type1, val2, type2):
         self.checkTypes(type1, type2)
         
         result = self.operatorFunction(val1, val2)
-        self.processor.pushToStack((result, self.resultType))
+        return (result, self.resultType)
            
     def checkTypes(self, type1, type2):
-        if (self.allowNils and (type1 == 'nil' or type2 == 'nil')):
+        if (self.allowNils and (type1 is NIL_TYPE or type2 is NIL_TYPE)):
             return
         for allowedType in self.allowedTypes:
-            if type1 == allowedType and type2 == allowedType:
+            if type1 is allowedType and type2 is allowedType:
                 return
         print(F"BINARY STACK INSTR: type1: {type1}, type2: {type2}", file=sys.stderr)
         raise InterpretException("BINARY STACK INSTR: Invalid operand types", ReturnCodes.BAD_OPERANDS)
         
+@registerOpcode('DEFVAR')
 class DefvarInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
         
     def execute(self):
-        self.processor.frameModel.defvar(self.operands[0].getFrameName())
+        variableOperand = self.operands[0]
+        self.processor.frameModel.defineVariable(variableOperand.frameName, variableOperand.identifier)
 
+@registerOpcode('MOVE')
 class MoveInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
@@ -106,11 +199,14 @@ class MoveInstruction(Instruction):
     def execute(self):        
         destinationOperand = self.operands[0]
         sourceOperand = self.operands[1]
-        variable = self.processor.frameModel.getVariable(destinationOperand.getFrameName())
+        variable = destinationOperand.getVariable()
         variable.set(sourceOperand.getValue(), sourceOperand.getType())
     
+@registerOpcode('WRITE')
 class WriteInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
@@ -120,21 +216,23 @@ class WriteInstruction(Instruction):
         self.__writeValue(sourceOperand.getValue(), sourceOperand.getType())
         
     def __writeValue(self, value, type):
-        if type == 'bool':
-            print('true' if value else 'false', end='')
-        elif type == 'nil':
-            print('', end='')
-        elif type == 'float':
-            #print('float', file=sys.stderr)
-            print(value.hex(), end='')
-        elif type == 'int' or type == 'string':
-            #print('int, string', file=sys.stderr)
-            print(value, end='')
+        outputWriter = self.processor.outputWriter
+        if type is BOOL_TYPE:
+            outputWriter.write('true' if value else 'false')
+        elif type is NIL_TYPE:
+            pass
+        elif type is FLOAT_TYPE:
+            outputWriter.write(value.hex())
+        elif type is INT_TYPE or type is STRING_TYPE:
+            outputWriter.write(str(value))
         else:
             raise InterpretException("WRITE: Invalid argument type", ReturnCodes.INVALID_INPUT)
             
+@registerOpcode('READ')
 class ReadInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ SymbolOperand, TypeOperand]
         Instruction.__init__(self, operands, expectedOperands, processor)
@@ -143,31 +241,37 @@ class ReadInstruction(Instruction):
         toOperand = self.operands[0]
         typeOperand = self.operands[1]
         type = typeOperand.getValue()
-        variable = self.processor.frameModel.getVariable(toOperand.getFrameName())
+        variable = toOperand.getVariable()
+        self.processor.outputWriter.flush()
         try:
             value, type = self.__readValue(typeOperand.getValue())
         except:
             value = ''
-            type = 'nil'
+            type = NIL_TYPE
         variable.set(value, type)
     
     def __readValue(self, type):
-        value = input()
+        value = self.processor.inputReader.readLine()
+        if value == None:
+            raise EOFError()
         return self.__convertToType(value, type), type
         
     def __convertToType(self, value, type):
-        if type == 'int':
+        if type is INT_TYPE:
             return int(value)
-        if type == 'bool':
+        if type is BOOL_TYPE:
             return value.lower() == "true"
-        if type == 'float':
+        if type is FLOAT_TYPE:
             return float.fromhex(value)
-        if type == 'string':
+        if type is STRING_TYPE:
             return value
         raise InterpretException("READ: Invalid type: " + type, ReturnCodes.INVALID_INPUT)
 
+@registerOpcode('CREATEFRAME')
 class CreateframeInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = []
         Instruction.__init__(self, operands, expectedOperands, processor)
@@ -175,8 +279,11 @@ class CreateframeInstruction(Instruction):
     def execute(self):
         self.processor.frameModel.resetTemporaryFrame()
     
+@registerOpcode('PUSHFRAME')
 class PushframeInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = []
         Instruction.__init__(self, operands, expectedOperands, processor)
@@ -184,8 +291,11 @@ class PushframeInstruction(Instruction):
     def execute(self):
         self.processor.frameModel.pushTempFrameToLocalFrameStack()
 
+@registerOpcode('POPFRAME')
 class PopframeInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = []
         Instruction.__init__(self, operands, expectedOperands, processor)
@@ -193,19 +303,24 @@ class PopframeInstruction(Instruction):
     def execute(self):
         self.processor.frameModel.popFromLocalFrameStackToTempFrame()
     
-class CallInstruction(Instruction):
+@registerOpcode('CALL')
+class CallInstruction(JumpingInstruction):
+    
+    __slots__ = ()
     
     def __init__(self, operands, processor):
         expectedOperands = [ LabelOperand ]
         super().__init__(operands, expectedOperands, processor)
         
     def execute(self):
-        jumpToLabel = self.operands[0].getValue()
         self.processor.instructionCounter.pushCallstack()
-        self.processor.instructionCounter.jumpTo(jumpToLabel)
+        self.processor.instructionCounter.jumpToTarget(self.target)
    
+@registerOpcode('RETURN')
 class ReturnInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = []
         super().__init__(operands, expectedOperands, processor)
@@ -213,8 +328,11 @@ class ReturnInstruction(Instruction):
     def execute(self):
         self.processor.instructionCounter.popCallstack()
         
+@registerOpcode('LABEL')
 class LabelInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ LabelOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
@@ -222,93 +340,106 @@ class LabelInstruction(Instruction):
     def execute(self):
         pass
         
-class JumpInstruction(Instruction):
+@registerOpcode('JUMP')
+class JumpInstruction(JumpingInstruction):
+    
+    __slots__ = ()
     
     def __init__(self, operands, processor):
         expectedOperands = [ LabelOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
         
     def execute(self):
-        label = self.operands[0].getValue()
-        self.processor.instructionCounter.jumpTo(label)
+        self.processor.instructionCounter.jumpToTarget(self.target)
     
-class JumpifeqInstruction(Instruction):
+@registerOpcode('JUMPIFEQ')
+class JumpifeqInstruction(JumpingInstruction):
+    
+    __slots__ = ()
     
     def __init__(self, operands, processor):
         expectedOperands = [ LabelOperand, SymbolOperand, SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
         
     def execute(self):
-        label = self.operands[0].getValue()
         val1 = self.operands[1].getValue()
         val2 = self.operands[2].getValue()
         
         op1type = self.operands[1].getType()
         op2type = self.operands[2].getType()
         
-        self.processor.checkLabelExists(label)
-        if op1type != op2type and op1type != 'nil' and op2type != 'nil':
+        self.checkTarget()
+        if op1type is not op2type and op1type is not NIL_TYPE and op2type is not NIL_TYPE:
             raise InterpretException('JUMPIFEQ: Types differ', ReturnCodes.BAD_OPERANDS)
         if val1 == val2:
-            self.processor.instructionCounter.jumpTo(label)
+            self.processor.instructionCounter.jumpToTarget(self.target)
+    
+@registerOpcode('JUMPIFEQS')
+class JumpifeqsInstruction(JumpingInstruction):
     
-class JumpifeqsInstruction(Instruction):
+    __slots__ = ()
     
     def __init__(self, operands, processor):
         expectedOperands = [ LabelOperand ]
         super().__init__(operands, expectedOperands, processor)
         
     def execute(self):
-        val2, type2 = self.processor.popFromStack()
-        val1, type1 =  self.processor.popFromStack()
-        label = self.operands[0].getValue()
+        val2, type2 = self.processor.dataStack.pop()
+        val1, type1 =  self.processor.dataStack.pop()
         
-        self.processor.checkLabelExists(label)
-        if type1 != type2 and type1 != 'nil' and type2 != 'nil':
+        self.checkTarget()
+        if type1 is not type2 and type1 is not NIL_TYPE and type2 is not NIL_TYPE:
             raise InterpretException('JUMPIFEQS: Types differ', ReturnCodes.BAD_OPERANDS)
         if val1 == val2:
-            self.processor.instructionCounter.jumpTo(label)
+            self.processor.instructionCounter.jumpToTarget(self.target)
             
-class JumpifneqInstruction(Instruction):
+@registerOpcode('JUMPIFNEQ')
+class JumpifneqInstruction(JumpingInstruction):
+    
+    __slots__ = ()
     
     def __init__(self, operands, processor):
         expectedOperands = [ LabelOperand, SymbolOperand, SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
         
     def execute(self):
-        label = self.operands[0].getValue()
         val1 = self.operands[1].getValue()
         val2 = self.operands[2].getValue()
         
         op1type = self.operands[1].getType()
         op2type = self.operands[2].getType()
         
-        self.processor.checkLabelExists(label)
-        if op1type != op2type and op1type != 'nil' and op2type != 'nil':
+        self.checkTarget()
+        if op1type is not op2type and op1type is not NIL_TYPE and op2type is not NIL_TYPE:
             raise InterpretException('JUMPIFNEQ: Types differ', ReturnCodes.BAD_OPERANDS)
         
         if val1 != val2:
-            self.processor.instructionCounter.jumpTo(label)
+            self.processor.instructionCounter.jumpToTarget(self.target)
+    
+@registerOpcode('JUMPIFNEQS')
+class JumpifneqsInstruction(JumpingInstruction):
     
-class JumpifneqsInstruction(Instruction):
+    __slots__ = ()
     
     def __init__(self, operands, processor):
         expectedOperands = [ LabelOperand ]
         super().__init__(operands, expectedOperands, processor)
         
     def execute(self):
-        val2, type2 = self.processor.popFromStack()
-        val1, type1 =  self.processor.popFromStack()
-        label = self.operands[0].getValue()
+        val2, type2 = self.processor.dataStack.pop()
+        val1, type1 =  self.processor.dataStack.pop()
         
-        self.processor.checkLabelExists(label)
-        if type1 != type2 and type1 != 'nil' and type2 != 'nil':
+        self.checkTarget()
+        if type1 is not type2 and type1 is not NIL_TYPE and type2 is not NIL_TYPE:
             raise InterpretException('JUMPIFNEQS: Types differ', ReturnCodes.BAD_OPERANDS)
         if val1 != val2:
-            self.processor.instructionCounter.jumpTo(label)
+            self.processor.instructionCounter.jumpToTarget(self.target)
             
+@registerOpcode('EXIT')
 class ExitInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
@@ -316,7 +447,7 @@ class ExitInstruction(Instruction):
     def execute(self):
         exitCode = self.operands[0].getValue()
         
-        if self.operands[0].getType() != 'int':
+        if self.operands[0].getType() is not INT_TYPE:
             raise InterpretException('EXIT: Invalid exit code operand', ReturnCodes.BAD_OPERANDS)
             
         if exitCode >= 0 and exitCode <= 49:
@@ -324,100 +455,141 @@ class ExitInstruction(Instruction):
         else:
             raise InterpretException('EXIT: Invalid exit code', ReturnCodes.BAD_OPERAND_VALUE)
 
+@registerOpcode('TYPE')
 class TypeInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
         
     def execute(self):  
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
+        variable = self.operands[0].getVariable()
         type = self.operands[1].getType()
         if type == None:
             type = ''
-        variable.set(type, 'string')
+        variable.set(type, STRING_TYPE)
         
+"""
+Assigns the concatenation of the strings to the variable.
+string1 may be a StringBuffer returned by getString. If it is
+the long string of the variable itself, string2 is appended to the buffer
+of the variable in place, so building a string by CONCAT is linear.
+"""
+def concatenate(variable, string1, string2):
+    if len(string1) < StringBuffer.MINIMUM_LENGTH:
+        variable.set(string1 + string2, STRING_TYPE)
+    elif variable.type is STRING_TYPE and variable.getString() is string1:
+        variable.getBuffer().append(string2)
+    else:
+        variable.set(str(string1) + string2, STRING_TYPE)
+
+"""
+Assigns the string with the character at the index replaced to the variable.
+string is the string of the variable returned by getString. A long string
+is replaced in the buffer of the variable in place, a short one is copied.
+"""
+def setCharacter(variable, string, index, character):
+    if len(string) < StringBuffer.MINIMUM_LENGTH:
+        variable.set(string[:index] + character + string[index + 1:], STRING_TYPE)
+    else:
+        variable.getBuffer().setCharacter(index, character)
+
+@registerOpcode('CONCAT')
 class ConcatInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand, SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
         
     def execute(self):
-        str1 = self.operands[1].getValue()
+        str1 = self.operands[1].getString()
         str2 = self.operands[2].getValue()
         
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
+        variable = self.operands[0].getVariable()
         if self.__areOperandTypesOk():
-            variable.set(str1 + str2, 'string')
+            concatenate(variable, str1, str2)
         else:
             raise InterpretException("CONCAT: Invalid operand types", ReturnCodes.BAD_OPERANDS)
     
     def __areOperandTypesOk(self):
-        return self.operands[1].getType() == 'string' and \
-            self.operands[2].getType() == 'string'
+        return self.operands[1].getType() is STRING_TYPE and \
+            self.operands[2].getType() is STRING_TYPE
     
+@registerOpcode('STRLEN')
 class StrlenInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
         
     def execute(self): 
-        string = self.operands[1].getValue()
+        string = self.operands[1].getString()
         
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
+        variable = self.operands[0].getVariable()
         if self.__isOperandTypeOk():
-            variable.set(len(string), 'int')
+            variable.set(len(string), INT_TYPE)
         else:
             raise InterpretException("STRLEN: Invalid operand types", ReturnCodes.BAD_OPERANDS)
             
     def __isOperandTypeOk(self):
-        return self.operands[1].getType() == 'string'
+        return self.operands[1].getType() is STRING_TYPE
     
+@registerOpcode('GETCHAR')
 class GetcharInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand, SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
         
     def execute(self):  
-        string = self.operands[1].getValue()
+        string = self.operands[1].getString()
         index = self.operands[2].getValue() 
         
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        if self.operands[2].getType() == 'int' and self.operands[1].getType() == 'string':
+        variable = self.operands[0].getVariable()
+        if self.operands[2].getType() is INT_TYPE and self.operands[1].getType() is STRING_TYPE:
             if index < 0 or index >= len(string):
                 raise InterpretException("GETCHAR: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
-            variable.set(string[index], 'string')
+            variable.set(string[index], STRING_TYPE)
         else:
             raise InterpretException("GETCHAR: Invalid operand types", ReturnCodes.BAD_OPERANDS)
     
+@registerOpcode('SETCHAR')
 class SetcharInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand, SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
         
     def execute(self):  
-        string = self.operands[0].getValue()
+        string = self.operands[0].getString()
         index = self.operands[1].getValue()
         sourceString = self.operands[2].getValue()
            
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        if self.operands[0].getType() == 'string' and \
-           self.operands[1].getType() == 'int' and \
-           self.operands[2].getType() == 'string':
+        variable = self.operands[0].getVariable()
+        if self.operands[0].getType() is STRING_TYPE and \
+           self.operands[1].getType() is INT_TYPE and \
+           self.operands[2].getType() is STRING_TYPE:
             if index < 0 or index >= len(string) or len(sourceString) == 0:
                 raise InterpretException("SETCHAR: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
-            mutableString = list(string)
-            mutableString[index] = sourceString[0]     
-            variable.set("".join(mutableString), 'string')
+            setCharacter(variable, string, index, sourceString[0])
         else:
             raise InterpretException("SETCHAR: Invalid operand types", ReturnCodes.BAD_OPERANDS)
 
+@registerOpcode('INT2CHAR')
 class Int2charInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
@@ -425,36 +597,42 @@ class Int2charInstruction(Instruction):
     def execute(self):  
         ordinal = self.operands[1].getValue()
             
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        if self.operands[1].getType() == 'int':
+        variable = self.operands[0].getVariable()
+        if self.operands[1].getType() is INT_TYPE:
             try:
                 char = chr(ordinal)
             except ValueError:
                 raise InterpretException("INT2CHAR: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
-            variable.set(char, 'string')
+            variable.set(char, STRING_TYPE)
         else:
             raise InterpretException("INT2CHAR: Invalid operand types", ReturnCodes.BAD_OPERANDS)
 
 
+@registerOpcode('INT2CHARS')
 class Int2charsInstruction(StackInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
     def execute(self):  
-        ordinal, ordinalType = self.processor.popFromStack()
+        ordinal, ordinalType = self.processor.dataStack.pop()
            
-        if ordinalType == 'int':
+        if ordinalType is INT_TYPE:
             try:
                 char = chr(ordinal)
             except ValueError:
                 raise InterpretException("INT2CHARS: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
-            self.processor.pushToStack((char, 'string'))
+            self.processor.dataStack.push(char, STRING_TYPE)
         else:
             raise InterpretException("INT2CHARS: Invalid operand types", ReturnCodes.BAD_OPERANDS)
 
+@registerOpcode('STRI2INT')
 class Stri2intInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand, SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
@@ -463,35 +641,41 @@ class Stri2intInstruction(Instruction):
         string = self.operands[1].getValue()
         index = self.operands[2].getValue()
         
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        if self.operands[1].getType() == 'string' and self.operands[2].getType() == 'int':
+        variable = self.operands[0].getVariable()
+        if self.operands[1].getType() is STRING_TYPE and self.operands[2].getType() is INT_TYPE:
             if index < 0 or index >= len(string):
                 raise InterpretException("STRI2INT: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
             ordinal = ord(string[index])
-            variable.set(ordinal, 'int')
+            variable.set(ordinal, INT_TYPE)
         else:
             raise InterpretException("STRI2INT: Invalid operand types", ReturnCodes.BAD_OPERANDS)
 
+@registerOpcode('STRI2INTS')
 class Stri2intsInstruction(StackInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
     def execute(self):  
-        index, indexType = self.processor.popFromStack()
-        string, stringType = self.processor.popFromStack()
+        index, indexType = self.processor.dataStack.pop()
+        string, stringType = self.processor.dataStack.pop()
         
-        if stringType == 'string' and indexType == 'int':
+        if stringType is STRING_TYPE and indexType is INT_TYPE:
             if index < 0 or index >= len(string):
                 raise InterpretException("STRI2INTS: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
             ordinal = ord(string[index])
-            self.processor.pushToStack((ordinal, 'int'))
+            self.processor.dataStack.push(ordinal, INT_TYPE)
         else:
             raise InterpretException("STRI2INTS: Invalid operand types", ReturnCodes.BAD_OPERANDS)
 
 
+@registerOpcode('INT2FLOAT')
 class Int2floatInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
@@ -499,27 +683,33 @@ class Int2floatInstruction(Instruction):
     def execute(self):  
         ordinal = self.operands[1].getValue()
             
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        if self.operands[1].getType() != 'int':
+        variable = self.operands[0].getVariable()
+        if self.operands[1].getType() is not INT_TYPE:
             raise InterpretException("INT2FLOAT: Invalid operand types", ReturnCodes.BAD_OPERANDS)
             
-        variable.set(float(self.operands[1].getValue()), 'float')
+        variable.set(float(self.operands[1].getValue()), FLOAT_TYPE)
         
+@registerOpcode('INT2FLOATS')
 class Int2floatsInstruction(StackInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
     def execute(self):
-        ordinalVal, ordinalType = self.processor.popFromStack()
+        ordinalVal, ordinalType = self.processor.dataStack.pop()
         
-        if ordinalType != 'int':
+        if ordinalType is not INT_TYPE:
             raise InterpretException("INT2FLOATS: Invalid operand types", ReturnCodes.BAD_OPERANDS)
         
-        self.processor.pushToStack((float(ordinalVal), 'float'))
+        self.processor.dataStack.push(float(ordinalVal), FLOAT_TYPE)
 
+@registerOpcode('FLOAT2INT')
 class Float2intInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand ]
         Instruction.__init__(self, operands, expectedOperands, processor)
@@ -527,27 +717,32 @@ class Float2intInstruction(Instruction):
     def execute(self):  
         ordinal = self.operands[1].getValue()
             
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        if self.operands[1].getType() != 'float':
+        variable = self.operands[0].getVariable()
+        if self.operands[1].getType() is not FLOAT_TYPE:
             raise InterpretException("FLOAT2INT: Invalid operand types", ReturnCodes.BAD_OPERANDS)
             
-        variable.set(int(self.operands[1].getValue()), 'int')
+        variable.set(int(self.operands[1].getValue()), INT_TYPE)
         
+@registerOpcode('FLOAT2INTS')
 class Float2intsInstruction(StackInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
     def execute(self):
-        ordinalVal, ordinalType = self.processor.popFromStack()
+        ordinalVal, ordinalType = self.processor.dataStack.pop()
         
-        if ordinalType != 'float':
+        if ordinalType is not FLOAT_TYPE:
             raise InterpretException("FLOAT2INTS: Invalid operand types", ReturnCodes.BAD_OPERANDS)
         
-        self.processor.pushToStack((int(ordinalVal), 'int'))
+        self.processor.dataStack.push(int(ordinalVal), INT_TYPE)
 
 class ArithmeticInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand, SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
@@ -555,16 +750,19 @@ class ArithmeticInstruction(Instruction):
     def execute(self):
         type1 = self.operands[1].getType()
         type2 = self.operands[2].getType()
-        if type1 == 'int' and type2 == 'int':
+        if type1 is INT_TYPE and type2 is INT_TYPE:
             return
-        if type1 == 'float' and type2 == 'float':
+        if type1 is FLOAT_TYPE and type2 is FLOAT_TYPE:
             return
         if type1 == None or type2 == None:
             raise InterpretException("ARITHMETIC: Missing value in operand", ReturnCodes.MISSING_VALUE)
         raise InterpretException("ARITHMETIC: Invalid operand types", ReturnCodes.BAD_OPERANDS)
 
+@registerOpcode('ADD')
 class AddInstruction(ArithmeticInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
@@ -573,11 +771,14 @@ class AddInstruction(ArithmeticInstruction):
         val1 = self.operands[1].getValue()
         val2 = self.operands[2].getValue()
         
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
+        variable = self.operands[0].getVariable()
         variable.set(val1 + val2, self.operands[1].getType())
         
+@registerOpcode('SUB')
 class SubInstruction(ArithmeticInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
@@ -586,23 +787,29 @@ class SubInstruction(ArithmeticInstruction):
         val1 = self.operands[1].getValue()
         val2 = self.operands[2].getValue()
         
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
+        variable = self.operands[0].getVariable()
         variable.set(val1 - val2, self.operands[1].getType())        
         
+@registerOpcode('MUL')
 class MulInstruction(ArithmeticInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
     def execute(self):
         super().execute()
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
+        variable = self.operands[0].getVariable()
         val1 = self.operands[1].getValue()
         val2 = self.operands[2].getValue()
         variable.set(val1 * val2, self.operands[1].getType())    
         
+@registerOpcode('IDIV')
 class IdivInstruction(ArithmeticInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
@@ -613,14 +820,17 @@ class IdivInstruction(ArithmeticInstruction):
         if val2 == 0:
             raise InterpretException("IDIV: Cannot divide by 0", ReturnCodes.BAD_OPERAND_VALUE)
         
-        if self.operands[1].getType() != 'int' or self.operands[2].getType() != 'int':
+        if self.operands[1].getType() is not INT_TYPE or self.operands[2].getType() is not INT_TYPE:
             raise InterpretException("IDIV: Invalid operand types", ReturnCodes.BAD_OPERANDS)
             
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        variable.set(val1 // val2, 'int')    
+        variable = self.operands[0].getVariable()
+        variable.set(val1 // val2, INT_TYPE)    
         
+@registerOpcode('DIV')
 class DivInstruction(ArithmeticInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
@@ -631,14 +841,17 @@ class DivInstruction(ArithmeticInstruction):
         if val2 == 0:
             raise InterpretException("DIV: Cannot divide by 0", ReturnCodes.BAD_OPERAND_VALUE)
             
-        if self.operands[1].getType() != 'float' or self.operands[2].getType() != 'float':
+        if self.operands[1].getType() is not FLOAT_TYPE or self.operands[2].getType() is not FLOAT_TYPE:
             raise InterpretException("DIV: Invalid operand types", ReturnCodes.BAD_OPERANDS)
             
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        variable.set(val1 / val2, 'float')    
+        variable = self.operands[0].getVariable()
+        variable.set(val1 / val2, FLOAT_TYPE)    
 
+@registerOpcode('PUSHS')
 class PushsInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
@@ -646,21 +859,26 @@ class PushsInstruction(Instruction):
     def execute(self):        
         value = self.operands[0].getValue()
         type = self.operands[0].getType()
-        self.processor.pushToStack((value, type))
+        self.processor.dataStack.push(value, type)
         
+@registerOpcode('POPS')
 class PopsInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
         
     def execute(self):        
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        value, type = self.processor.popFromStack()
+        variable = self.operands[0].getVariable()
+        value, type = self.processor.dataStack.pop()
         variable.set(value, type)
 
 class RelationalInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand, SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
@@ -671,14 +889,17 @@ class RelationalInstruction(Instruction):
         
         if type1 == None or type2 == None:
             raise InterpretException("Relational inst: Missing value in operand", ReturnCodes.MISSING_VALUE)
-        if type1 == 'nil' or type2 == 'nil':
+        if type1 is NIL_TYPE or type2 is NIL_TYPE:
             return
         if type1 == type2:
             return
         raise InterpretException("Relational inst: Invalid operand types", ReturnCodes.BAD_OPERANDS)
     
+@registerOpcode('LT')
 class LtInstruction(RelationalInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
@@ -687,14 +908,17 @@ class LtInstruction(RelationalInstruction):
         value1 = self.operands[1].getValue()
         value2 = self.operands[2].getValue()
         
-        if self.operands[1].getType() == 'nil' or self.operands[2].getType() == 'nil':
+        if self.operands[1].getType() is NIL_TYPE or self.operands[2].getType() is NIL_TYPE:
             raise InterpretException("LT: Invalid operand types", ReturnCodes.BAD_OPERANDS)
         
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        variable.set(value1 < value2, 'bool')
+        variable = self.operands[0].getVariable()
+        variable.set(value1 < value2, BOOL_TYPE)
     
+@registerOpcode('GT')
 class GtInstruction(RelationalInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
@@ -703,26 +927,32 @@ class GtInstruction(RelationalInstruction):
         value1 = self.operands[1].getValue()
         value2 = self.operands[2].getValue()
         
-        if self.operands[1].getType() == 'nil' or self.operands[2].getType() == 'nil':
+        if self.operands[1].getType() is NIL_TYPE or self.operands[2].getType() is NIL_TYPE:
             raise InterpretException("GT: Invalid operand types", ReturnCodes.BAD_OPERANDS)
             
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        variable.set(value1 > value2, 'bool')
+        variable = self.operands[0].getVariable()
+        variable.set(value1 > value2, BOOL_TYPE)
         
+@registerOpcode('EQ')
 class EqInstruction(RelationalInstruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
     def execute(self): 
         super().execute()
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
+        variable = self.operands[0].getVariable()
         value1 = self.operands[1].getValue()
         value2 = self.operands[2].getValue()
-        variable.set(value1 == value2, 'bool')
+        variable.set(value1 == value2, BOOL_TYPE)
         
+@registerOpcode('AND')
 class AndInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand, SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
@@ -731,14 +961,17 @@ class AndInstruction(Instruction):
         value1 = self.operands[1].getValue()
         value2 = self.operands[2].getValue()
         
-        if self.operands[1].getType() != 'bool' or self.operands[2].getType() != 'bool':
+        if self.operands[1].getType() is not BOOL_TYPE or self.operands[2].getType() is not BOOL_TYPE:
             raise InterpretException("AND: Invalid operand types", ReturnCodes.BAD_OPERANDS)
             
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        variable.set(value1 and value2, 'bool')
+        variable = self.operands[0].getVariable()
+        variable.set(value1 and value2, BOOL_TYPE)
 
+@registerOpcode('OR')
 class OrInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand, SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
@@ -747,14 +980,17 @@ class OrInstruction(Instruction):
         value1 = self.operands[1].getValue()
         value2 = self.operands[2].getValue()
         
-        if self.operands[1].getType() != 'bool' or self.operands[2].getType() != 'bool':
+        if self.operands[1].getType() is not BOOL_TYPE or self.operands[2].getType() is not BOOL_TYPE:
             raise InterpretException("OR: Invalid operand types", ReturnCodes.BAD_OPERANDS)
             
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        variable.set(value1 or value2, 'bool')
+        variable = self.operands[0].getVariable()
+        variable.set(value1 or value2, BOOL_TYPE)
         
+@registerOpcode('NOT')
 class NotInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ VariableOperand, SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
@@ -762,161 +998,211 @@ class NotInstruction(Instruction):
     def execute(self):
         value1 = self.operands[1].getValue()
         
-        if self.operands[1].getType() != 'bool':
+        if self.operands[1].getType() is not BOOL_TYPE:
             raise InterpretException("NOT: Invalid operand types", ReturnCodes.BAD_OPERANDS)
         
-        variable = self.processor.frameModel.getVariable(self.operands[0].getFrameName())
-        variable.set(not value1, 'bool')
+        variable = self.operands[0].getVariable()
+        variable.set(not value1, BOOL_TYPE)
         
+@registerOpcode('DPRINT')
 class DprintInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = [ SymbolOperand ]
         super().__init__(operands, expectedOperands, processor)
         
     def execute(self):
         sourceOperand = self.operands[0]
+        self.processor.outputWriter.flush()
         self.__writeValue(sourceOperand.getValue(), sourceOperand.getType())
         
     def __writeValue(self, value, type):
-        if type == 'bool':
+        if type is BOOL_TYPE:
             print('true' if value else 'false', file=sys.stderr)
-        elif type == 'nil':
+        elif type is NIL_TYPE:
             print('', file=sys.stderr)
-        elif type == 'float':
+        elif type is FLOAT_TYPE:
             print(value, file=sys.stderr)
-        elif type == 'int' or type == 'string':
+        elif type is INT_TYPE or type is STRING_TYPE:
             print(value, file=sys.stderr)
         else:
             raise InterpretException("DPRINT: Invalid argument type", ReturnCodes.INVALID_INPUT)
 
+@registerOpcode('BREAK')
 class BreakInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         expectedOperands = []
         Instruction.__init__(self, operands, expectedOperands, processor)
         
     def execute(self):
+        self.processor.outputWriter.flush()
         print('Just some string', file=sys.stderr)
         
 
+@registerOpcode('CLEARS')
 class ClearsInstruction(Instruction):
     
+    __slots__ = ()
+    
     def __init__(self, operands, processor):
         super().__init__(operands, [], processor)     
         
     def execute(self):
-        self.processor.clearStack()
+        self.processor.dataStack.clear()
         
+@registerOpcode('ADDS')
 class AddsInstruction(StackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
     def execute(self):
-        val2, type2 = self.processor.popFromStack()
-        val1, type1 = self.processor.popFromStack()
+        val2, type2 = self.processor.dataStack.pop()
+        val1, type1 = self.processor.dataStack.pop()
+        self.processor.dataStack.push(*self.evaluate(val1, type1, val2, type2))
         
-        if (type1 != type2 or (type1 != 'int' and type2 != 'float')):
+    def evaluate(self, val1, type1, val2, type2):
+        if (type1 is not type2 or (type1 is not INT_TYPE and type2 is not FLOAT_TYPE)):
             raise InterpretException("ADDS: Invalid operand types", ReturnCodes.BAD_OPERANDS)
         
-        self.processor.pushToStack((val1 + val2, type1))
+        return (val1 + val2, type1)
         
+@registerOpcode('SUBS')
 class SubsInstruction(StackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
     def execute(self):
-        val2, type2 = self.processor.popFromStack()
-        val1, type1 = self.processor.popFromStack()
+        val2, type2 = self.processor.dataStack.pop()
+        val1, type1 = self.processor.dataStack.pop()
+        self.processor.dataStack.push(*self.evaluate(val1, type1, val2, type2))
         
-        if (type1 != type2 or (type1 != 'int' and type2 != 'float')):
+    def evaluate(self, val1, type1, val2, type2):
+        if (type1 is not type2 or (type1 is not INT_TYPE and type2 is not FLOAT_TYPE)):
             raise InterpretException("SUBS: Invalid operand types", ReturnCodes.BAD_OPERANDS)
         
-        self.processor.pushToStack((val1 - val2, type1))
+        return (val1 - val2, type1)
          
+@registerOpcode('MULS')
 class MulsInstruction(StackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
         super().__init__(operands, processor)
         
     def execute(self):
-        val2, type2 = self.processor.popFromStack()
-        val1, type1 = self.processor.popFromStack()
+        val2, type2 = self.processor.dataStack.pop()
+        val1, type1 = self.processor.dataStack.pop()
+        self.processor.dataStack.push(*self.evaluate(val1, type1, val2, type2))
         
-        if (type1 != type2 or (type1 != 'int' and type2 != 'float')):
+    def evaluate(self, val1, type1, val2, type2):
+        if (type1 is not type2 or (type1 is not INT_TYPE and type2 is not FLOAT_TYPE)):
             raise InterpretException("MULS: Invalid operand types", ReturnCodes.BAD_OPERANDS)
         
-        self.processor.pushToStack((val1 * val2, type1))
+        return (val1 * val2, type1)
 
+@registerOpcode('IDIVS')
 class IdivsInstruction(BinaryStackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
-        operation = (operator.floordiv, ['int'], 'int')
+        operation = (operator.floordiv, [INT_TYPE], INT_TYPE)
         super().__init__(operands, processor, operation)
         
     def execute(self):
         super().execute()
         
+@registerOpcode('DIVS')
 class DivsInstruction(BinaryStackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
-        operation = (operator.truediv, ['float'], 'float')
+        operation = (operator.truediv, [FLOAT_TYPE], FLOAT_TYPE)
         super().__init__(operands, processor, operation)
         
     def execute(self):
         super().execute()
         
+@registerOpcode('ANDS')
 class AndsInstruction(BinaryStackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
-        operation = (operator.and_, ['bool'], 'bool')
+        operation = (operator.and_, [BOOL_TYPE], BOOL_TYPE)
         super().__init__(operands, processor, operation)
         
     def execute(self):
         super().execute()
 
+@registerOpcode('ORS')
 class OrsInstruction(BinaryStackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
-        operation = (operator.or_, ['bool'], 'bool')
+        operation = (operator.or_, [BOOL_TYPE], BOOL_TYPE)
         super().__init__(operands, processor, operation)
         
     def execute(self):
         super().execute()
 
+@registerOpcode('GTS')
 class GtsInstruction(BinaryStackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
-        operation = (operator.gt, ['int', 'bool', 'float', 'string'], 'bool')
+        operation = (operator.gt, [INT_TYPE, BOOL_TYPE, FLOAT_TYPE, STRING_TYPE], BOOL_TYPE)
         super().__init__(operands, processor, operation)
         
     def execute(self):
         super().execute()
         
+@registerOpcode('LTS')
 class LtsInstruction(BinaryStackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
-        operation = (operator.lt, ['int', 'bool', 'float', 'string'], 'bool')
+        operation = (operator.lt, [INT_TYPE, BOOL_TYPE, FLOAT_TYPE, STRING_TYPE], BOOL_TYPE)
         super().__init__(operands, processor, operation)
         
     def execute(self):
         super().execute()
         
+@registerOpcode('EQS')
 class EqsInstruction(BinaryStackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
-        operation = (operator.eq, ['int', 'bool', 'float', 'string', 'nil'], 'bool')
+        operation = (operator.eq, [INT_TYPE, BOOL_TYPE, FLOAT_TYPE, STRING_TYPE, NIL_TYPE], BOOL_TYPE)
         super().__init__(operands, processor, operation, allowNils = True)
         
     def execute(self):
         super().execute()
         
+@registerOpcode('NOTS')
 class NotsInstruction(UnaryStackInstruction):
    
+    __slots__ = ()
+   
     def __init__(self, operands, processor):
-        operation = (operator.not_, ['int', 'bool', 'float', 'string'], 'bool')
+        operation = (operator.not_, [INT_TYPE, BOOL_TYPE, FLOAT_TYPE, STRING_TYPE], BOOL_TYPE)
         super().__init__(operands, processor, operation)
         
     def execute(self):
@@ -927,25 +1213,71 @@ The processor executes all instructions.
 """
 class Processor:
     
-    def __init__(self, frameModel, operandFactory, instructionCounter, inputFile):
+    """
+    inputReader reads the input of the program. If it is None,
+    the input is read from the standard input.
+    instructionFusion replaces sequences of instructions by fused
+    instructions before running. If it is None, the instructions
+    are executed as they are.
+    outputWriter collects the output of the program. If it is None,
+    the output is written to the standard output.
+    typeInference replaces instructions with operands of known types
+    by instructions which don't check the types before running.
+    If it is None, all instructions check the types of their operands.
+    dataStack holds the values of the stack instructions. If it is None,
+    a DataStack which doesn't count its depth is used.
+    """
+    def __init__(self, frameModel, operandFactory, instructionCounter, inputReader, instructionFusion = None, outputWriter = None,
+                 typeInference = None, dataStack = None):
         self.frameModel = frameModel
         self.__operandFactory = operandFactory
-        self.__inputFile = inputFile
+        self.inputReader = inputReader if inputReader != None else InputReader(sys.stdin.buffer, translateNewlines = False)
+        self.__instructionFusion = instructionFusion
+        self.__typeInference = typeInference
         self.instructionCounter = instructionCounter
+        self.outputWriter = outputWriter if outputWriter != None else OutputWriter()
         self.stopCode = None
-        self.__dataStack = []
+        self.dataStack = dataStack if dataStack != None else DataStack()
         
     """
     Execute all instructions.
     rawInstructions is a list of Instruction
     """
     def execute(self, rawInstructions):
+        self.load(rawInstructions)
+        self.run()
+    
+    """
+    Create instructions of the program and find its labels.
+    rawInstructions is a list of Instruction
+    """
+    def load(self, rawInstructions):
         self.__createInstructions(rawInstructions)
         self.instructionCounter.setInstructions(self.instructions)
     
+    """
+    Replace the loaded instructions by already created instructions
+    and find their labels.
+    """
+    def replaceInstructions(self, instructions):
+        self.instructions = instructions
+        self.instructionCounter.setInstructions(instructions)
+    
+    """
+    Execute the loaded instructions.
+    The loaded instructions are kept unspecialized and unfused,
+    only the instruction counter executes the transformed ones.
+    """
+    def run(self):
+        instructions = self.instructions
+        if self.__typeInference != None:
+            instructions = self.__typeInference.specialize(instructions)
+        if self.__instructionFusion != None:
+            instructions = self.__instructionFusion.fuse(instructions)
+        if instructions is not self.instructions:
+            self.instructionCounter.setInstructions(instructions)
         while self.instructionCounter.nextInstruction() and self.stopCode == None:
             self.instructionCounter.executeCurrentInstruction()
-            self.frameModel.updateMaximumVariables()
     
     """
     Create an instance of appropriate Instruction class 
@@ -955,6 +1287,7 @@ class Processor:
         self.instructions = []
         for rawInstr in rawInstructions: 
             instruction = self.__createInstruction(rawInstr.opcode, rawInstr.arguments)
+            instruction.order = rawInstr.order
             self.instructions.append(instruction)
         
     """
@@ -963,12 +1296,10 @@ class Processor:
     """
     def __createInstruction(self, opcode, rawOperands):
         operands = self.__createOperands(rawOperands)
-        className = opcode.capitalize() + "Instruction"
-        
-        try:
-            return eval(className)(operands, self)
-        except NameError:
+        instructionClass = instructionClasses.get(opcode.upper())
+        if instructionClass == None:
             raise InterpretException(F"Unknown opcode {opcode}", ReturnCodes.INVALID_INPUT)
+        return instructionClass(operands, self)
 
     """
     Create an instance of appropriate Argument class 
@@ -986,36 +1317,7 @@ class Processor:
     """
     def stop(self, code):
         self.stopCode = code;
-    
-    """
-    Appends a variable to the data stack.
-    """
-    def pushToStack(self, valueType):
-        self.__dataStack.append(valueType)
-    
-    """
-    Pops a variable from the data stack.
-    """
-    def popFromStack(self):
-        if len(self.__dataStack) == 0:
-            raise InterpretException('Empty data stack', ReturnCodes.MISSING_VALUE)
-        return self.__dataStack.pop()
 
-    """
-    Clears the data stack.
-    """
-    def clearStack(self):
-        self.__dataStack = []
-
-    """
-    Returns an input file.
-    """
-    def getInputFile(self):
-        return self.__inputFile
-    
-    def checkLabelExists(self, label):
-        if not self.instructionCounter.existsLabel(label):
-            raise InterpretException('Undefined label', ReturnCodes.SEMANTIC_ERROR)
  
         
     
@@ -0,0 +1,216 @@
+from .instructionCounter import *
+from time import perf_counter
+
+"""
+The ProfilingInstructionCounter is an InstructionCounter which measures
+the wall time of every executed instruction.
+
+The number of executions and the cumulative time are kept for every
+instruction of the program in profile, a dictionary of lists [count, seconds]
+indexed by the instruction. The report sums them up by opcode and lists
+them by the order of the instructions.
+
+It is used only if the profile was requested, so the execution loop
+doesn't measure any time otherwise.
+"""
+class ProfilingInstructionCounter(InstructionCounter):
+
+    def __init__(self, callStack = None):
+        super().__init__(callStack)
+        self.profile = {}
+
+    def executeCurrentInstruction(self):
+        instruction = self.currentInstruction
+        start = perf_counter()
+        instruction.execute()
+        seconds = perf_counter() - start
+        entry = self.profile.get(instruction)
+        if entry is None:
+            self.profile[instruction] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+        self.executedInstructions += instruction.weight
+
+    """
+    Writes the report of the profile to the file.
+    Opcodes and instructions are sorted by their cumulative time,
+    the most expensive first.
+    """
+    def writeReport(self, file):
+        opcodes = {}
+        for instruction, (count, seconds) in self.profile.items():
+            opcodeEntry = opcodes.setdefault(instruction.opcode, [0, 0.0])
+            opcodeEntry[0] += count
+            opcodeEntry[1] += seconds
+        totalSeconds = sum(seconds for count, seconds in opcodes.values())
+
+        file.write(F"Executed instructions: {self.executedInstructions}\n")
+        file.write(F"Total time: {totalSeconds * 1000:.3f} ms\n")
+        file.write("\nOpcodes\n")
+        file.write(F"{'opcode':<12}{'count':>12}{'time [ms]':>14}{'mean [ns]':>12}{'share':>9}\n")
+        for opcode, (count, seconds) in sorted(opcodes.items(), key = lambda item: (-item[1][1], item[0])):
+            file.write(F"{opcode:<12}" + formatEntry(count, seconds, totalSeconds))
+
+        file.write("\nInstructions\n")
+        file.write(F"{'order':>8}  {'opcode':<12}{'count':>12}{'time [ms]':>14}{'mean [ns]':>12}{'share':>9}\n")
+        for instruction, (count, seconds) in sorted(self.profile.items(),
+                                                    key = lambda item: (-item[1][1], item[0].order)):
+            file.write(F"{instruction.order:>8}  {instruction.opcode:<12}" + formatEntry(count, seconds, totalSeconds))
+
+"""
+Returns the columns of the report with the count and the time.
+"""
+def formatEntry(count, seconds, totalSeconds):
+    share = seconds / totalSeconds * 100 if totalSeconds > 0 else 0.0
+    return F"{count:>12}{seconds * 1000:>14.3f}{seconds / count * 1e9:>12.0f}{share:>8.2f}%\n"
+
+"""
+The label of the calls tree root, which stands for the code
+outside of any function. It cannot collide with a label of the program.
+"""
+PROGRAM_LABEL = '<program>'
+
+"""
+CallNode is a node of the tree of calls. Every node is a function,
+which is the label reached by CALL, called from the function of its parent.
+A recursive function has a node for every depth of the recursion.
+instructions and seconds are the exclusive instruction count and time
+of the function when called from this place.
+"""
+class CallNode:
+
+    __slots__ = ('label', 'parent', 'children', 'calls', 'instructions', 'seconds')
+
+    def __init__(self, label, parent):
+        self.label = label
+        self.parent = parent
+        self.children = {}
+        self.calls = 0
+        self.instructions = 0
+        self.seconds = 0.0
+
+"""
+The CallProfilingInstructionCounter is an InstructionCounter which builds
+the tree of calls of the program. CALL enters a child node of the current
+function and RETURN leaves it, every executed instruction is counted
+together with its time in the function it was executed in.
+
+The report lists the functions with their inclusive and exclusive
+instruction counts and times. The folded stacks list every path
+of the calls tree with its exclusive time in microseconds,
+which is the input of the flamegraph tools.
+
+It is used only if the call profile was requested, so the execution loop
+doesn't measure any time otherwise.
+"""
+class CallProfilingInstructionCounter(InstructionCounter):
+
+    def __init__(self, callStack = None):
+        super().__init__(callStack)
+        self.root = CallNode(PROGRAM_LABEL, None)
+        self.root.calls = 1
+        self.__node = self.root
+
+    def executeCurrentInstruction(self):
+        instruction = self.currentInstruction
+        node = self.__node
+        start = perf_counter()
+        instruction.execute()
+        node.seconds += perf_counter() - start
+        node.instructions += instruction.weight
+        self.executedInstructions += instruction.weight
+
+    def pushCallstack(self):
+        super().pushCallstack()
+        label = self.currentInstruction.operands[0].getValue()
+        parent = self.__node
+        node = parent.children.get(label)
+        if node is None:
+            node = CallNode(label, parent)
+            parent.children[label] = node
+        node.calls += 1
+        self.__node = node
+
+    def popCallstack(self):
+        super().popCallstack()
+        self.__node = self.__node.parent
+
+    """
+    Writes the report of the functions to the file, sorted by their
+    inclusive time. The inclusive counts of a recursive function
+    include its recursive calls only once.
+    """
+    def writeReport(self, file):
+        functions = summarizeFunctions(self.root)
+        file.write(F"{'function':<24}{'calls':>10}{'incl. instr.':>14}{'excl. instr.':>14}"
+                   F"{'incl. [ms]':>12}{'excl. [ms]':>12}\n")
+        for label, (calls, inclusiveInstructions, exclusiveInstructions, inclusiveSeconds, exclusiveSeconds) in \
+                sorted(functions.items(), key = lambda item: (-item[1][3], item[0])):
+            file.write(F"{label:<24}{calls:>10}{inclusiveInstructions:>14}{exclusiveInstructions:>14}"
+                       F"{inclusiveSeconds * 1000:>12.3f}{exclusiveSeconds * 1000:>12.3f}\n")
+
+    """
+    Writes the folded stacks of the calls tree to the file. Every line
+    is a path of functions separated by semicolons and the exclusive time
+    of the last function in microseconds. Paths with no measurable time
+    are left out.
+    """
+    def writeFoldedStacks(self, file):
+        path = []
+        for node, entering in walkTree(self.root):
+            if not entering:
+                path.pop()
+                continue
+            path.append(node.label)
+            microseconds = round(node.seconds * 1e6)
+            if microseconds > 0:
+                file.write(F"{';'.join(path)} {microseconds}\n")
+
+"""
+Yields pairs of a node and True when the node is entered and False
+when it is left, walking the tree depth first. The tree is walked
+without recursion, so a deep recursion of the program doesn't exceed
+the recursion limit.
+"""
+def walkTree(root):
+    stack = [(root, True)]
+    while len(stack) > 0:
+        node, entering = stack.pop()
+        yield node, entering
+        if entering:
+            stack.append((node, False))
+            for child in reversed(list(node.children.values())):
+                stack.append((child, True))
+
+"""
+Returns a dictionary of lists [calls, inclusive instructions, exclusive
+instructions, inclusive seconds, exclusive seconds] indexed by the labels
+of the functions of the calls tree.
+"""
+def summarizeFunctions(root):
+    inclusive = {}
+    for node, entering in walkTree(root):
+        if not entering:
+            instructions = node.instructions
+            seconds = node.seconds
+            for child in node.children.values():
+                instructions += inclusive[child][0]
+                seconds += inclusive[child][1]
+            inclusive[node] = (instructions, seconds)
+
+    functions = {}
+    activeLabels = {}
+    for node, entering in walkTree(root):
+        if not entering:
+            activeLabels[node.label] -= 1
+            continue
+        function = functions.setdefault(node.label, [0, 0, 0, 0.0, 0.0])
+        function[0] += node.calls
+        function[2] += node.instructions
+        function[4] += node.seconds
+        if activeLabels.get(node.label, 0) == 0:
+            function[1] += inclusive[node][0]
+            function[3] += inclusive[node][1]
+        activeLabels[node.label] = activeLabels.get(node.label, 0) + 1
+    return functions
@@ -1,106 +1,207 @@
-
-import xml.etree.ElementTree as et
+import gc
 from .argument import Argument
 from .instruction import Instruction
 from .return_codes import *
-import re
-import collections
-import sys
 
 """
 The Program class represents given program.
 It loads and parses an xml file.
 After parsing the file, all instructions of the program are available.
+
+The xml file is read by a streaming expat parser. Every instruction
+is built as soon as its element is closed, so the document tree 
+is never held in memory.
 """
 class Program:
-    
+
+    PROGRAM_ATTRIBUTES = frozenset(['language', 'description', 'name'])
+    ARGUMENT_INDEXES = { 'arg1': 0, 'arg2': 1, 'arg3': 2 }
+
     """
     inputFile is an xml file representing the program to be loaded
     """
     def __init__(self, inputFile):
         self.__parseInput(inputFile)
-        
+
     """
     Loads the current program from given xml file.
-    
+
     inputFile is an xml file
+
+    If the content of the program is invalid, the rest of the file
+    is still read, because an invalid xml structure takes precedence.
     """
     def __parseInput(self, inputFile):
+        self.__instructionsByOrder = {}
+        self.__error = None
+        self.__depth = 0
+        self.__argumentElement = None
+
+        # The parser is imported only when a program is parsed,
+        # programs loaded from a cache don't need it.
+        import xml.parsers.expat as expat
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = self.__startElement
+        parser.EndElementHandler = self.__endElement
+        parser.CharacterDataHandler = self.__characterData
+
+        # The loader creates only objects that live as long as the program,
+        # so collecting garbage while loading would just rescan them.
+        gcWasEnabled = gc.isenabled()
+        gc.disable()
         try:
-            root = et.parse(inputFile).getroot()
+            if isinstance(inputFile, str):
+                with open(inputFile, 'rb') as file:
+                    parser.ParseFile(file)
+            else:
+                parser.ParseFile(getattr(inputFile, 'buffer', inputFile))
         except:
             raise InterpretException('Invalid xml structure', ReturnCodes.INVALID_XML_STRUCTURE)
-            
+        finally:
+            if gcWasEnabled:
+                gc.enable()
+
+        if self.__error is not None:
+            raise self.__error
+        self.instructions = self.__orderInstructions()
+
+    """
+    Handles an opening tag of an element.
+    The root element is the program, its children are instructions
+    and their children are arguments.
+    """
+    def __startElement(self, tag, attributes):
+        depth = self.__depth
+        self.__depth = depth + 1
+        if self.__error is not None:
+            return
+        if depth == 0:
+            self.__runParseStep(self.__parseProgram, attributes)
+        elif depth == 1:
+            self.__instructionTag = tag
+            self.__instructionAttributes = attributes
+            self.__argumentElements = []
+        elif depth == 2:
+            self.__argumentElement = (tag, attributes, [])
+            self.__argumentElements.append(self.__argumentElement)
+        elif depth == 3:
+            self.__argumentElement = None
+
+    """
+    Handles a closing tag of an element.
+    Builds the instruction when its element is closed.
+    """
+    def __endElement(self, tag):
+        self.__depth -= 1
+        if self.__depth == 1 and self.__error is None:
+            self.__runParseStep(self.__parseInstruction, self.__instructionTag)
+
+    """
+    Collects text of an argument.
+    Only the text in front of the first nested element is the value.
+    """
+    def __characterData(self, data):
+        if self.__depth == 3 and self.__argumentElement is not None:
+            self.__argumentElement[2].append(data)
+
+    """
+    Calls the parse function unless the program has already been 
+    found invalid. Remembers the first error of the program.
+    """
+    def __runParseStep(self, parseFunction, argument):
         try:
-            self.__parseInstructions(root)
-        except InterpretException:
-            raise
+            parseFunction(argument)
+        except InterpretException as ex:
+            self.__error = ex
         except:
-            raise InterpretException('Bad xml input', ReturnCodes.INVALID_INPUT)
-            
-    
+            self.__error = InterpretException('Bad xml input', ReturnCodes.INVALID_INPUT)
+
     """
-    Parses instructrions and its attributes of the program.
-    root is the root element of the xml
+    Checks attributes of the program.
+    attributes are the attributes of the root element
     """
-    def __parseInstructions(self, root):
-        self.instructions = []
-        for attrName in root.attrib:
-            if re.match('^(language|description|name)$', attrName) is None:
+    def __parseProgram(self, attributes):
+        for attrName in attributes:
+            if attrName not in self.PROGRAM_ATTRIBUTES:
                 raise InterpretException('Invalid program attribute name', ReturnCodes.INVALID_INPUT)
-            
-        for child in root:
-            if child.tag != 'instruction':
-                raise InterpretException('Bad xml input', ReturnCodes.INVALID_INPUT)
-            arguments = self.__parseArguments(child)
-            opcode = child.attrib['opcode']
-            order = int(child.attrib['order'])
-            if order <= 0:
-                raise InterpretException('Negative order', ReturnCodes.INVALID_INPUT)
-            #if len(child.attrib) > 2:
-            #    raise InterpretException('Unsupported argument', ReturnCodes.INVALID_INPUT)
-            instr = Instruction(opcode, arguments, order)
-            self.instructions.append(instr)
-        self.instructions.sort()
-     
-    """
-    Parses arguments for the given instruction element.
+
+    """
+    Parses the instruction which has just been closed and its attributes.
+    Checks that the order of the instruction is unique.
+    tag is the tag of the closed child element of the root
+    """
+    def __parseInstruction(self, tag):
+        if tag != 'instruction':
+            raise InterpretException('Bad xml input', ReturnCodes.INVALID_INPUT)
+        arguments = self.__parseArguments(self.__argumentElements)
+        attributes = self.__instructionAttributes
+        opcode = attributes['opcode']
+        order = int(attributes['order'])
+        if order <= 0:
+            raise InterpretException('Negative order', ReturnCodes.INVALID_INPUT)
+        if order in self.__instructionsByOrder:
+            raise InterpretException('Duplicit order', ReturnCodes.INVALID_INPUT)
+        self.__instructionsByOrder[order] = Instruction(opcode, arguments, order)
+
+    """
+    Returns instructions sorted by their order.
+    If the orders are dense enough, every instruction is placed
+    directly to the position given by its order. Otherwise, only
+    the integer orders are sorted.
+    """
+    def __orderInstructions(self):
+        instructionsByOrder = self.__instructionsByOrder
+        del self.__instructionsByOrder
+        if len(instructionsByOrder) == 0:
+            return []
+
+        maximumOrder = max(instructionsByOrder)
+        if maximumOrder > 2 * len(instructionsByOrder) + 16:
+            return [instructionsByOrder[order] for order in sorted(instructionsByOrder)]
+
+        positions = [None] * (maximumOrder + 1)
+        for order, instruction in instructionsByOrder.items():
+            positions[order] = instruction
+        return [instruction for instruction in positions if instruction is not None]
+
+    """
+    Parses arguments of an instruction.
     Returns all arguments of the instruction.
-    instructionElement is an xml element representing instruction
-    """
-    def __parseArguments(self, instructionElement):
-        arguments = {}
-        for argElement in instructionElement:
-            argument = self.__parseArgument(argElement)
-            
-            if re.match('^(arg1|arg2|arg3)$', argElement.tag) is None:
+    argumentElements is a list of (tag, attributes, text parts) 
+    of the argument elements of the instruction
+    """
+    def __parseArguments(self, argumentElements):
+        arguments = [None, None, None]
+        for argumentElement in argumentElements:
+            argument = self.__parseArgument(argumentElement)
+            index = self.ARGUMENT_INDEXES.get(argumentElement[0])
+
+            if index is None:
                 raise InterpretException('Invalid argument element tag', ReturnCodes.INVALID_INPUT)
-            
-            if argElement.tag in arguments:
+
+            if arguments[index] is not None:
                 raise InterpretException('Already defined argument', ReturnCodes.INVALID_INPUT)
-            
-            arguments[argElement.tag] = argument
-        
-        orderedArguments = collections.OrderedDict(sorted(arguments.items()))
-        for index, (key, value) in enumerate(orderedArguments.items()):
-            if key != F"arg{index + 1}":
-                raise InterpretException('Missing argument', ReturnCodes.INVALID_INPUT)
-            yield value
-            
+
+            arguments[index] = argument
+
+        del arguments[len(argumentElements):]
+        if None in arguments:
+            raise InterpretException('Missing argument', ReturnCodes.INVALID_INPUT)
+        return arguments
+
     """
     Creates a new instance of the Argument class.
     If the type of the argument is nil or None, the value of the argument
     is changed to an empty string.
     """
-    def __parseArgument(self, argElement):
-        type = argElement.attrib["type"]
-        value = argElement.text
+    def __parseArgument(self, argumentElement):
+        tag, attributes, textParts = argumentElement
+        type = attributes["type"]
         if (type == "nil"):
-            value = ""
-        if (value == None):
-            value = ""
-        return Argument(type, value)
-    
+            return Argument(type, "")
+        return Argument(type, "".join(textParts))
+
     """
     Returns all instructions.
     """
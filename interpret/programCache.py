@@ -0,0 +1,269 @@
+from .argument import Argument
+from .instruction import Instruction
+from .operand import *
+from .return_codes import *
+from collections import OrderedDict
+import marshal
+import os
+import time
+
+"""
+The ProgramCache stores already loaded programs in a directory.
+A program is stored after it has been successfully parsed, its operands
+decoded and its instructions created, so loading it from the cache
+skips parsing the xml file and decoding operands entirely.
+
+Programs are stored in a marshal format and they are keyed
+by a hash of the source file content.
+The least recently used programs are removed when the cache is larger
+than maximumSize bytes, and programs not used for maximumAge seconds
+are removed as well. The cache is cleaned up whenever a program is stored
+and, at most once per EVICTION_INTERVAL seconds, when a program is loaded,
+so old programs are removed even if all programs are found in the cache.
+The time of the last clean up is the time of the EVICTION_STAMP file.
+"""
+class ProgramCache:
+
+    FORMAT_VERSION = 1
+    FILE_EXTENSION = '.ippc'
+    DEFAULT_MAXIMUM_SIZE = 256 * 1024 * 1024
+    DEFAULT_MAXIMUM_AGE = 30 * 24 * 60 * 60
+    EVICTION_INTERVAL = 60 * 60
+    EVICTION_STAMP = 'evicted'
+
+    def __init__(self, directory, maximumSize = DEFAULT_MAXIMUM_SIZE, maximumAge = DEFAULT_MAXIMUM_AGE):
+        self.__directory = directory
+        self.__maximumSize = maximumSize
+        self.__maximumAge = maximumAge
+        try:
+            os.makedirs(directory, exist_ok = True)
+        except OSError:
+            raise InterpretException('Cannot create cache directory', ReturnCodes.OUTPUT_FILE_ERROR)
+
+    """
+    Returns a key of the program given by the content of its source file.
+    """
+    def getKey(self, source):
+        return getProgramKey(source)
+
+    """
+    Returns a list of Instruction with decoded arguments
+    of the program stored under the key, or None if there is no such program.
+    """
+    def load(self, key):
+        self.__evictPeriodically()
+        path = self.__getPath(key)
+        try:
+            with open(path, 'rb') as file:
+                version, encodedInstructions = marshal.loads(file.read())
+        except OSError:
+            return None
+        except (EOFError, ValueError, TypeError):
+            self.__remove(path)
+            return None
+        if version != self.FORMAT_VERSION:
+            self.__remove(path)
+            return None
+
+        self.__touch(path)
+        return decodeInstructions(encodedInstructions)
+
+    """
+    Stores the program under the key.
+    instructions is a list of loaded instructions of the Processor
+    """
+    def store(self, key, instructions):
+        encodedInstructions = encodeInstructions(instructions)
+        temporaryPath = None
+        import tempfile
+        try:
+            descriptor, temporaryPath = tempfile.mkstemp(suffix = '.tmp', dir = self.__directory)
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(marshal.dumps((self.FORMAT_VERSION, encodedInstructions)))
+            os.replace(temporaryPath, self.__getPath(key))
+        except OSError:
+            # The program runs without the cache if it cannot be stored.
+            if temporaryPath != None:
+                self.__remove(temporaryPath)
+            return
+        self.evict()
+
+    """
+    Removes programs older than maximumAge and then the least
+    recently used programs until the cache fits into maximumSize.
+    """
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.__directory):
+            if not name.endswith(self.FILE_EXTENSION):
+                continue
+            path = os.path.join(self.__directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        oldestAllowed = time.time() - self.__maximumAge
+        entries.sort()
+        totalSize = sum(size for _, size, _ in entries)
+        for modified, size, path in entries:
+            if modified >= oldestAllowed and totalSize <= self.__maximumSize:
+                break
+            self.__remove(path)
+            totalSize -= size
+        self.__touchStamp()
+
+    """
+    Cleans up the cache if it hasn't been cleaned up for EVICTION_INTERVAL
+    seconds, or for maximumAge seconds if it is shorter.
+    """
+    def __evictPeriodically(self):
+        try:
+            evicted = os.stat(self.__getStampPath()).st_mtime
+        except OSError:
+            evicted = 0
+        if time.time() - evicted >= min(self.EVICTION_INTERVAL, self.__maximumAge):
+            self.evict()
+
+    def __getPath(self, key):
+        return os.path.join(self.__directory, key + self.FILE_EXTENSION)
+
+    def __getStampPath(self):
+        return os.path.join(self.__directory, self.EVICTION_STAMP)
+
+    """
+    Records the time of the clean up of the cache.
+    """
+    def __touchStamp(self):
+        try:
+            with open(self.__getStampPath(), 'a'):
+                pass
+            os.utime(self.__getStampPath())
+        except OSError:
+            pass
+
+    """
+    Marks the program as recently used.
+    """
+    def __touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def __remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+"""
+The MemoryProgramCache keeps already loaded programs in memory,
+so a process running many programs, such as the daemon, loads
+every program only once. It is used the same way as the ProgramCache.
+
+Programs are kept in their encoded form, so every load creates
+new instructions and no objects are shared by two runs of a program.
+The least recently used programs are removed when the cache
+holds more than maximumPrograms programs.
+"""
+class MemoryProgramCache:
+
+    DEFAULT_MAXIMUM_PROGRAMS = 64
+
+    def __init__(self, maximumPrograms = DEFAULT_MAXIMUM_PROGRAMS):
+        self.__maximumPrograms = maximumPrograms
+        self.__programs = OrderedDict()
+
+    """
+    Returns a key of the program given by the content of its source file.
+    """
+    def getKey(self, source):
+        return getProgramKey(source)
+
+    """
+    Returns a list of Instruction with decoded arguments
+    of the program stored under the key, or None if there is no such program.
+    """
+    def load(self, key):
+        encodedInstructions = self.__programs.get(key)
+        if encodedInstructions == None:
+            return None
+        self.__programs.move_to_end(key)
+        return decodeInstructions(encodedInstructions)
+
+    """
+    Stores the program under the key.
+    instructions is a list of loaded instructions of the Processor
+    """
+    def store(self, key, instructions):
+        self.storeEncoded(key, encodeInstructions(instructions))
+
+    """
+    Returns the encoded instructions of the program stored under the key,
+    or None if there is no such program. The daemon passes them from the
+    process which loaded the program to the cache of the daemon.
+    """
+    def getEncoded(self, key):
+        return self.__programs.get(key)
+
+    """
+    Stores the encoded instructions of the program under the key.
+    """
+    def storeEncoded(self, key, encodedInstructions):
+        self.__programs[key] = encodedInstructions
+        self.touch(key)
+        while len(self.__programs) > self.__maximumPrograms:
+            self.__programs.popitem(last = False)
+
+    """
+    Marks the program stored under the key as the most recently used.
+    """
+    def touch(self, key):
+        if key in self.__programs:
+            self.__programs.move_to_end(key)
+
+    def __contains__(self, key):
+        return key in self.__programs
+
+    def __len__(self):
+        return len(self.__programs)
+
+"""
+Returns a key of the program given by the content of its source file.
+"""
+def getProgramKey(source):
+    import hashlib
+    digest = hashlib.sha256(source)
+    digest.update(F":{ProgramCache.FORMAT_VERSION}".encode())
+    return digest.hexdigest()
+
+"""
+Returns the loaded instructions encoded as tuples of the opcode,
+the order and the (type, value) pairs of the created operands.
+"""
+def encodeInstructions(instructions):
+    return [(instruction.opcode, instruction.order, tuple(encodeOperand(operand) for operand in instruction.operands))
+            for instruction in instructions]
+
+"""
+Returns a list of Instruction with decoded arguments of the encoded instructions.
+"""
+def decodeInstructions(encodedInstructions):
+    return [Instruction(opcode, [Argument(type, value, decoded = True) for type, value in arguments], order)
+            for opcode, order, arguments in encodedInstructions]
+
+"""
+Returns the (type, value) pair of the created operand.
+"""
+def encodeOperand(operand):
+    if isinstance(operand, VariableOperand):
+        return ('var', operand.getFrameName())
+    elif isinstance(operand, ConstantOperand):
+        return (operand.getType(), operand.getValue())
+    elif isinstance(operand, LabelOperand):
+        return ('label', operand.getValue())
+    elif isinstance(operand, TypeOperand):
+        return ('type', operand.getValue())
+    raise InterpretException('Unknown operand', ReturnCodes.INTERNAL_ERROR)
@@ -0,0 +1,198 @@
+from .return_codes import *
+from time import perf_counter
+import sys
+
+"""
+The registry of the statistics collectors indexed by their names.
+Every collector is requested by the option with its name, such as --insts,
+and it is written under its name to the JSON document.
+"""
+statisticsCollectors = {}
+
+"""
+Class decorator registering the decorated collector class
+for the given name.
+"""
+def registerCollector(name):
+    def register(collectorClass):
+        if name in statisticsCollectors:
+            raise ValueError(F"Collector {name} is already registered")
+        collectorClass.name = name
+        statisticsCollectors[name] = collectorClass
+        return collectorClass
+    return register
+
+"""
+The phases of the interpretation measured by the Statistics.
+Loading reads and parses the source, decoding creates the instructions
+and executing runs them by the engine.
+"""
+PHASES = ('load', 'decode', 'execute')
+
+"""
+The Statistics holds the collectors requested for the statistics file
+and the components of the interpret they collect the values from.
+
+The requested collectors are known before the components are created,
+so the components maintaining their maximums on the hot paths,
+such as the CountedDataStack, are created only if isEnabled says
+their collector was requested.
+"""
+class Statistics:
+
+    """
+    names are the names of the requested collectors in the order
+    in which their values are written in the line format.
+    """
+    def __init__(self, names):
+        self.collectors = [statisticsCollectors[name]() for name in names]
+        self.phaseTimes = dict.fromkeys(PHASES, 0.0)
+        self.__phase = None
+        self.__phaseStart = 0.0
+
+    """
+    Returns True if the collector of the given name was requested.
+    """
+    def isEnabled(self, name):
+        return any(collector.name == name for collector in self.collectors)
+
+    """
+    Sets the components of the interpret the collectors read.
+    """
+    def attach(self, instructionCounter, frameModel, dataStack, outputWriter):
+        self.instructionCounter = instructionCounter
+        self.frameModel = frameModel
+        self.dataStack = dataStack
+        self.outputWriter = outputWriter
+
+    """
+    Ends the current phase and starts measuring the given phase.
+    The phase None only ends the current phase.
+    """
+    def startPhase(self, phase):
+        now = perf_counter()
+        if self.__phase != None:
+            self.phaseTimes[self.__phase] += now - self.__phaseStart
+        self.__phase = phase
+        self.__phaseStart = now
+
+    """
+    Writes the values of the collectors to the file.
+    The line format has every value on its own line in the order
+    of the collectors, the json format is an object of the values
+    indexed by the names of the collectors.
+    """
+    def write(self, file, format = 'lines'):
+        if format == 'json':
+            import json
+            document = { collector.name: collector.getValue(self) for collector in self.collectors }
+            json.dump(document, file, indent = 2)
+            file.write("\n")
+        else:
+            for collector in self.collectors:
+                for line in collector.getLines(self):
+                    file.write(F"{line}\n")
+
+"""
+The StatisticsCollector is the base class of the collectors.
+A collector returns its value from the components of the interpret
+attached to the statistics.
+"""
+class StatisticsCollector:
+
+    description = ''
+
+    def getValue(self, statistics):
+        raise NotImplementedError()
+
+    """
+    Returns the lines of the value in the line format.
+    """
+    def getLines(self, statistics):
+        return [self.getValue(statistics)]
+
+@registerCollector('insts')
+class ExecutedInstructionsCollector(StatisticsCollector):
+
+    description = 'Write number of executed instructions to stats file.'
+
+    def getValue(self, statistics):
+        return statistics.instructionCounter.executedInstructions
+
+@registerCollector('vars')
+class MaximumVariablesCollector(StatisticsCollector):
+
+    description = 'Write the maximum number of initialized variables to stats file.'
+
+    def getValue(self, statistics):
+        return statistics.frameModel.maximumVariables
+
+@registerCollector('stack')
+class MaximumStackDepthCollector(StatisticsCollector):
+
+    description = 'Write the maximum depth of the data stack to stats file.'
+
+    def getValue(self, statistics):
+        return statistics.dataStack.maximumDepth
+
+@registerCollector('calls')
+class MaximumCallDepthCollector(StatisticsCollector):
+
+    description = 'Write the maximum depth of the call stack to stats file.'
+
+    def getValue(self, statistics):
+        return statistics.instructionCounter.callStack.maximumDepth
+
+@registerCollector('frames')
+class MaximumLocalFramesCollector(StatisticsCollector):
+
+    description = 'Write the maximum number of local frames to stats file.'
+
+    def getValue(self, statistics):
+        return statistics.frameModel.maximumLocalFrames
+
+@registerCollector('bytes')
+class OutputBytesCollector(StatisticsCollector):
+
+    description = 'Write the number of bytes of the program output to stats file.'
+
+    def getValue(self, statistics):
+        return statistics.outputWriter.writtenBytes
+
+"""
+The peak resident set size of the whole process in bytes.
+It is available only on the platforms with the resource module.
+"""
+@registerCollector('rss')
+class PeakMemoryCollector(StatisticsCollector):
+
+    description = 'Write the peak resident memory of the interpret in bytes to stats file.'
+
+    def __init__(self):
+        try:
+            import resource
+        except ImportError:
+            raise InterpretException('--rss is not supported on this platform', ReturnCodes.SCRIPT_PARAMETER_ERROR)
+        self.__resource = resource
+
+    def getValue(self, statistics):
+        resource = self.__resource
+        maximumResidentSize = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            return maximumResidentSize
+        return maximumResidentSize * 1024
+
+"""
+The wall times of the phases in seconds. The line format
+has a line for every phase in the order of PHASES.
+"""
+@registerCollector('times')
+class PhaseTimesCollector(StatisticsCollector):
+
+    description = 'Write the load, decode and execute times in seconds to stats file.'
+
+    def getValue(self, statistics):
+        return dict(statistics.phaseTimes)
+
+    def getLines(self, statistics):
+        return [F"{statistics.phaseTimes[phase]:.6f}" for phase in PHASES]
@@ -0,0 +1,70 @@
+"""
+The StringBuffer holds a string which can be changed in place.
+
+Appended strings are collected as parts and joined only when the whole
+string is needed, so building a string by appending is linear.
+When a character is replaced for the first time, the string is turned
+into a list of characters, which the following replacements change directly.
+The built string is cached until the buffer changes again.
+
+Copying a short string is faster than keeping it in a buffer,
+so only strings of at least MINIMUM_LENGTH characters are buffered.
+"""
+class StringBuffer:
+
+    MINIMUM_LENGTH = 256
+
+    __slots__ = ('parts', 'characters', 'length', 'string')
+
+    def __init__(self, string):
+        self.parts = [string]
+        self.characters = None
+        self.length = len(string)
+        self.string = string
+
+    """
+    Appends the string to the end of the buffer.
+    """
+    def append(self, string):
+        if self.characters is None:
+            self.parts.append(string)
+        else:
+            self.characters.extend(string)
+        self.length += len(string)
+        self.string = None
+
+    """
+    Replaces the character at the index.
+    The index has to be in the range of the string.
+    """
+    def setCharacter(self, index, character):
+        if self.characters is None:
+            self.characters = list(self.toString())
+            self.parts = None
+        self.characters[index] = character
+        self.string = None
+
+    """
+    Returns the whole string.
+    """
+    def toString(self):
+        string = self.string
+        if string is None:
+            if self.characters is None:
+                string = ''.join(self.parts)
+                self.parts = [string]
+            else:
+                string = ''.join(self.characters)
+            self.string = string
+        return string
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if self.characters is None:
+            return self.toString()[index]
+        return self.characters[index]
+
+    def __str__(self):
+        return self.toString()
@@ -0,0 +1,680 @@
+from .processor import *
+from .operand import *
+from .return_codes import *
+from .closureEngine import raiseArithmeticTypeError
+
+"""
+The Transpiler is an alternative to the execution loop of the Processor.
+
+Before running, the whole loaded program is translated into the source
+of a single Python function, which is compiled by compile() and called.
+The program is split into basic blocks, which start at labels and after
+instructions changing the program counter. The function executes
+the blocks in a dispatch loop. A jump sets the number of the next block,
+CALL and RETURN use an explicit stack of return blocks.
+
+Variables of the global frame are local variables of the function,
+a value and a type for every variable. The type of an undefined variable
+is False and every access to the variable checks it, so an undefined
+variable is reported the same way as an unknown variable of a frame.
+Variables of the local and temporary frames are looked up
+in the frame model.
+
+Instructions without a translation are executed by their execute method.
+If such an instruction refers to a variable of the global frame
+or the function cannot be compiled, the program is executed
+by the Processor instead. Programs of any length are translated,
+translating and compiling take time proportional to the length
+of the program, a few times the time of loading it.
+The transpiled program produces the same output, errors and statistics
+as the Processor.
+"""
+class Transpiler:
+
+    def __init__(self, processor):
+        self.__processor = processor
+        self.__frameModel = processor.frameModel
+        self.__instructionCounter = processor.instructionCounter
+        self.__translators = {
+            DefvarInstruction: self.__translateDefvar,
+            MoveInstruction: self.__translateMove,
+            WriteInstruction: self.__translateWrite,
+            ReadInstruction: self.__translateRead,
+            TypeInstruction: self.__translateType,
+            CreateframeInstruction: self.__translateFrameOperation,
+            PushframeInstruction: self.__translateFrameOperation,
+            PopframeInstruction: self.__translateFrameOperation,
+            CallInstruction: self.__translateCall,
+            ReturnInstruction: self.__translateReturn,
+            LabelInstruction: self.__translateLabel,
+            JumpInstruction: self.__translateJump,
+            JumpifeqInstruction: self.__translateJumpifeq,
+            JumpifneqInstruction: self.__translateJumpifeq,
+            JumpifeqsInstruction: self.__translateJumpifeqs,
+            JumpifneqsInstruction: self.__translateJumpifeqs,
+            ExitInstruction: self.__translateExit,
+            ConcatInstruction: self.__translateConcat,
+            StrlenInstruction: self.__translateStrlen,
+            GetcharInstruction: self.__translateGetchar,
+            SetcharInstruction: self.__translateSetchar,
+            Int2charInstruction: self.__translateInt2char,
+            Stri2intInstruction: self.__translateStri2int,
+            Int2floatInstruction: self.__translateConversion,
+            Float2intInstruction: self.__translateConversion,
+            AddInstruction: self.__translateArithmetic,
+            SubInstruction: self.__translateArithmetic,
+            MulInstruction: self.__translateArithmetic,
+            IdivInstruction: self.__translateDivision,
+            DivInstruction: self.__translateDivision,
+            LtInstruction: self.__translateRelational,
+            GtInstruction: self.__translateRelational,
+            EqInstruction: self.__translateRelational,
+            AndInstruction: self.__translateLogical,
+            OrInstruction: self.__translateLogical,
+            NotInstruction: self.__translateNot,
+            PushsInstruction: self.__translatePushs,
+            PopsInstruction: self.__translatePops,
+            AddsInstruction: self.__translateStackArithmetic,
+            SubsInstruction: self.__translateStackArithmetic,
+            MulsInstruction: self.__translateStackArithmetic,
+        }
+
+    """
+    Translates the loaded instructions of the processor and executes them.
+    Executes them by the processor if the program cannot be translated.
+    """
+    def run(self):
+        program = self.compile(self.__processor.instructions)
+        if program == None:
+            self.__processor.run()
+            return
+        program()
+
+    """
+    Returns the compiled function executing the instructions,
+    or None if the instructions cannot be translated.
+    """
+    def compile(self, instructions):
+        source = self.translate(instructions)
+        if source == None:
+            return None
+        try:
+            code = compile(source, '<ippcode20>', 'exec')
+        except (SyntaxError, RecursionError, MemoryError, ValueError):
+            return None
+        exec(code, self.__namespace)
+        return self.__namespace['program']
+
+    """
+    Returns the source of the function executing the instructions,
+    or None if the instructions cannot be translated.
+    """
+    def translate(self, instructions):
+        self.__namespace = {
+            'E': InterpretException,
+            'R': ReturnCodes,
+            'write': self.__processor.outputWriter.write,
+            'flush': self.__processor.outputWriter.flush,
+            'push': self.__processor.dataStack.push,
+            'pop': self.__processor.dataStack.pop,
+            'stop': self.__processor.stop,
+            'defvar': self.__frameModel.defineVariable,
+            'initialized': self.__frameModel.variableInitialized,
+            'counter': self.__instructionCounter,
+            'returns': self.__instructionCounter.callStack,
+            'readValue': readValue,
+            'readLine': self.__processor.inputReader.readLine,
+            'raiseArithmeticTypeError': raiseArithmeticTypeError,
+        }
+        self.__globalVariables = {}
+        self.__countVariables = self.__frameModel.countVariables
+
+        blockStarts = self.__findBlockStarts(instructions)
+        self.__blockNumbers = { start: number for number, start in enumerate(blockStarts) }
+
+        blocks = []
+        for number, start in enumerate(blockStarts):
+            end = blockStarts[number + 1] if number + 1 < len(blockStarts) else len(instructions)
+            lines = [F"executed += {end - start}"]
+            self.__nextBlock = number + 1
+            for instruction in instructions[start:end]:
+                translator = self.__translators.get(type(instruction), self.__translateGeneric)
+                translation = translator(instruction)
+                if translation == None:
+                    return None
+                lines.extend(translation)
+            if not self.__isBlockEnd(instructions[end - 1]):
+                lines.append(F"b = {number + 1}")
+            blocks.append(lines)
+        blocks.append(["return"])
+
+        lines = ["def program():",
+                 "    executed = 0",
+                 "    b = 0"]
+        lines.extend(F"    t{number} = False" for number in self.__globalVariables.values())
+        lines += ["    try:",
+                 "        while True:"]
+        self.__dispatch(lines, blocks, 0, len(blocks), "            ")
+        lines.append("    finally:")
+        lines.append("        counter.executedInstructions += executed")
+        return "\n".join(lines) + "\n"
+
+    """
+    Returns indexes of the first instructions of basic blocks.
+    A block starts with the first instruction, a label
+    and an instruction following a jump.
+    """
+    def __findBlockStarts(self, instructions):
+        starts = set()
+        if len(instructions) > 0:
+            starts.add(0)
+        for index, instruction in enumerate(instructions):
+            if isinstance(instruction, LabelInstruction):
+                starts.add(index)
+            elif self.__isBlockEnd(instruction) and index + 1 < len(instructions):
+                starts.add(index + 1)
+        return sorted(starts)
+
+    """
+    Returns True if the instruction may change the program counter.
+    """
+    def __isBlockEnd(self, instruction):
+        return isinstance(instruction, (JumpInstruction, JumpifeqInstruction, JumpifneqInstruction,
+                                        JumpifeqsInstruction, JumpifneqsInstruction, CallInstruction,
+                                        ReturnInstruction, ExitInstruction))
+
+    """
+    Appends statements selecting the block by its number b
+    in a binary tree of conditions.
+    """
+    def __dispatch(self, lines, blocks, first, last, indent):
+        if last - first == 1:
+            lines.extend(indent + line for line in blocks[first])
+            return
+        middle = (first + last) // 2
+        lines.append(F"{indent}if b < {middle}:")
+        self.__dispatch(lines, blocks, first, middle, indent + "    ")
+        lines.append(F"{indent}else:")
+        self.__dispatch(lines, blocks, middle, last, indent + "    ")
+
+    """
+    Adds the object to the namespace of the function
+    and returns its name.
+    """
+    def __bind(self, value, prefix):
+        name = F"{prefix}{len(self.__namespace)}"
+        self.__namespace[name] = value
+        return name
+
+    """
+    Returns an expression of the constant value.
+    """
+    def __literal(self, value):
+        if value is None or isinstance(value, (bool, str)):
+            return repr(value)
+        if isinstance(value, int) and -2**63 <= value < 2**63:
+            return repr(value)
+        return self.__bind(value, 'k')
+
+    """
+    Returns the number of the local variables of the global variable.
+    """
+    def __globalVariable(self, operand):
+        return self.__globalVariables.setdefault(operand.identifier, len(self.__globalVariables))
+
+    """
+    Returns statements raising the exception
+    if the variable of the global frame isn't defined.
+    """
+    def __checkDefined(self, operand, number):
+        message = F"Unknown variable: {operand.identifier}"
+        return [F"if t{number} is False: raise E({message!r}, R.UKNOWN_VARIABLE)"]
+
+    """
+    Returns a Symbol of the operand.
+    Variables of the global frame are looked up by reading their
+    local variable, other variables by their operand.
+    """
+    def __symbol(self, operand):
+        if isinstance(operand, GlobalVariableOperand):
+            number = self.__globalVariable(operand)
+            return Symbol(self.__checkDefined(operand, number), F"v{number}", F"t{number}")
+        if isinstance(operand, VariableOperand):
+            getter = self.__bind(operand.getVariable, 'g')
+            name = 'x' + getter[1:]
+            return Symbol([F"{name} = {getter}()"], F"{name}.value", F"{name}.type")
+        return Symbol([], self.__literal(operand.getValue()), repr(operand.getType()), operand.getType())
+
+    """
+    Returns a Destination of the variable operand.
+    """
+    def __destination(self, operand):
+        if isinstance(operand, GlobalVariableOperand):
+            number = self.__globalVariable(operand)
+            return Destination(self.__checkDefined(operand, number), F"v{number}", F"t{number}", self.__countVariables)
+        getter = self.__bind(operand.getVariable, 'g')
+        name = 'x' + getter[1:]
+        return Destination([F"{name} = {getter}()"], None, name, False)
+
+    """
+    Returns statements raising the exception
+    if the symbol has no value.
+    """
+    def __checkValue(self, symbol):
+        if symbol.constantType != None:
+            return []
+        return [F"if {symbol.type} is None: raise E('Missing value in operand', R.MISSING_VALUE)"]
+
+    """
+    Returns statements looking up the symbols which raise
+    an exception if any of the symbols has no value.
+    """
+    def __values(self, symbols):
+        lines = []
+        for symbol in symbols:
+            lines.extend(symbol.fetch)
+            lines.extend(self.__checkValue(symbol))
+        return lines
+
+    """
+    Returns the number of the block of the label,
+    or None if the label doesn't exist.
+    """
+    def __target(self, labelOperand):
+        index = self.__instructionCounter.labels.get(labelOperand.getValue())
+        if index == None:
+            return None
+        return self.__blockNumbers[index]
+
+    """
+    Returns statements jumping to the block of the label,
+    which raise an exception if the label doesn't exist.
+    """
+    def __jumpTo(self, labelOperand, message):
+        target = self.__target(labelOperand)
+        if target == None:
+            return [F"raise E({message!r}, R.SEMANTIC_ERROR)"]
+        return [F"b = {target}"]
+
+    """
+    Executes the instruction by its execute method.
+    Returns None if the instruction refers to a variable
+    of the global frame, which is a local variable of the function.
+    """
+    def __translateGeneric(self, instruction):
+        if any(isinstance(operand, GlobalVariableOperand) for operand in instruction.operands):
+            return None
+        return [F"{self.__bind(instruction.execute, 'e')}()"]
+
+    def __translateDefvar(self, instruction):
+        operand = instruction.operands[0]
+        if not isinstance(operand, GlobalVariableOperand):
+            return [F"defvar({operand.frameName!r}, {operand.identifier!r})"]
+        number = self.__globalVariable(operand)
+        return [F"if t{number} is not False: raise E('Redefinition of variable', R.SEMANTIC_ERROR)",
+                F"v{number} = None",
+                F"t{number} = None"]
+
+    def __translateMove(self, instruction):
+        destination = self.__destination(instruction.operands[0])
+        source = self.__symbol(instruction.operands[1])
+        return (destination.fetch + source.fetch + self.__checkValue(source)
+                + destination.set(source.value, source.type))
+
+    def __translateWrite(self, instruction):
+        source = self.__symbol(instruction.operands[0])
+        lines = source.fetch + self.__checkValue(source)
+        if source.constantType != None:
+            return lines + self.__write(source.value, source.constantType)
+
+        lines.append(F"u1 = {source.type}")
+        condition = "if"
+        for type in [INT_TYPE, STRING_TYPE, BOOL_TYPE, FLOAT_TYPE]:
+            lines.append(F"{condition} u1 == {type!r}:")
+            lines.extend("    " + line for line in self.__write(source.value, type))
+            condition = "elif"
+        lines.append("elif u1 != 'nil':")
+        lines.append("    raise E('WRITE: Invalid argument type', R.INVALID_INPUT)")
+        return lines
+
+    """
+    Returns statements writing the value of the given type.
+    """
+    def __write(self, value, type):
+        if type is INT_TYPE:
+            return [F"write(str({value}))"]
+        if type is STRING_TYPE:
+            return [F"write({value})"]
+        if type is BOOL_TYPE:
+            return [F"write('true' if {value} else 'false')"]
+        if type is FLOAT_TYPE:
+            return [F"write({value}.hex())"]
+        if type is NIL_TYPE:
+            return []
+        return ["raise E('WRITE: Invalid argument type', R.INVALID_INPUT)"]
+
+    def __translateRead(self, instruction):
+        if not isinstance(instruction.operands[0], VariableOperand):
+            return self.__translateGeneric(instruction)
+        destination = self.__destination(instruction.operands[0])
+        type = instruction.operands[1].getValue()
+        return (destination.fetch + ["flush()", F"a1, u1 = readValue(readLine, {type!r})"]
+                + destination.set("a1", "u1"))
+
+    def __translateType(self, instruction):
+        destination = self.__destination(instruction.operands[0])
+        source = self.__symbol(instruction.operands[1])
+        return (destination.fetch + source.fetch
+                + destination.set(F"{source.type} or ''", "'string'"))
+
+    """
+    Translates CREATEFRAME, PUSHFRAME and POPFRAME.
+    """
+    def __translateFrameOperation(self, instruction):
+        operation = { CreateframeInstruction: self.__frameModel.resetTemporaryFrame,
+                      PushframeInstruction: self.__frameModel.pushTempFrameToLocalFrameStack,
+                      PopframeInstruction: self.__frameModel.popFromLocalFrameStackToTempFrame }[type(instruction)]
+        return [F"{self.__bind(operation, 'f')}()"]
+
+    def __translateCall(self, instruction):
+        return [F"returns.append({self.__nextBlock})"] + self.__jumpTo(instruction.operands[0], 'Label doesnt exist')
+
+    def __translateReturn(self, instruction):
+        return ["if len(returns) == 0: raise E('Callstack is empty', R.MISSING_VALUE)",
+                "b = returns.pop()"]
+
+    def __translateLabel(self, instruction):
+        return []
+
+    def __translateJump(self, instruction):
+        return self.__jumpTo(instruction.operands[0], 'Label doesnt exist')
+
+    """
+    Translates JUMPIFEQ and JUMPIFNEQ.
+    """
+    def __translateJumpifeq(self, instruction):
+        comparison = '==' if isinstance(instruction, JumpifeqInstruction) else '!='
+        symbol1 = self.__symbol(instruction.operands[1])
+        symbol2 = self.__symbol(instruction.operands[2])
+        lines = self.__values([symbol1, symbol2])
+        return lines + self.__conditionalJump(instruction, symbol1.value, symbol1.type,
+                                              symbol2.value, symbol2.type, comparison)
+
+    """
+    Translates JUMPIFEQS and JUMPIFNEQS.
+    """
+    def __translateJumpifeqs(self, instruction):
+        comparison = '==' if isinstance(instruction, JumpifeqsInstruction) else '!='
+        lines = ["a2, u2 = pop()", "a1, u1 = pop()"]
+        return lines + self.__conditionalJump(instruction, "a1", "u1", "a2", "u2", comparison)
+
+    """
+    Returns statements of a conditional jump comparing two values
+    which have been checked to have a value.
+    """
+    def __conditionalJump(self, instruction, value1, type1, value2, type2, comparison):
+        target = self.__target(instruction.operands[0])
+        if target == None:
+            return ["raise E('Undefined label', R.SEMANTIC_ERROR)"]
+        return [F"if {type1} != {type2} and {type1} != 'nil' and {type2} != 'nil':",
+                F"    raise E('{instruction.opcode}: Types differ', R.BAD_OPERANDS)",
+                F"b = {target} if {value1} {comparison} {value2} else {self.__nextBlock}"]
+
+    def __translateExit(self, instruction):
+        source = self.__symbol(instruction.operands[0])
+        return source.fetch + self.__checkValue(source) + [
+            F"if {source.type} != 'int': raise E('EXIT: Invalid exit code operand', R.BAD_OPERANDS)",
+            F"if {source.value} < 0 or {source.value} > 49: raise E('EXIT: Invalid exit code', R.BAD_OPERAND_VALUE)",
+            F"stop({source.value})",
+            "return"]
+
+    def __translateConcat(self, instruction):
+        destination = self.__destination(instruction.operands[0])
+        symbol1 = self.__symbol(instruction.operands[1])
+        symbol2 = self.__symbol(instruction.operands[2])
+        return self.__values([symbol1, symbol2]) + destination.fetch + [
+            F"if {symbol1.type} != 'string' or {symbol2.type} != 'string':",
+            "    raise E('CONCAT: Invalid operand types', R.BAD_OPERANDS)"] \
+            + destination.set(F"{symbol1.value} + {symbol2.value}", "'string'")
+
+    def __translateStrlen(self, instruction):
+        destination = self.__destination(instruction.operands[0])
+        symbol = self.__symbol(instruction.operands[1])
+        return self.__values([symbol]) + destination.fetch + [
+            F"if {symbol.type} != 'string': raise E('STRLEN: Invalid operand types', R.BAD_OPERANDS)"] \
+            + destination.set(F"len({symbol.value})", "'int'")
+
+    def __translateGetchar(self, instruction):
+        destination = self.__destination(instruction.operands[0])
+        string = self.__symbol(instruction.operands[1])
+        index = self.__symbol(instruction.operands[2])
+        return self.__values([string, index]) + destination.fetch + [
+            F"if {index.type} != 'int' or {string.type} != 'string':",
+            "    raise E('GETCHAR: Invalid operand types', R.BAD_OPERANDS)",
+            F"if {index.value} < 0 or {index.value} >= len({string.value}):",
+            "    raise E('GETCHAR: Invalid operand types', R.INVALID_STRING_OPERATION)"] \
+            + destination.set(F"{string.value}[{index.value}]", "'string'")
+
+    def __translateSetchar(self, instruction):
+        destination = self.__destination(instruction.operands[0])
+        string = self.__symbol(instruction.operands[0])
+        index = self.__symbol(instruction.operands[1])
+        source = self.__symbol(instruction.operands[2])
+        return self.__values([string, index, source]) + destination.fetch + [
+            F"if {string.type} != 'string' or {index.type} != 'int' or {source.type} != 'string':",
+            "    raise E('SETCHAR: Invalid operand types', R.BAD_OPERANDS)",
+            F"a1 = {string.value}",
+            F"a2 = {index.value}",
+            F"if a2 < 0 or a2 >= len(a1) or len({source.value}) == 0:",
+            "    raise E('SETCHAR: Invalid operand types', R.INVALID_STRING_OPERATION)"] \
+            + destination.set(F"a1[:a2] + {source.value}[0] + a1[a2 + 1:]", "'string'")
+
+    def __translateInt2char(self, instruction):
+        destination = self.__destination(instruction.operands[0])
+        symbol = self.__symbol(instruction.operands[1])
+        return self.__values([symbol]) + destination.fetch + [
+            F"if {symbol.type} != 'int': raise E('INT2CHAR: Invalid operand types', R.BAD_OPERANDS)",
+            "try:",
+            F"    a1 = chr({symbol.value})",
+            "except ValueError:",
+            "    raise E('INT2CHAR: Invalid operand types', R.INVALID_STRING_OPERATION)"] \
+            + destination.set("a1", "'string'")
+
+    def __translateStri2int(self, instruction):
+        destination = self.__destination(instruction.operands[0])
+        string = self.__symbol(instruction.operands[1])
+        index = self.__symbol(instruction.operands[2])
+        return self.__values([string, index]) + destination.fetch + [
+            F"if {string.type} != 'string' or {index.type} != 'int':",
+            "    raise E('STRI2INT: Invalid operand types', R.BAD_OPERANDS)",
+            F"if {index.value} < 0 or {index.value} >= len({string.value}):",
+            "    raise E('STRI2INT: Invalid operand types', R.INVALID_STRING_OPERATION)"] \
+            + destination.set(F"ord({string.value}[{index.value}])", "'int'")
+
+    """
+    Translates INT2FLOAT and FLOAT2INT.
+    """
+    def __translateConversion(self, instruction):
+        if isinstance(instruction, Int2floatInstruction):
+            sourceType, function, resultType = INT_TYPE, 'float', FLOAT_TYPE
+        else:
+            sourceType, function, resultType = FLOAT_TYPE, 'int', INT_TYPE
+        destination = self.__destination(instruction.operands[0])
+        symbol = self.__symbol(instruction.operands[1])
+        return self.__values([symbol]) + destination.fetch + [
+            F"if {symbol.type} != {sourceType!r}:",
+            F"    raise E('{instruction.opcode}: Invalid operand types', R.BAD_OPERANDS)"] \
+            + destination.set(F"{function}({symbol.value})", repr(resultType))
+
+    """
+    Returns statements raising the exception of ArithmeticInstruction
+    for invalid operand types.
+    """
+    def __checkArithmeticTypes(self, symbol1, symbol2):
+        return [F"if {symbol1.type} != {symbol2.type} or ({symbol1.type} != 'int' and {symbol1.type} != 'float'):",
+                F"    raiseArithmeticTypeError({symbol1.type}, {symbol2.type})"]
+
+    """
+    Translates ADD, SUB and MUL.
+    """
+    def __translateArithmetic(self, instruction):
+        operation = { AddInstruction: '+',
+                      SubInstruction: '-',
+                      MulInstruction: '*' }[type(instruction)]
+        destination = self.__destination(instruction.operands[0])
+        symbol1 = self.__symbol(instruction.operands[1])
+        symbol2 = self.__symbol(instruction.operands[2])
+        return (symbol1.fetch + symbol2.fetch + self.__checkArithmeticTypes(symbol1, symbol2)
+                + destination.fetch
+                + destination.set(F"{symbol1.value} {operation} {symbol2.value}", symbol1.type))
+
+    """
+    Translates IDIV and DIV.
+    """
+    def __translateDivision(self, instruction):
+        if isinstance(instruction, IdivInstruction):
+            operation, resultType = '//', INT_TYPE
+        else:
+            operation, resultType = '/', FLOAT_TYPE
+        name = instruction.opcode
+        destination = self.__destination(instruction.operands[0])
+        symbol1 = self.__symbol(instruction.operands[1])
+        symbol2 = self.__symbol(instruction.operands[2])
+        return symbol1.fetch + symbol2.fetch + self.__checkArithmeticTypes(symbol1, symbol2) + [
+            F"if {symbol2.value} == 0: raise E('{name}: Cannot divide by 0', R.BAD_OPERAND_VALUE)",
+            F"if {symbol1.type} != {resultType!r}: raise E('{name}: Invalid operand types', R.BAD_OPERANDS)"] \
+            + destination.fetch \
+            + destination.set(F"{symbol1.value} {operation} {symbol2.value}", repr(resultType))
+
+    """
+    Translates LT, GT and EQ.
+    """
+    def __translateRelational(self, instruction):
+        operation = { LtInstruction: '<',
+                      GtInstruction: '>',
+                      EqInstruction: '==' }[type(instruction)]
+        destination = self.__destination(instruction.operands[0])
+        symbol1 = self.__symbol(instruction.operands[1])
+        symbol2 = self.__symbol(instruction.operands[2])
+        if isinstance(instruction, EqInstruction):
+            nilCheck = "pass"
+        else:
+            nilCheck = F"raise E('{instruction.opcode}: Invalid operand types', R.BAD_OPERANDS)"
+        missingValues = [F"{symbol.type} is None" for symbol in [symbol1, symbol2] if symbol.constantType == None]
+        lines = symbol1.fetch + symbol2.fetch
+        if len(missingValues) > 0:
+            lines += [F"if {' or '.join(missingValues)}:",
+                      "    raise E('Relational inst: Missing value in operand', R.MISSING_VALUE)"]
+        return lines + [
+            F"if {symbol1.type} == 'nil' or {symbol2.type} == 'nil':",
+            F"    {nilCheck}",
+            F"elif {symbol1.type} != {symbol2.type}:",
+            "    raise E('Relational inst: Invalid operand types', R.BAD_OPERANDS)"] \
+            + destination.fetch \
+            + destination.set(F"{symbol1.value} {operation} {symbol2.value}", "'bool'")
+
+    """
+    Translates AND and OR.
+    """
+    def __translateLogical(self, instruction):
+        operation = 'and' if isinstance(instruction, AndInstruction) else 'or'
+        destination = self.__destination(instruction.operands[0])
+        symbol1 = self.__symbol(instruction.operands[1])
+        symbol2 = self.__symbol(instruction.operands[2])
+        return self.__values([symbol1, symbol2]) + [
+            F"if {symbol1.type} != 'bool' or {symbol2.type} != 'bool':",
+            F"    raise E('{instruction.opcode}: Invalid operand types', R.BAD_OPERANDS)"] \
+            + destination.fetch \
+            + destination.set(F"({symbol1.value} {operation} {symbol2.value})", "'bool'")
+
+    def __translateNot(self, instruction):
+        destination = self.__destination(instruction.operands[0])
+        symbol = self.__symbol(instruction.operands[1])
+        return self.__values([symbol]) + [
+            F"if {symbol.type} != 'bool': raise E('NOT: Invalid operand types', R.BAD_OPERANDS)"] \
+            + destination.fetch \
+            + destination.set(F"not {symbol.value}", "'bool'")
+
+    def __translatePushs(self, instruction):
+        symbol = self.__symbol(instruction.operands[0])
+        return self.__values([symbol]) + [F"push({symbol.value}, {symbol.type})"]
+
+    def __translatePops(self, instruction):
+        if not isinstance(instruction.operands[0], VariableOperand):
+            return self.__translateGeneric(instruction)
+        destination = self.__destination(instruction.operands[0])
+        return destination.fetch + ["a1, u1 = pop()"] + destination.set("a1", "u1")
+
+    """
+    Translates ADDS, SUBS and MULS.
+    """
+    def __translateStackArithmetic(self, instruction):
+        operation = { AddsInstruction: '+',
+                      SubsInstruction: '-',
+                      MulsInstruction: '*' }[type(instruction)]
+        return ["a2, u2 = pop()",
+                "a1, u1 = pop()",
+                "if u1 != u2 or (u1 != 'int' and u2 != 'float'):",
+                F"    raise E('{instruction.opcode}: Invalid operand types', R.BAD_OPERANDS)",
+                F"push(a1 {operation} a2, u1)"]
+
+"""
+Symbol holds statements looking up a symbol operand
+and expressions of its value and type in the transpiled function.
+constantType is the type of a constant operand.
+"""
+class Symbol:
+
+    def __init__(self, fetch, value, type, constantType = None):
+        self.fetch = fetch
+        self.value = value
+        self.type = type
+        self.constantType = constantType
+
+"""
+Destination holds statements looking up a variable operand
+and creates statements assigning the variable in the transpiled function.
+A variable of the global frame is a pair of value and type local variables,
+other variables are objects of the frames.
+"""
+class Destination:
+
+    def __init__(self, fetch, value, name, countVariables):
+        self.fetch = fetch
+        self.__value = value
+        self.__name = name
+        self.__countVariables = countVariables
+
+    """
+    Returns statements assigning the value and type expressions
+    to the variable.
+    """
+    def set(self, value, type):
+        if self.__value == None:
+            return [F"{self.__name}.set({value}, {type})"]
+        lines = []
+        if self.__countVariables:
+            lines.append(F"if {self.__name} is None: initialized()")
+        return lines + [F"{self.__value} = {value}", F"{self.__name} = {type}"]
+
+"""
+Reads a value of the given type by the readLine function
+the same way the READ instruction does.
+Returns the value and its type, nil if the value cannot be read.
+"""
+def readValue(readLine, type):
+    try:
+        value = readLine()
+        if value == None:
+            return '', NIL_TYPE
+        if type is INT_TYPE:
+            return int(value), INT_TYPE
+        if type is BOOL_TYPE:
+            return value.lower() == "true", BOOL_TYPE
+        if type is FLOAT_TYPE:
+            return float.fromhex(value), FLOAT_TYPE
+        if type is STRING_TYPE:
+            return value, STRING_TYPE
+    except:
+        pass
+    return '', NIL_TYPE
@@ -0,0 +1,461 @@
+from .processor import *
+from .operand import *
+from .return_codes import *
+import operator
+
+"""
+The TypeInference finds the types of operands which are known
+before the program is run and replaces instructions with such operands
+by variants which don't check the types of their operands.
+
+The program is split into basic blocks, which form a control-flow graph.
+A type of a global frame variable is known at an instruction if the
+variable has been assigned a value of that type on all paths leading
+to the instruction. Types of constants are always known, types of
+variables of the local and temporary frames are never known.
+Instructions with an operand of unknown type are kept checked.
+
+A variable of a known type is defined and initialized, so reading it
+cannot fail and the specialized instructions raise the same exceptions
+in the same order as the checked ones.
+"""
+class TypeInference:
+
+    """
+    Types of values assigned by the instructions.
+    ADD, SUB, MUL and MOVE assign the type of their operands.
+    """
+    RESULT_TYPES = { IdivInstruction: INT_TYPE,
+                     DivInstruction: FLOAT_TYPE,
+                     LtInstruction: BOOL_TYPE,
+                     GtInstruction: BOOL_TYPE,
+                     EqInstruction: BOOL_TYPE,
+                     AndInstruction: BOOL_TYPE,
+                     OrInstruction: BOOL_TYPE,
+                     NotInstruction: BOOL_TYPE,
+                     ConcatInstruction: STRING_TYPE,
+                     StrlenInstruction: INT_TYPE,
+                     GetcharInstruction: STRING_TYPE,
+                     SetcharInstruction: STRING_TYPE,
+                     Int2charInstruction: STRING_TYPE,
+                     Stri2intInstruction: INT_TYPE,
+                     Int2floatInstruction: FLOAT_TYPE,
+                     Float2intInstruction: INT_TYPE,
+                     TypeInstruction: STRING_TYPE }
+
+    """
+    Instructions which have a variable as the first operand,
+    but don't assign it.
+    """
+    READING_INSTRUCTIONS = (WriteInstruction, PushsInstruction, ExitInstruction, DprintInstruction)
+
+    CONDITIONAL_JUMPS = (JumpifeqInstruction, JumpifneqInstruction, JumpifeqsInstruction, JumpifneqsInstruction)
+
+    ARITHMETIC_OPERATIONS = { AddInstruction: operator.add,
+                              SubInstruction: operator.sub,
+                              MulInstruction: operator.mul }
+
+    DIVISIONS = { IdivInstruction: (operator.floordiv, INT_TYPE),
+                  DivInstruction: (operator.truediv, FLOAT_TYPE) }
+
+    """
+    Operations of instructions specialized for the given types of operands.
+    """
+    OPERATIONS = { AndInstruction: ((BOOL_TYPE, BOOL_TYPE), operator.and_),
+                   OrInstruction: ((BOOL_TYPE, BOOL_TYPE), operator.or_),
+                   NotInstruction: ((BOOL_TYPE,), operator.not_),
+                   StrlenInstruction: ((STRING_TYPE,), len),
+                   GetcharInstruction: ((STRING_TYPE, INT_TYPE), lambda string, index: getCharacter(string, index, 'GETCHAR')),
+                   Stri2intInstruction: ((STRING_TYPE, INT_TYPE), lambda string, index: ord(getCharacter(string, index, 'STRI2INT'))),
+                   Int2charInstruction: ((INT_TYPE,), lambda ordinal: toCharacter(ordinal, 'INT2CHAR')),
+                   Int2floatInstruction: ((INT_TYPE,), float),
+                   Float2intInstruction: ((FLOAT_TYPE,), int) }
+
+    """
+    Operations which only measure or index their string operand,
+    so they don't need the string of a buffered variable to be built.
+    """
+    STRING_OPERATIONS = { StrlenInstruction, GetcharInstruction }
+
+    def __init__(self):
+        self.__specializers = {
+            IdivInstruction: self.__specializeDivision,
+            DivInstruction: self.__specializeDivision,
+            LtInstruction: self.__specializeOrdering,
+            GtInstruction: self.__specializeOrdering,
+            EqInstruction: self.__specializeEquality,
+            ConcatInstruction: self.__specializeConcat,
+            SetcharInstruction: self.__specializeSetchar,
+            JumpifeqInstruction: self.__specializeJump,
+            JumpifneqInstruction: self.__specializeJump,
+        }
+        for instructionClass in self.ARITHMETIC_OPERATIONS:
+            self.__specializers[instructionClass] = self.__specializeArithmetic
+        for instructionClass in self.OPERATIONS:
+            self.__specializers[instructionClass] = self.__specializeOperation
+        self.specializedInstructions = 0
+
+    """
+    Returns a new list of instructions with the instructions
+    whose operand types are known replaced by specialized ones.
+    instructions is a list of created instructions of the processor
+    """
+    def specialize(self, instructions):
+        blocks = self.__findBlocks(instructions)
+        entryTypes = self.__inferTypes(instructions, blocks)
+
+        specialized = list(instructions)
+        for number, (start, end) in enumerate(blocks):
+            if entryTypes[number] == None:
+                continue
+            types = dict(entryTypes[number])
+            for index in range(start, end):
+                specialized[index] = self.__specializeInstruction(instructions[index], types)
+                self.__assign(instructions[index], types)
+        return specialized
+
+    """
+    Splits the instructions into basic blocks.
+    Returns a list of start and end indexes of the blocks.
+    """
+    def __findBlocks(self, instructions):
+        starts = [0] if len(instructions) > 0 else []
+        for index, instruction in enumerate(instructions):
+            if isinstance(instruction, LabelInstruction) and index > 0:
+                starts.append(index)
+            elif self.__isJump(instruction) and index + 1 < len(instructions):
+                starts.append(index + 1)
+        starts = sorted(set(starts))
+        ends = starts[1:] + [len(instructions)]
+        return list(zip(starts, ends))
+
+    def __isJump(self, instruction):
+        return isinstance(instruction, (JumpInstruction, CallInstruction, ReturnInstruction, ExitInstruction)) or \
+               isinstance(instruction, self.CONDITIONAL_JUMPS)
+
+    """
+    Finds types of the global variables known at the start of every block.
+    Returns a list of dictionaries of variable identifiers and their types,
+    None for blocks which are never executed.
+    """
+    def __inferTypes(self, instructions, blocks):
+        blockOfIndex = { start: number for number, (start, end) in enumerate(blocks) }
+        labels = {}
+        for index, instruction in enumerate(instructions):
+            if isinstance(instruction, LabelInstruction):
+                labels[instruction.operands[0].getValue()] = index
+        returnSites = [index + 1 for index, instruction in enumerate(instructions)
+                       if isinstance(instruction, CallInstruction) and index + 1 < len(instructions)]
+
+        entryTypes = [None] * len(blocks)
+        pending = []
+        if len(blocks) > 0:
+            entryTypes[0] = {}
+            pending.append(0)
+        while len(pending) > 0:
+            number = pending.pop()
+            start, end = blocks[number]
+            types = dict(entryTypes[number])
+            for index in range(start, end):
+                self.__assign(instructions[index], types)
+            for successor in self.__successors(instructions, end - 1, labels, returnSites):
+                successorNumber = blockOfIndex[successor]
+                if self.__merge(entryTypes, successorNumber, types):
+                    pending.append(successorNumber)
+        return entryTypes
+
+    """
+    Returns indexes of instructions which may be executed
+    after the instruction at the index.
+    """
+    def __successors(self, instructions, index, labels, returnSites):
+        instruction = instructions[index]
+        following = [index + 1] if index + 1 < len(instructions) else []
+        if isinstance(instruction, (JumpInstruction, CallInstruction)):
+            return self.__target(instruction, labels)
+        if isinstance(instruction, self.CONDITIONAL_JUMPS):
+            return self.__target(instruction, labels) + following
+        if isinstance(instruction, ReturnInstruction):
+            return returnSites
+        if isinstance(instruction, ExitInstruction):
+            return []
+        return following
+
+    def __target(self, instruction, labels):
+        target = labels.get(instruction.operands[0].getValue())
+        return [] if target == None else [target]
+
+    """
+    Merges the types at the end of a block into the types at the start
+    of its successor. Only types known on all paths are kept.
+    Returns True if the types at the start of the successor changed.
+    """
+    def __merge(self, entryTypes, number, types):
+        known = entryTypes[number]
+        if known == None:
+            entryTypes[number] = dict(types)
+            return True
+        merged = { identifier: type for identifier, type in known.items() if types.get(identifier) is type }
+        if len(merged) == len(known):
+            return False
+        entryTypes[number] = merged
+        return True
+
+    """
+    Updates the types of global variables by the variable
+    assigned by the instruction.
+    """
+    def __assign(self, instruction, types):
+        operands = instruction.operands
+        if len(operands) == 0 or type(operands[0]) is not GlobalVariableOperand or \
+           isinstance(instruction, self.READING_INSTRUCTIONS):
+            return
+        resultType = self.__resultType(instruction, types)
+        if resultType == None:
+            types.pop(operands[0].identifier, None)
+        else:
+            types[operands[0].identifier] = resultType
+
+    def __resultType(self, instruction, types):
+        instructionClass = type(instruction)
+        if instructionClass in self.RESULT_TYPES:
+            return self.RESULT_TYPES[instructionClass]
+        if instructionClass is MoveInstruction:
+            return self.__typeOf(instruction.operands[1], types)
+        if instructionClass in self.ARITHMETIC_OPERATIONS:
+            for operand in instruction.operands[1:]:
+                operandType = self.__typeOf(operand, types)
+                if operandType is INT_TYPE or operandType is FLOAT_TYPE:
+                    return operandType
+        return None
+
+    """
+    Returns the type of the symbol if it is known, None otherwise.
+    """
+    def __typeOf(self, symbol, types):
+        if isinstance(symbol, ConstantOperand):
+            return symbol.getType()
+        if isinstance(symbol, GlobalVariableOperand):
+            return types.get(symbol.identifier)
+        return None
+
+    def __specializeInstruction(self, instruction, types):
+        specializer = self.__specializers.get(type(instruction))
+        if specializer == None:
+            return instruction
+        operandTypes = tuple(self.__typeOf(operand, types) for operand in instruction.operands[1:])
+        specialized = specializer(instruction, operandTypes, types)
+        if specialized == None:
+            return instruction
+        self.specializedInstructions += 1
+        return specialized
+
+    def __specializeArithmetic(self, instruction, operandTypes, types):
+        type1, type2 = operandTypes
+        if type1 is not type2 or (type1 is not INT_TYPE and type1 is not FLOAT_TYPE):
+            return None
+        return UncheckedBinaryOperation(instruction, self.ARITHMETIC_OPERATIONS[type(instruction)], type1)
+
+    def __specializeDivision(self, instruction, operandTypes, types):
+        operation, requiredType = self.DIVISIONS[type(instruction)]
+        if operandTypes != (requiredType, requiredType):
+            return None
+        return UncheckedDivision(instruction, operation, requiredType)
+
+    def __specializeOrdering(self, instruction, operandTypes, types):
+        type1, type2 = operandTypes
+        if type1 is not type2 or type1 == None or type1 is NIL_TYPE:
+            return None
+        operation = operator.lt if type(instruction) is LtInstruction else operator.gt
+        return UncheckedBinaryOperation(instruction, operation, BOOL_TYPE)
+
+    def __specializeEquality(self, instruction, operandTypes, types):
+        if not self.__areComparable(*operandTypes):
+            return None
+        return UncheckedBinaryOperation(instruction, operator.eq, BOOL_TYPE)
+
+    def __specializeOperation(self, instruction, operandTypes, types):
+        requiredTypes, operation = self.OPERATIONS[type(instruction)]
+        if operandTypes != requiredTypes:
+            return None
+        resultType = self.RESULT_TYPES[type(instruction)]
+        readsString = type(instruction) in self.STRING_OPERATIONS
+        if len(requiredTypes) == 1:
+            return UncheckedUnaryOperation(instruction, operation, resultType, readsString)
+        return UncheckedBinaryOperation(instruction, operation, resultType, readsString)
+
+    def __specializeConcat(self, instruction, operandTypes, types):
+        if operandTypes != (STRING_TYPE, STRING_TYPE):
+            return None
+        return UncheckedConcat(instruction)
+
+    def __specializeSetchar(self, instruction, operandTypes, types):
+        stringType = self.__typeOf(instruction.operands[0], types)
+        if stringType is not STRING_TYPE or operandTypes != (INT_TYPE, STRING_TYPE):
+            return None
+        return UncheckedSetchar(instruction)
+
+    def __specializeJump(self, instruction, operandTypes, types):
+        if not self.__areComparable(*operandTypes):
+            return None
+        return UncheckedConditionalJump(instruction, type(instruction) is JumpifeqInstruction)
+
+    """
+    Returns True if values of the known types can be compared for equality.
+    """
+    def __areComparable(self, type1, type2):
+        if type1 == None or type2 == None:
+            return False
+        return type1 is type2 or type1 is NIL_TYPE or type2 is NIL_TYPE
+
+"""
+Returns the character of the string at the index.
+Raises an exception of the instruction named by opcode
+if the index is out of the string.
+"""
+def getCharacter(string, index, opcode):
+    if index < 0 or index >= len(string):
+        raise InterpretException(F"{opcode}: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
+    return string[index]
+
+"""
+Returns the character of the ordinal value.
+Raises an exception of the instruction named by opcode
+if the ordinal value isn't a valid character.
+"""
+def toCharacter(ordinal, opcode):
+    try:
+        return chr(ordinal)
+    except ValueError:
+        raise InterpretException(F"{opcode}: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
+
+"""
+Base class of instructions created by the TypeInference.
+The specialized instruction takes the operands, which have already
+been checked, and the opcode and the order of the checked instruction.
+The slot of the opcode is declared by the subclasses, so a specialized
+instruction can be a JumpingInstruction as well.
+"""
+class SpecializedInstruction(Instruction):
+
+    __slots__ = ()
+
+    def __init__(self, instruction):
+        self.operands = instruction.operands
+        self.expectedOperands = instruction.expectedOperands
+        self.processor = instruction.processor
+        self.opcode = instruction.opcode
+        self.order = instruction.order
+
+"""
+Assigns the result of the operation on the value of the symbol.
+If readsString is True, the operation gets the string
+of the symbol returned by getString.
+"""
+class UncheckedUnaryOperation(SpecializedInstruction):
+
+    __slots__ = ('opcode', '__destination', '__getValue', '__operation', '__resultType')
+
+    def __init__(self, instruction, operation, resultType, readsString = False):
+        super().__init__(instruction)
+        self.__destination, symbol = self.operands
+        self.__getValue = symbol.getString if readsString else symbol.getValue
+        self.__operation = operation
+        self.__resultType = resultType
+
+    def execute(self):
+        value = self.__getValue()
+        variable = self.__destination.getVariable()
+        variable.set(self.__operation(value), self.__resultType)
+
+"""
+Assigns the result of the operation on the values of the symbols.
+If readsString is True, the operation gets the string
+of the first symbol returned by getString.
+"""
+class UncheckedBinaryOperation(SpecializedInstruction):
+
+    __slots__ = ('opcode', '__destination', '__symbol2', '__getValue1', '__operation', '__resultType')
+
+    def __init__(self, instruction, operation, resultType, readsString = False):
+        super().__init__(instruction)
+        self.__destination, symbol1, self.__symbol2 = self.operands
+        self.__getValue1 = symbol1.getString if readsString else symbol1.getValue
+        self.__operation = operation
+        self.__resultType = resultType
+
+    def execute(self):
+        value1 = self.__getValue1()
+        value2 = self.__symbol2.getValue()
+        variable = self.__destination.getVariable()
+        variable.set(self.__operation(value1, value2), self.__resultType)
+
+"""
+IDIV or DIV, which checks only the division by zero.
+"""
+class UncheckedDivision(SpecializedInstruction):
+
+    __slots__ = ('opcode', '__destination', '__symbol1', '__symbol2', '__operation', '__resultType')
+
+    def __init__(self, instruction, operation, resultType):
+        super().__init__(instruction)
+        self.__destination, self.__symbol1, self.__symbol2 = self.operands
+        self.__operation = operation
+        self.__resultType = resultType
+
+    def execute(self):
+        value1 = self.__symbol1.getValue()
+        value2 = self.__symbol2.getValue()
+        if value2 == 0:
+            raise InterpretException(F"{self.opcode}: Cannot divide by 0", ReturnCodes.BAD_OPERAND_VALUE)
+        variable = self.__destination.getVariable()
+        variable.set(self.__operation(value1, value2), self.__resultType)
+
+"""
+CONCAT, which doesn't check the types of the strings.
+"""
+class UncheckedConcat(SpecializedInstruction):
+
+    __slots__ = ('opcode',)
+
+    def execute(self):
+        string1 = self.operands[1].getString()
+        string2 = self.operands[2].getValue()
+        variable = self.operands[0].getVariable()
+        concatenate(variable, string1, string2)
+
+"""
+SETCHAR, which checks only the index and the replacing string.
+"""
+class UncheckedSetchar(SpecializedInstruction):
+
+    __slots__ = ('opcode',)
+
+    def execute(self):
+        string = self.operands[0].getString()
+        index = self.operands[1].getValue()
+        sourceString = self.operands[2].getValue()
+        variable = self.operands[0].getVariable()
+        if index < 0 or index >= len(string) or len(sourceString) == 0:
+            raise InterpretException("SETCHAR: Invalid operand types", ReturnCodes.INVALID_STRING_OPERATION)
+        setCharacter(variable, string, index, sourceString[0])
+
+"""
+JUMPIFEQ or JUMPIFNEQ, which doesn't check the types of the compared values.
+"""
+class UncheckedConditionalJump(SpecializedInstruction, JumpingInstruction):
+
+    __slots__ = ('opcode', '__symbol1', '__symbol2', '__jumpIfEqual')
+
+    def __init__(self, instruction, jumpIfEqual):
+        super().__init__(instruction)
+        self.__symbol1 = self.operands[1]
+        self.__symbol2 = self.operands[2]
+        self.__jumpIfEqual = jumpIfEqual
+
+    def execute(self):
+        value1 = self.__symbol1.getValue()
+        value2 = self.__symbol2.getValue()
+        self.checkTarget()
+        if (value1 == value2) == self.__jumpIfEqual:
+            self.processor.instructionCounter.jumpToTarget(self.target)
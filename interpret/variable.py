@@ -1,10 +1,17 @@
+from .stringBuffer import *
 
 """
 The FrameVariable represents a variable to be stored in a frame.
 It has a name, value and type.
+A long string value may be kept in a StringBuffer, which CONCAT
+and SETCHAR change in place. getValue returns the value as an ordinary
+string then, so only the instructions using the buffer read the value
+of the variable directly.
 """
 class FrameVariable:
     
+    __slots__ = ('name', 'value', 'type')
+    
     def __init__(self, name):
         self.name = name
         self.value = None
@@ -18,7 +25,60 @@ class FrameVariable:
         self.type = type
         
     """
-    Returns true if the value and type is not None.
+    Returns true if the variable has been assigned a value.
     """
     def isInitialized(self):
-        return not(self.value == None and type == None)
\ No newline at end of file
+        return self.type != None
+    
+    """
+    Returns the value of the variable. A string kept
+    in a StringBuffer is returned as an ordinary string.
+    """
+    def getValue(self):
+        value = self.value
+        if value.__class__ is StringBuffer:
+            return value.toString()
+        return value
+    
+    """
+    Returns the string value of the variable, which is a StringBuffer
+    if the string is kept in a buffer.
+    """
+    def getString(self):
+        return self.value
+    
+    """
+    Returns the StringBuffer of the string value of the variable,
+    which can be changed in place. The string is moved to a new buffer
+    if it isn't kept in one yet. The variable has to hold a string.
+    """
+    def getBuffer(self):
+        value = self.value
+        if value.__class__ is StringBuffer:
+            return value
+        buffer = StringBuffer(value)
+        self.value = buffer
+        return buffer
+
+"""
+The CountedFrameVariable is a FrameVariable which reports 
+its initialization to the frame model and to its frame, so the frame
+model can keep the number of initialized variables without walking
+the frames. The frame is set by the frame model when the variable
+is defined. It is used only if the statistics of variables were requested.
+"""
+class CountedFrameVariable(FrameVariable):
+    
+    __slots__ = ('frame', '__frameModel')
+    
+    def __init__(self, name, frameModel):
+        super().__init__(name)
+        self.frame = None
+        self.__frameModel = frameModel
+    
+    def set(self, value, type):
+        if self.type == None:
+            self.frame.initializedVariables += 1
+            self.__frameModel.variableInitialized()
+        self.value = value
+        self.type = type
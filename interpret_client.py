@@ -0,0 +1,145 @@
+"""
+IPP project, a client of the interpret daemon.
+
+Sends the program and its input to the daemon started by
+interpret.py --daemon SOCKET and writes the output, the error output,
+the statistics and the exit code of the program the same way
+as interpret.py does when it runs the program itself.
+"""
+import sys
+import os
+import argparse
+import base64
+import socket
+from interpret.daemon import sendMessage, receiveMessage
+from interpret.return_codes import ReturnCodes
+from interpret.statistics import statisticsCollectors
+
+"""
+Prints help message to stdout.
+"""
+def printHelp():
+    print("interpret_client.py help:")
+    print("--help                        Prints this help.")
+    print("--socket SOCKET               Path to the socket of the daemon.")
+    print("--source SOURCE               Path to the source file.")
+    print("--key KEY                     Run the program the daemon has loaded under the key instead of a source.")
+    print("--print-key                   Write the key of the program to the standard error output.")
+    print("--input SOURCE                Path to the input file (meaning the stdin for the program).")
+    print("--output OUTPUT               Path to the file to write the output of the program into.")
+    print("--stats SOURCE                Path to the file to write the statistics into.")
+    for name, collectorClass in statisticsCollectors.items():
+        print(F"{'--' + name:<30}{collectorClass.description}")
+    print("--stats-format FORMAT         Format of the stats file: lines (default) or json.")
+    print("-O                            Optimize the program before running it.")
+    print("--engine ENGINE               Execution engine: processor (default), closure or transpiler.")
+    print("--shutdown                    Stop the daemon.")
+
+"""
+Reads the whole file, or the standard input if path is None.
+"""
+def readFile(path, code):
+    if path == None:
+        return sys.stdin.buffer.read()
+    try:
+        with open(path, 'rb') as file:
+            return file.read()
+    except OSError:
+        print('Cannot open file', file=sys.stderr)
+        exit(code)
+
+"""
+Sends the request to the daemon and returns its response.
+"""
+def sendRequest(socketPath, request):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(socketPath)
+            sendMessage(connection, request)
+            response = receiveMessage(connection)
+    except OSError:
+        response = None
+    if response == None:
+        print('Cannot communicate with the daemon', file=sys.stderr)
+        exit(ReturnCodes.INTERNAL_ERROR)
+    return response
+
+"""
+Returns the options of the interpret which are passed to the daemon.
+"""
+def getInterpretOptions(args):
+    options = ['--' + name for name in args.collectors]
+    options += ['--stats-format', args.stats_format, '--engine', args.engine]
+    if args.optimize:
+        options.append('-O')
+    return options
+
+"""
+Parse program arguments
+"""
+ap = argparse.ArgumentParser(add_help = False)
+ap.add_argument("--socket")
+ap.add_argument("--source")
+ap.add_argument("--key")
+ap.add_argument("--print-key", action='store_true', default=False)
+ap.add_argument("--input")
+ap.add_argument("--output")
+ap.add_argument("--stats")
+for name in statisticsCollectors:
+    ap.add_argument("--" + name, dest="collectors", action='append_const', const=name, default=[])
+ap.add_argument("--stats-format", choices=['lines', 'json'], default='lines')
+ap.add_argument("-O", dest="optimize", action='store_true', default=False)
+ap.add_argument("--engine", choices=['processor', 'closure', 'transpiler'], default='processor')
+ap.add_argument("--shutdown", action='store_true', default=False)
+ap.add_argument("--help", action='store_true', default=False)
+args = ap.parse_args()
+
+if args.help:
+    printHelp()
+    exit(ReturnCodes.SUCCESS)
+if args.socket == None:
+    print('--socket option wasn\'t specified', file=sys.stderr)
+    exit(ReturnCodes.SCRIPT_PARAMETER_ERROR)
+if args.shutdown:
+    exit(sendRequest(args.socket, { 'shutdown': True })['rc'])
+if len(args.collectors) > 0 and args.stats == None:
+    print('--stats option wasn\'t specified', file=sys.stderr)
+    exit(ReturnCodes.SCRIPT_PARAMETER_ERROR)
+if args.source == None and args.key == None and args.input == None:
+    print('Some option have to be specified', file=sys.stderr)
+    exit(ReturnCodes.SCRIPT_PARAMETER_ERROR)
+
+"""
+The program is read from the standard input unless it is given
+by the source file or the key, the same way as by interpret.py.
+"""
+request = { 'options': getInterpretOptions(args), 'stats': args.stats != None }
+if args.key != None:
+    request['key'] = args.key
+else:
+    request['source'] = base64.b64encode(readFile(args.source, ReturnCodes.INVALID_XML_STRUCTURE)).decode('ascii')
+request['input'] = base64.b64encode(readFile(args.input, ReturnCodes.INPUT_FILE_ERROR)).decode('ascii')
+
+response = sendRequest(args.socket, request)
+output = base64.b64decode(response['stdout'])
+if args.output == None:
+    sys.stdout.buffer.write(output)
+    sys.stdout.flush()
+else:
+    try:
+        with open(args.output, 'wb') as file:
+            file.write(output)
+    except OSError:
+        print('Cannot open file', file=sys.stderr)
+        exit(ReturnCodes.OUTPUT_FILE_ERROR)
+sys.stderr.write(response['stderr'])
+if args.print_key and response.get('key') != None:
+    print(response['key'], file=sys.stderr)
+if args.stats != None and response.get('stats') != None:
+    try:
+        with open(args.stats, 'w') as file:
+            file.write(response['stats'])
+    except OSError:
+        print('Cannot open file', file=sys.stderr)
+        exit(ReturnCodes.OUTPUT_FILE_ERROR)
+exit(response['rc'])
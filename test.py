@@ -0,0 +1,197 @@
+"""
+IPP project, a parallel test runner of the interpret of IPPcode20.
+
+Finds the test cases in the test directories the same way as test.php.
+A test case is a .src file with optional .in, .out and .rc files
+of the same name. A missing .in and .out file stands for an empty file
+and a missing .rc file stands for the exit code 0.
+
+The cases are run by a pool of processes. Every process loads
+the interpret script once and interprets its cases in the process,
+so no interpreter is started for a case. The output of a case
+is compared only if the case is expected to succeed.
+Unless --int-only is given, the source is translated
+to xml by the parse script first.
+"""
+import sys
+import os
+import re
+import argparse
+import subprocess
+import tempfile
+import time
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
+"""
+Prints help message to stdout.
+"""
+def printHelp():
+    print("test.py help:")
+    print("--help                        Prints this help.")
+    print("--verbose                     Prints the error output of failed tests.")
+    print("--directory PATH              Set the directory containing tests, can be repeated. Default is current.")
+    print("--recursive                   Search tests directories recursively.")
+    print("--parse-script PATH           Set path to parse.php script, default is ./parse.php.")
+    print("--int-script PATH             Set path to interpret.py script, default is ./interpret.py.")
+    print("--int-only                    Run interpret only.")
+    print("--match REGEX                 Regex to filter test names without extension and path.")
+    print("--jobs N                      Number of processes running the tests, default is the number of CPUs.")
+    print("--slowest N                   Number of the slowest tests to list, default is 10.")
+
+"""
+Returns the paths of the test cases without the .src extension
+in the directories, sorted by their paths.
+"""
+def findTestCases(directories, recursive, match):
+    regex = re.compile(match + r'\.src')
+    testCases = []
+    for directory in directories:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            for filename in filenames:
+                if filename.endswith('.src') and regex.search(filename):
+                    testCases.append(os.path.join(dirpath, filename[:-len('.src')]))
+            if not recursive:
+                break
+    return sorted(testCases)
+
+"""
+Returns the path of the file of the test case with the given extension,
+or the empty file if the test case has no such file.
+"""
+def getTestCaseFile(testCase, extension):
+    path = testCase + extension
+    return path if os.path.exists(path) else os.devnull
+
+"""
+Returns the exit code expected by the test case.
+"""
+def getExpectedReturnCode(testCase):
+    path = testCase + '.rc'
+    if not os.path.exists(path):
+        return 0
+    with open(path) as file:
+        return int(file.read().strip() or '0')
+
+"""
+The interpret script loaded in the process of the pool, its argument parser
+and the parse script, set by initializeWorker.
+"""
+interpretScript = None
+interpretArgumentParser = None
+parseScript = None
+
+"""
+Loads the interpret script in a process of the pool.
+"""
+def initializeWorker(interpretPath, parsePath):
+    global interpretScript, interpretArgumentParser, parseScript
+    sys.path.insert(0, os.path.dirname(os.path.abspath(interpretPath)))
+    specification = importlib.util.spec_from_file_location('interpretScript', interpretPath)
+    interpretScript = importlib.util.module_from_spec(specification)
+    specification.loader.exec_module(interpretScript)
+    interpretArgumentParser = interpretScript.createArgumentParser()
+    parseScript = parsePath
+
+"""
+Runs the test case and returns its result. If there is a parse script,
+the source is parsed first and the case fails or passes by the parse
+script if it doesn't succeed.
+"""
+def runTestCase(testCase):
+    start = time.perf_counter()
+    expectedCode = getExpectedReturnCode(testCase)
+    case = {
+        'source': testCase + '.src',
+        'input': getTestCaseFile(testCase, '.in'),
+        'output': getTestCaseFile(testCase, '.out'),
+        'rc': expectedCode,
+    }
+    if parseScript == None:
+        result = interpretScript.runBatchCase(interpretArgumentParser, case)
+    else:
+        result = parseAndRunTestCase(case)
+    result['source'] = testCase
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+"""
+Translates the source of the case to xml by the parse script
+and interprets the xml.
+"""
+def parseAndRunTestCase(case):
+    with tempfile.NamedTemporaryFile(suffix = '.xml', delete = False) as xmlFile:
+        try:
+            with open(case['source'], 'rb') as sourceFile:
+                parsing = subprocess.run(['php', parseScript], stdin = sourceFile, stdout = xmlFile,
+                                         stderr = subprocess.PIPE)
+            returnCode = parsing.returncode
+            errors = parsing.stderr.decode('utf-8', 'replace')
+        except OSError as ex:
+            returnCode = None
+            errors = F"Cannot run the parse script: {ex}"
+    try:
+        if returnCode != 0:
+            return {
+                'rc': returnCode,
+                'expectedRc': case['rc'],
+                'passed': returnCode == case['rc'],
+                'stdout': '',
+                'stderr': errors,
+            }
+        case['source'] = xmlFile.name
+        return interpretScript.runBatchCase(interpretArgumentParser, case)
+    finally:
+        os.remove(xmlFile.name)
+
+"""
+Prints the results of the test cases, the slowest test cases
+and the summary.
+"""
+def printResults(results, slowestCount, verbose, seconds):
+    for result in results:
+        status = 'PASS' if result['passed'] else 'FAIL'
+        print(F"{status} {result['rc']!s:>3} {result['seconds'] * 1000:>10.3f} ms  {result['source']}")
+        if verbose and not result['passed']:
+            print(F"     expected exit code {result['expectedRc']}")
+            if result['stderr'] != '':
+                print('     ' + result['stderr'].rstrip('\n').replace('\n', '\n     '))
+
+    if slowestCount > 0 and len(results) > 0:
+        print("\nSlowest tests:")
+        for result in sorted(results, key = lambda result: -result['seconds'])[:slowestCount]:
+            print(F"{result['seconds'] * 1000:>15.3f} ms  {result['source']}")
+
+    failed = [result for result in results if not result['passed']]
+    print(F"\nPassed {len(results) - len(failed)} of {len(results)} tests in {seconds:.3f} s")
+
+"""
+Parse program arguments
+"""
+ap = argparse.ArgumentParser(add_help = False)
+ap.add_argument("--help", action='store_true', default=False)
+ap.add_argument("--verbose", action='store_true', default=False)
+ap.add_argument("--directory", action='append')
+ap.add_argument("--recursive", action='store_true', default=False)
+ap.add_argument("--parse-script", default='parse.php')
+ap.add_argument("--int-script", default='interpret.py')
+ap.add_argument("--int-only", action='store_true', default=False)
+ap.add_argument("--match", default='')
+ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+ap.add_argument("--slowest", type=int, default=10)
+
+if __name__ == '__main__':
+    args = ap.parse_args()
+    if args.help:
+        printHelp()
+        exit(0)
+
+    testCases = findTestCases(args.directory or ['.'], args.recursive, args.match)
+    parsePath = None if args.int_only else args.parse_script
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max(1, args.jobs), initializer = initializeWorker,
+                             initargs = (args.int_script, parsePath)) as executor:
+        chunkSize = max(1, len(testCases) // (4 * max(1, args.jobs)))
+        results = list(executor.map(runTestCase, testCases, chunksize = chunkSize))
+    printResults(results, args.slowest, args.verbose, time.perf_counter() - start)
+    exit(0 if all(result['passed'] for result in results) else 1)
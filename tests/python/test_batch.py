@@ -0,0 +1,84 @@
+"""
+Tests of the time limit of the cases run by the batch mode.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+INTERPRET = os.path.join(ROOT, 'interpret.py')
+
+"""
+A program which never stops.
+"""
+LOOP_PROGRAM = '''<?xml version="1.0" encoding="UTF-8"?>
+<program language="IPPcode20">
+<instruction order="1" opcode="LABEL"><arg1 type="label">loop</arg1></instruction>
+<instruction order="2" opcode="JUMP"><arg1 type="label">loop</arg1></instruction>
+</program>
+'''
+
+"""
+A program which writes a single string.
+"""
+WRITE_PROGRAM = '''<?xml version="1.0" encoding="UTF-8"?>
+<program language="IPPcode20">
+<instruction order="1" opcode="WRITE"><arg1 type="string">done</arg1></instruction>
+</program>
+'''
+
+class BatchTimeLimitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for name, program in (('loop.xml', LOOP_PROGRAM), ('write.xml', WRITE_PROGRAM)):
+            with open(os.path.join(self.directory.name, name), 'w') as programFile:
+                programFile.write(program)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    """
+    Runs the cases by the batch mode and returns
+    its exit code and the results of the cases.
+    """
+    def runBatch(self, cases, *options):
+        manifestPath = os.path.join(self.directory.name, 'manifest.jsonl')
+        reportPath = os.path.join(self.directory.name, 'report.json')
+        with open(manifestPath, 'w') as manifestFile:
+            manifestFile.writelines(json.dumps(case) + "\n" for case in cases)
+        process = subprocess.run([sys.executable, INTERPRET, '--batch', manifestPath, '--batch-report', reportPath]
+                                 + list(options), stdin = subprocess.DEVNULL, stdout = subprocess.DEVNULL, timeout = 60)
+        with open(reportPath) as reportFile:
+            return process.returncode, json.load(reportFile)
+
+    def test_looping_case_is_stopped(self):
+        for engine in ('processor', 'closure', 'transpiler'):
+            with self.subTest(engine = engine):
+                returnCode, results = self.runBatch([
+                    { 'source': 'loop.xml', 'options': ['--engine', engine] },
+                    { 'source': 'write.xml', 'options': ['--engine', engine] },
+                ], '--batch-time-limit', '0.5')
+                self.assertEqual(returnCode, 1)
+                self.assertEqual(results[0]['rc'], 99)
+                self.assertFalse(results[0]['passed'])
+                self.assertIn('Time limit of 0.5 s exceeded', results[0]['stderr'])
+                self.assertTrue(results[1]['passed'])
+                self.assertEqual(results[1]['stdout'], 'done')
+
+    def test_timed_out_case_fails_with_expected_code(self):
+        returnCode, results = self.runBatch([{ 'source': 'loop.xml', 'rc': 99 }], '--batch-time-limit', '0.5')
+        self.assertEqual(returnCode, 1)
+        self.assertFalse(results[0]['passed'])
+
+    def test_time_limit_must_be_positive(self):
+        process = subprocess.run([sys.executable, INTERPRET, '--batch', 'manifest.jsonl', '--batch-time-limit', '0'],
+                                 stdin = subprocess.DEVNULL, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+        self.assertEqual(process.returncode, 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Tests of the protocol of the interpret daemon and of running
+programs by the daemon through interpret_client.py.
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, ROOT)
+
+from interpret.daemon import MESSAGE_HEADER, sendMessage, receiveMessage
+
+INTERPRET = os.path.join(ROOT, 'interpret.py')
+CLIENT = os.path.join(ROOT, 'interpret_client.py')
+
+"""
+A program which reads a line and writes it back.
+"""
+ECHO_PROGRAM = '''<?xml version="1.0" encoding="UTF-8"?>
+<program language="IPPcode20">
+<instruction order="1" opcode="DEFVAR"><arg1 type="var">GF@line</arg1></instruction>
+<instruction order="2" opcode="READ"><arg1 type="var">GF@line</arg1><arg2 type="type">string</arg2></instruction>
+<instruction order="3" opcode="WRITE"><arg1 type="var">GF@line</arg1></instruction>
+</program>
+'''
+
+"""
+A program which never stops.
+"""
+LOOP_PROGRAM = '''<?xml version="1.0" encoding="UTF-8"?>
+<program language="IPPcode20">
+<instruction order="1" opcode="LABEL"><arg1 type="label">loop</arg1></instruction>
+<instruction order="2" opcode="JUMP"><arg1 type="label">loop</arg1></instruction>
+</program>
+'''
+
+class MessageTest(unittest.TestCase):
+
+    def test_message_round_trip(self):
+        message = { 'rc': 0, 'stdout': 'aGk=', 'stderr': '\u011b\u0161\n', 'stats': None, 'options': ['--insts'] }
+        sender, receiver = socket.socketpair()
+        with sender, receiver:
+            sendMessage(sender, message)
+            self.assertEqual(receiveMessage(receiver), message)
+
+    def test_large_message(self):
+        message = { 'stdout': 'x' * (3 * 1024 * 1024) }
+        sender, receiver = socket.socketpair()
+        with sender, receiver:
+            receiver.settimeout(10)
+            thread = threading.Thread(target = sendMessage, args = (sender, message))
+            thread.start()
+            self.assertEqual(receiveMessage(receiver), message)
+            thread.join()
+
+    def test_closed_connection(self):
+        sender, receiver = socket.socketpair()
+        with receiver:
+            sender.close()
+            self.assertIsNone(receiveMessage(receiver))
+
+    def test_truncated_message(self):
+        sender, receiver = socket.socketpair()
+        with receiver:
+            sender.sendall(MESSAGE_HEADER.pack(10) + b'{"rc"')
+            sender.close()
+            self.assertIsNone(receiveMessage(receiver))
+
+class DaemonTest(unittest.TestCase):
+
+    TIME_LIMIT = 2
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socketPath = os.path.join(self.directory.name, 'daemon.sock')
+        self.daemon = subprocess.Popen([sys.executable, INTERPRET, '--daemon', self.socketPath,
+                                        '--daemon-time-limit', str(self.TIME_LIMIT)])
+        deadline = time.monotonic() + 10
+        while not os.path.exists(self.socketPath):
+            if time.monotonic() > deadline or self.daemon.poll() != None:
+                self.fail('The daemon did not start')
+            time.sleep(0.05)
+
+    def tearDown(self):
+        if self.daemon.poll() == None:
+            self.daemon.kill()
+        self.daemon.wait()
+        self.directory.cleanup()
+
+    """
+    Runs the program by the client and returns the completed process.
+    """
+    def runClient(self, program, input = b'', arguments = []):
+        sourcePath = os.path.join(self.directory.name, 'program.xml')
+        with open(sourcePath, 'w') as file:
+            file.write(program)
+        return subprocess.run([sys.executable, CLIENT, '--socket', self.socketPath, '--source', sourcePath] + arguments,
+                              input = input, stdout = subprocess.PIPE, stderr = subprocess.PIPE, timeout = 30)
+
+    def test_client_round_trip(self):
+        result = self.runClient(ECHO_PROGRAM, b'hello\n')
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout, b'hello')
+
+        shutdown = subprocess.run([sys.executable, CLIENT, '--socket', self.socketPath, '--shutdown'], timeout = 30)
+        self.assertEqual(shutdown.returncode, 0)
+        self.assertEqual(self.daemon.wait(timeout = 10), 0)
+        self.assertFalse(os.path.exists(self.socketPath))
+
+    def test_program_over_time_limit(self):
+        start = time.monotonic()
+        result = self.runClient(LOOP_PROGRAM)
+        self.assertLess(time.monotonic() - start, self.TIME_LIMIT + 10)
+        self.assertEqual(result.returncode, 99)
+        self.assertIn(b'Time limit', result.stderr)
+
+        result = self.runClient(ECHO_PROGRAM, b'next\n')
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout, b'next')
+
+    def test_loaded_program_is_kept_by_key(self):
+        result = self.runClient(ECHO_PROGRAM, b'first\n', ['--print-key'])
+        self.assertEqual(result.returncode, 0)
+        key = result.stderr.decode().split()[-1]
+
+        result = subprocess.run([sys.executable, CLIENT, '--socket', self.socketPath, '--key', key],
+                                input = b'second\n', stdout = subprocess.PIPE, timeout = 30)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout, b'second')
+
+if __name__ == '__main__':
+    unittest.main()
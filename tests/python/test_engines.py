@@ -0,0 +1,53 @@
+"""
+Tests that the closure engine and the transpiler interpret the tests
+of the interpret the same way as the Processor: with the same exit code
+and the same output.
+"""
+import glob
+import importlib.util
+import os
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, ROOT)
+
+TESTS = os.path.join(ROOT, 'tests', 'interpret')
+
+"""
+Loads the interpret script the same way the test runner does.
+"""
+def loadInterpretScript():
+    specification = importlib.util.spec_from_file_location('interpretScript', os.path.join(ROOT, 'interpret.py'))
+    interpretScript = importlib.util.module_from_spec(specification)
+    specification.loader.exec_module(interpretScript)
+    return interpretScript
+
+class EngineTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.interpretScript = loadInterpretScript()
+        cls.argumentParser = cls.interpretScript.createArgumentParser()
+
+    """
+    Runs the source by the engine and returns the exit code and the output.
+    """
+    def runSource(self, source, engine):
+        case = { 'source': source, 'options': ['--engine', engine] }
+        if os.path.exists(source[:-len('.src')] + '.in'):
+            case['input'] = source[:-len('.src')] + '.in'
+        result = self.interpretScript.runBatchCase(self.argumentParser, case)
+        return result['rc'], result['stdout']
+
+    def test_engines_match_processor(self):
+        sources = sorted(glob.glob(os.path.join(TESTS, '**', '*.src'), recursive = True))
+        self.assertGreater(len(sources), 0)
+        for source in sources:
+            expected = self.runSource(source, 'processor')
+            for engine in ('closure', 'transpiler'):
+                with self.subTest(source = os.path.relpath(source, TESTS), engine = engine):
+                    self.assertEqual(self.runSource(source, engine), expected)
+
+if __name__ == '__main__':
+    unittest.main()
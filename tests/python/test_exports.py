@@ -0,0 +1,61 @@
+"""
+Tests that the names exported by the interpret package are the names
+of its modules, so the table of the exports can't get stale.
+"""
+import ast
+import glob
+import importlib
+import os
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, ROOT)
+
+import interpret
+from interpret.processor import instructionClasses
+
+PACKAGE = os.path.join(ROOT, 'interpret')
+
+"""
+Public names of the modules which aren't exported by the package.
+The classes of the opcodes are left out as well.
+"""
+UNEXPORTED = { 'processor': ('Instruction',) }
+
+"""
+Returns the public names defined at the top level of the module file.
+"""
+def getDefinedNames(path):
+    with open(path, 'rb') as moduleFile:
+        tree = ast.parse(moduleFile.read())
+    names = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            names.update(target.id for target in node.targets if isinstance(target, ast.Name))
+    return { name for name in names if not name.startswith('_') }
+
+class ExportsTest(unittest.TestCase):
+
+    def test_exported_names_resolve(self):
+        for module, names in interpret.EXPORTS.items():
+            for name in names:
+                with self.subTest(module = module, name = name):
+                    self.assertIs(getattr(interpret, name), getattr(importlib.import_module('interpret.' + module), name))
+
+    def test_public_names_are_exported(self):
+        opcodeClasses = { instructionClass.__name__ for instructionClass in instructionClasses.values() }
+        for path in sorted(glob.glob(os.path.join(PACKAGE, '*.py'))):
+            module = os.path.basename(path)[:-len('.py')]
+            if module == '__init__':
+                continue
+            with self.subTest(module = module):
+                names = getDefinedNames(path) - set(UNEXPORTED.get(module, ()))
+                if module == 'processor':
+                    names -= opcodeClasses
+                self.assertEqual(names, set(interpret.EXPORTS.get(module, ())))
+
+if __name__ == '__main__':
+    unittest.main()
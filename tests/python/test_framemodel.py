@@ -0,0 +1,180 @@
+"""
+Tests of the pools of frames and variables of the FrameModel.
+
+A discarded frame is reused because nothing but the frame model refers
+to the temporary and local frames and their variables. The tests run
+programs by all engines and check that nothing else refers to the frames
+and the variables in the pools, so an engine keeping them would fail.
+"""
+import gc
+import io
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from interpret.framemodel import FrameModel
+from interpret.operand import OperandFactory
+from interpret.instructionCounter import InstructionCounter
+from interpret.inputReader import InputReader
+from interpret.outputWriter import OutputWriter
+from interpret.dataStack import DataStack
+from interpret.program import Program
+from interpret.processor import Processor
+from interpret.closureEngine import ClosureEngine
+from interpret.transpiler import Transpiler
+
+"""
+Returns the frames and the variables in the pools of the frame model.
+"""
+def getPools(frameModel):
+    return frameModel._FrameModel__framePool, frameModel._FrameModel__variablePool
+
+"""
+Returns the objects referring to the object besides
+the frames of the running functions.
+"""
+def getReferrers(value):
+    return [referrer for referrer in gc.get_referrers(value) if not isinstance(referrer, types.FrameType)]
+
+"""
+Runs the program given by its xml source by the engine
+and returns the frame model of the processor.
+engine is None for the processor, or the class of another engine.
+"""
+def runProgram(source, engine = None, countVariables = False):
+    frameModel = FrameModel(countVariables = countVariables)
+    outputDescriptor = os.open(os.devnull, os.O_WRONLY)
+    outputWriter = OutputWriter(outputDescriptor)
+    try:
+        processor = Processor(frameModel, OperandFactory(frameModel), InstructionCounter(), InputReader(io.BytesIO(b'')),
+                              None, outputWriter, None, DataStack())
+        processor.load(Program(io.BytesIO(source.encode('utf-8'))).getInstructions())
+        if engine == None:
+            processor.run()
+        else:
+            engine(processor).run()
+    finally:
+        outputWriter.close()
+    return frameModel
+
+"""
+A program which calls a function with a new temporary frame in a loop,
+so every iteration discards the frame of the previous one.
+The last CREATEFRAME discards the frame of the last call.
+"""
+CALL_LOOP = '''<?xml version="1.0" encoding="UTF-8"?>
+<program language="IPPcode20">
+<instruction order="1" opcode="DEFVAR"><arg1 type="var">GF@i</arg1></instruction>
+<instruction order="2" opcode="MOVE"><arg1 type="var">GF@i</arg1><arg2 type="int">0</arg2></instruction>
+<instruction order="3" opcode="LABEL"><arg1 type="label">loop</arg1></instruction>
+<instruction order="4" opcode="CREATEFRAME"></instruction>
+<instruction order="5" opcode="DEFVAR"><arg1 type="var">TF@n</arg1></instruction>
+<instruction order="6" opcode="MOVE"><arg1 type="var">TF@n</arg1><arg2 type="var">GF@i</arg2></instruction>
+<instruction order="7" opcode="PUSHFRAME"></instruction>
+<instruction order="8" opcode="DEFVAR"><arg1 type="var">LF@m</arg1></instruction>
+<instruction order="9" opcode="ADD"><arg1 type="var">LF@m</arg1><arg2 type="var">LF@n</arg2><arg3 type="int">1</arg3></instruction>
+<instruction order="10" opcode="POPFRAME"></instruction>
+<instruction order="11" opcode="ADD"><arg1 type="var">GF@i</arg1><arg2 type="var">GF@i</arg2><arg3 type="int">1</arg3></instruction>
+<instruction order="12" opcode="JUMPIFNEQ"><arg1 type="label">loop</arg1><arg2 type="var">GF@i</arg2><arg3 type="int">10</arg3></instruction>
+<instruction order="13" opcode="CREATEFRAME"></instruction>
+</program>
+'''
+
+class FramePoolTest(unittest.TestCase):
+
+    def test_discarded_temporary_frame_is_reused(self):
+        frameModel = FrameModel()
+        frameModel.resetTemporaryFrame()
+        frameModel.defineVariable('TF', 'a')
+        frameModel.defineVariable('TF', 'b')
+        frameModel.getFrameVariable('TF', 'a').set(1, 'int')
+
+        frameModel.resetTemporaryFrame()
+        framePool, variablePool = getPools(frameModel)
+        self.assertEqual(len(framePool), 0)
+        self.assertEqual(len(variablePool), 2)
+        self.assertEqual(frameModel.temporaryFrame.variables, {})
+        self.assertEqual(frameModel.temporaryFrame.initializedVariables, 0)
+
+        pooledVariable = variablePool[-1]
+        frameModel.defineVariable('TF', 'c')
+        variable = frameModel.getFrameVariable('TF', 'c')
+        self.assertIs(variable, pooledVariable)
+        self.assertFalse(variable.isInitialized())
+        self.assertFalse(hasattr(variable, 'frame'))
+        self.assertEqual(len(variablePool), 1)
+
+    def test_reused_counted_variable_refers_to_its_frame(self):
+        frameModel = FrameModel(countVariables = True)
+        frameModel.resetTemporaryFrame()
+        frameModel.defineVariable('TF', 'a')
+        frameModel.getFrameVariable('TF', 'a').set(1, 'int')
+        self.assertEqual(frameModel.temporaryFrame.initializedVariables, 1)
+
+        frameModel.resetTemporaryFrame()
+        frameModel.defineVariable('TF', 'b')
+        variable = frameModel.getFrameVariable('TF', 'b')
+        self.assertIs(variable.frame, frameModel.temporaryFrame)
+        variable.set(2, 'int')
+        self.assertEqual(frameModel.temporaryFrame.initializedVariables, 1)
+        self.assertEqual((frameModel.initializedVariables, frameModel.maximumVariables), (1, 1))
+
+    def test_popped_local_frame_is_reused(self):
+        frameModel = FrameModel()
+        frameModel.resetTemporaryFrame()
+        frameModel.defineVariable('TF', 'a')
+        frameModel.pushTempFrameToLocalFrameStack()
+        frameModel.popFromLocalFrameStackToTempFrame()
+
+        frameModel.resetTemporaryFrame()
+        framePool, variablePool = getPools(frameModel)
+        self.assertEqual(len(variablePool), 1)
+
+    def test_pool_is_limited(self):
+        frameModel = FrameModel()
+        frameModel.MAXIMUM_POOLED_VARIABLES = 1
+        frameModel.resetTemporaryFrame()
+        frameModel.defineVariable('TF', 'a')
+        frameModel.defineVariable('TF', 'b')
+        frameModel.resetTemporaryFrame()
+        framePool, variablePool = getPools(frameModel)
+        self.assertEqual((len(framePool), len(variablePool)), (0, 0))
+
+    def test_frames_are_not_pooled_if_disabled(self):
+        frameModel = FrameModel(poolFrames = False)
+        frameModel.resetTemporaryFrame()
+        frameModel.defineVariable('TF', 'a')
+        frameModel.resetTemporaryFrame()
+        frameModel.resetTemporaryFrame()
+        framePool, variablePool = getPools(frameModel)
+        self.assertEqual((len(framePool), len(variablePool)), (0, 0))
+
+    def test_processor_reuses_frames_of_calls(self):
+        frameModel = runProgram(CALL_LOOP)
+        framePool, variablePool = getPools(frameModel)
+        self.assertEqual(len(variablePool), 2)
+        self.assertEqual(frameModel.temporaryFrame.variables, {})
+        self.assertEqual(frameModel.globalFrame.getVariable('i').value, 10)
+
+    """
+    Checks that only the pools refer to the pooled frames and variables
+    after the program ran by every engine.
+    """
+    def test_pooled_objects_are_referred_only_by_pools(self):
+        for engine in (None, ClosureEngine, Transpiler):
+            for countVariables in (False, True):
+                with self.subTest(engine = engine, countVariables = countVariables):
+                    frameModel = runProgram(CALL_LOOP, engine, countVariables)
+                    framePool, variablePool = getPools(frameModel)
+                    self.assertEqual(len(variablePool), 2)
+                    gc.collect()
+                    for variable in variablePool:
+                        self.assertEqual(getReferrers(variable), [variablePool])
+                    for frame in framePool:
+                        self.assertEqual(getReferrers(frame), [framePool])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests of the removal of old programs from the ProgramCache.
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from interpret.programCache import ProgramCache
+
+MAXIMUM_AGE = 60 * 60
+
+class ProgramCacheEvictionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        cache = ProgramCache(self.directory.name, maximumAge = MAXIMUM_AGE)
+        cache.store('old', [])
+        cache.store('new', [])
+        self.setAge('old', MAXIMUM_AGE + 60)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    """
+    Sets the time the file of the cache was last used to the given
+    number of seconds ago.
+    """
+    def setAge(self, name, seconds):
+        if name != ProgramCache.EVICTION_STAMP:
+            name += ProgramCache.FILE_EXTENSION
+        modified = time.time() - seconds
+        os.utime(os.path.join(self.directory.name, name), (modified, modified))
+
+    def test_load_removes_old_programs(self):
+        self.setAge(ProgramCache.EVICTION_STAMP, ProgramCache.EVICTION_INTERVAL + 60)
+        cache = ProgramCache(self.directory.name, maximumAge = MAXIMUM_AGE)
+        self.assertEqual(cache.load('new'), [])
+        self.assertIsNone(cache.load('old'))
+
+    def test_load_cleans_up_at_most_once_per_interval(self):
+        cache = ProgramCache(self.directory.name, maximumAge = MAXIMUM_AGE)
+        self.assertEqual(cache.load('old'), [])
+
+    def test_load_cleans_up_without_stamp(self):
+        os.remove(os.path.join(self.directory.name, ProgramCache.EVICTION_STAMP))
+        cache = ProgramCache(self.directory.name, maximumAge = MAXIMUM_AGE)
+        self.assertIsNone(cache.load('old'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Tests that the instructions, operands and variables of a run program
+have no __dict__, including the specialized and fused instructions
+the processor executes by default.
+"""
+import glob
+import io
+import os
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, ROOT)
+
+from interpret.framemodel import FrameModel
+from interpret.operand import OperandFactory
+from interpret.instructionCounter import InstructionCounter
+from interpret.inputReader import InputReader
+from interpret.outputWriter import OutputWriter
+from interpret.dataStack import DataStack
+from interpret.program import Program
+from interpret.processor import Processor
+from interpret.fusion import InstructionFusion
+from interpret.typeInference import TypeInference
+from interpret.return_codes import InterpretException
+
+TESTS = os.path.join(ROOT, 'tests', 'interpret')
+
+class SlotsTest(unittest.TestCase):
+
+    def test_executed_objects_have_no_dict(self):
+        classes = set()
+        for source in sorted(glob.glob(os.path.join(TESTS, '**', '*.src'), recursive = True)):
+            frameModel = FrameModel(countVariables = True)
+            processor = Processor(frameModel, OperandFactory(frameModel), InstructionCounter(), InputReader(io.BytesIO(b'')))
+            try:
+                with open(source, 'rb') as sourceFile:
+                    processor.load(Program(sourceFile).getInstructions())
+            except InterpretException:
+                continue
+            instructions = InstructionFusion().fuse(TypeInference().specialize(processor.instructions))
+            for instruction in instructions:
+                classes.add(type(instruction))
+                classes.update(type(operand) for operand in instruction.operands)
+            frameModel.defineVariable('GF', 'variable')
+            classes.add(type(frameModel.getFrameVariable('GF', 'variable')))
+
+        self.assertTrue(any(instructionClass.__name__.startswith('Unchecked') for instructionClass in classes))
+        self.assertTrue(any(instructionClass.__name__.startswith('Fused') for instructionClass in classes))
+        for objectClass in classes:
+            with self.subTest(objectClass = objectClass.__name__):
+                self.assertFalse(any('__dict__' in base.__dict__ for base in objectClass.__mro__))
+
+if __name__ == '__main__':
+    unittest.main()